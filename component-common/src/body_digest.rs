@@ -0,0 +1,73 @@
+//! Cheap digest of raw API response bodies.
+//!
+//! Almost every inventory response is byte-for-byte identical to the previous
+//! one except for the volatile `"timestamp"` field. Hashing the raw body with
+//! that value skipped lets the pollers detect "unchanged" without
+//! deserializing or allocating.
+
+const TIMESTAMP_KEY: &[u8] = b"\"timestamp\":";
+const SEED: u64 = 0xcbf2_9ce4_8422_2325;
+const MULTIPLIER: u64 = 0x517c_c1b7_2722_0a95;
+
+/// Returns a 64-bit digest of `body`, ignoring the value of every `"timestamp"` field
+pub fn body_digest(body: &[u8]) -> u64 {
+    let mut hash = SEED;
+    let mut rest = body;
+
+    while let Some(pos) = find(rest, TIMESTAMP_KEY) {
+        let value_start = pos + TIMESTAMP_KEY.len();
+        hash = mix(hash, &rest[..value_start]);
+        rest = skip_value(&rest[value_start..]);
+    }
+
+    mix(hash, rest)
+}
+
+/// Folds `bytes` into `hash` eight bytes at a time (multiply-rotate, as in FxHash)
+fn mix(mut hash: u64, bytes: &[u8]) -> u64 {
+    let mut chunks = bytes.chunks_exact(8);
+    for chunk in &mut chunks {
+        let word = u64::from_le_bytes(chunk.try_into().unwrap());
+        hash = (hash.rotate_left(5) ^ word).wrapping_mul(MULTIPLIER);
+    }
+    for &byte in chunks.remainder() {
+        hash = (hash.rotate_left(5) ^ byte as u64).wrapping_mul(MULTIPLIER);
+    }
+    // Length keeps e.g. `"timestamp":1,"a"` and `"timestamp":1"a"` segments apart
+    (hash.rotate_left(5) ^ bytes.len() as u64).wrapping_mul(MULTIPLIER)
+}
+
+/// Finds `needle` by jumping between occurrences of its first byte
+fn find(haystack: &[u8], needle: &[u8]) -> Option<usize> {
+    let mut offset = 0;
+    while let Some(pos) = haystack[offset..].iter().position(|&byte| byte == needle[0]) {
+        let start = offset + pos;
+        if haystack[start..].starts_with(needle) {
+            return Some(start);
+        }
+        offset = start + 1;
+    }
+    None
+}
+
+/// Skips a JSON number or string value (and surrounding whitespace)
+fn skip_value(bytes: &[u8]) -> &[u8] {
+    let mut i = 0;
+    while i < bytes.len() && bytes[i].is_ascii_whitespace() {
+        i += 1;
+    }
+
+    if i < bytes.len() && bytes[i] == b'"' {
+        i += 1;
+        while i < bytes.len() && bytes[i] != b'"' {
+            i += if bytes[i] == b'\\' { 2 } else { 1 };
+        }
+        i += 1;
+    } else {
+        while i < bytes.len() && matches!(bytes[i], b'0'..=b'9' | b'-' | b'+' | b'.' | b'e' | b'E') {
+            i += 1;
+        }
+    }
+
+    &bytes[i.min(bytes.len())..]
+}
@@ -0,0 +1,7 @@
+//! Code shared by the product scanner and the early-warning monitor.
+//!
+//! Both crates depend on this one by path, so the response digest rules and
+//! the status board layout can't drift apart between them.
+
+pub mod body_digest;
+pub mod status_board;
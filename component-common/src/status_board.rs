@@ -0,0 +1,144 @@
+//! Writer for this component's slot in the coordinator's status board.
+//!
+//! The layout is documented in coordinator/status_board.py. The Python copies
+//! there and in cookie-prep/src/status_board.py must match this file; change
+//! all three together and bump VERSION.
+
+use std::env;
+use std::fs::OpenOptions;
+use std::io;
+use std::process;
+use std::ptr;
+use std::sync::atomic::{fence, AtomicU64, Ordering};
+use std::time::{SystemTime, UNIX_EPOCH};
+use chrono::Local;
+use log::{error, info};
+use memmap2::MmapMut;
+
+/// Environment variable with the path of the board, set by the coordinator
+const STATUS_BOARD_ENV: &str = "NVIDIA_STATUS_BOARD";
+
+const MAGIC: &[u8; 8] = b"NVSTATB1";
+/// Layout version; the header also carries the record size, so an unbumped change is caught too
+const VERSION: u32 = 2;
+const HEADER_SIZE: usize = 64;
+const SLOT_SIZE: usize = 256;
+/// Bytes after the sequence counter
+const RECORD_SIZE: usize = 184;
+const DETAIL_SIZE: usize = 128;
+
+/// Slot of the product scanner
+pub const SCANNER_SLOT: usize = 1;
+/// Slot of the early-warning monitor
+pub const EARLY_WARNING_SLOT: usize = 2;
+
+pub const STATE_STARTING: u32 = 1;
+pub const STATE_RUNNING: u32 = 2;
+pub const STATE_PAUSED: u32 = 3;
+pub const STATE_STOPPED: u32 = 4;
+
+/// Current Unix time in milliseconds
+pub fn now_ms() -> u64 {
+    SystemTime::now().duration_since(UNIX_EPOCH).map(|d| d.as_millis() as u64).unwrap_or(0)
+}
+
+/// The record a component publishes after every cycle
+#[derive(Default, Clone)]
+pub struct StatusRecord {
+    pub state: u32,
+    pub cycle: u64,
+    pub last_poll_ms: u64,
+    pub latency_ms: u32,
+    pub events: u64,
+    pub errors: u64,
+    pub detail: String,
+}
+
+/// This component's slot in the coordinator's memory-mapped status board.
+///
+/// Publishing overwrites the slot in place under a sequence counter (odd while
+/// writing, even when done) so readers never see a torn record. It touches only
+/// mapped memory: no syscalls, locks or allocations on the polling path. When
+/// the coordinator didn't pass a board every publish is a no-op.
+pub struct StatusBoard {
+    map: Option<MmapMut>,
+    offset: usize,
+    pid: u32,
+}
+
+impl StatusBoard {
+    pub fn open(slot: usize) -> StatusBoard {
+        let map = match env::var(STATUS_BOARD_ENV) {
+            Ok(path) => match Self::map(&path, slot) {
+                Ok(map) => {
+                    info!("Publishing status to {} (slot {})", path, slot);
+                    Some(map)
+                }
+                Err(e) => {
+                    // Printed as well, so the coordinator shows and logs it
+                    println!("[{}] ❌ Status board {} unavailable, not publishing status: {}",
+                             Local::now().format("%Y-%m-%d %H:%M:%S"), path, e);
+                    error!("Status board {} unavailable: {}", path, e);
+                    None
+                }
+            },
+            Err(_) => None,
+        };
+        StatusBoard { map, offset: HEADER_SIZE + slot * SLOT_SIZE, pid: process::id() }
+    }
+
+    fn map(path: &str, slot: usize) -> io::Result<MmapMut> {
+        let file = OpenOptions::new().read(true).write(true).open(path)?;
+        // The coordinator creates the file at its final size and never truncates it while we run
+        let map = unsafe { MmapMut::map_mut(&file)? };
+        if map.len() < HEADER_SIZE || &map[0..8] != MAGIC {
+            return Err(io::Error::new(io::ErrorKind::InvalidData, "not a status board"));
+        }
+        let header_u32 = |offset: usize| u32::from_le_bytes([map[offset], map[offset + 1], map[offset + 2], map[offset + 3]]);
+        let (version, slots, slot_size, record_size) = (header_u32(8), header_u32(12), header_u32(16), header_u32(20));
+        if version != VERSION || slot_size as usize != SLOT_SIZE || record_size as usize != RECORD_SIZE {
+            return Err(io::Error::new(io::ErrorKind::InvalidData, format!(
+                "layout version {} (slot {} / record {} bytes), this build writes version {} ({} / {} bytes)",
+                version, slot_size, record_size, VERSION, SLOT_SIZE, RECORD_SIZE)));
+        }
+        if slot >= slots as usize || map.len() < HEADER_SIZE + (slot + 1) * SLOT_SIZE {
+            return Err(io::Error::new(io::ErrorKind::InvalidData, format!("no slot {} on the board", slot)));
+        }
+        Ok(map)
+    }
+
+    pub fn publish(&mut self, record: &StatusRecord) {
+        let map = match self.map.as_mut() {
+            Some(map) => map,
+            None => return,
+        };
+
+        // Serialize on the stack first so the slot is odd only for one copy
+        let mut buffer = [0u8; RECORD_SIZE];
+        buffer[0..4].copy_from_slice(&self.pid.to_le_bytes());
+        buffer[4..8].copy_from_slice(&record.state.to_le_bytes());
+        buffer[8..16].copy_from_slice(&now_ms().to_le_bytes());
+        buffer[16..24].copy_from_slice(&record.cycle.to_le_bytes());
+        buffer[24..32].copy_from_slice(&record.last_poll_ms.to_le_bytes());
+        buffer[32..36].copy_from_slice(&record.latency_ms.to_le_bytes());
+        buffer[40..48].copy_from_slice(&record.events.to_le_bytes());
+        buffer[48..56].copy_from_slice(&record.errors.to_le_bytes());
+        let mut detail_len = record.detail.len().min(DETAIL_SIZE);
+        while !record.detail.is_char_boundary(detail_len) {
+            detail_len -= 1;
+        }
+        buffer[56..56 + detail_len].copy_from_slice(&record.detail.as_bytes()[..detail_len]);
+
+        unsafe {
+            // The mapping is page aligned and slots are multiples of 8 bytes apart
+            let slot = map.as_mut_ptr().add(self.offset);
+            let seq = &*(slot as *const AtomicU64);
+            // Odd while writing; a writer that died mid-update left it odd already
+            let writing = seq.load(Ordering::Relaxed) | 1;
+            seq.store(writing, Ordering::Relaxed);
+            fence(Ordering::Release);
+            ptr::copy_nonoverlapping(buffer.as_ptr(), slot.add(8), RECORD_SIZE);
+            seq.store(writing + 1, Ordering::Release);
+        }
+    }
+}
@@ -1,6 +1,7 @@
 import asyncio
 from logger import logger
 from session_manager import run_session_manager
+from status_board import status, STATE_STOPPED
 
 async def main():
     """
@@ -26,3 +27,5 @@ if __name__ == "__main__":
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Process terminated by user")
+    finally:
+        status.publish(STATE_STOPPED, "finished")
@@ -17,6 +17,7 @@ from captcha import (
 )
 from cookies import save_all_cookies, check_for_cf_clearance
 from logger import logger
+from status_board import status, STATE_RUNNING
 
 
 async def run_session_manager(attempt, max_attempts, auto_close_browser):
@@ -34,11 +35,13 @@ async def run_session_manager(attempt, max_attempts, auto_close_browser):
 
     try:
         logger.info(f"Starting session manager attempt {attempt}/{max_attempts}")
+        status.start_attempt(attempt)
 
         # Setup the browser and prepare the page
         browser, tab = await setup_browser_environment()
         
         # Click buy button and handle Cloudflare challenge
+        status.publish(STATE_RUNNING, f"attempt {attempt}: solving Cloudflare challenge")
         await handle_buy_button_click(browser, tab)
         
         # Save cookies and handle browser closure
@@ -55,6 +58,7 @@ async def run_session_manager(attempt, max_attempts, auto_close_browser):
         logger.error(f"An error occurred: {e}")
         import traceback
         logger.error(traceback.format_exc())
+        status.finish_attempt(False)
         return False
 
     finally:
@@ -146,10 +150,12 @@ async def check_cookie_success(attempt, max_attempts, auto_close_browser):
     # Return true if we got the cookie
     if check_for_cf_clearance():
         logger.info("Successfully obtained cf_clearance cookie!")
+        status.finish_attempt(True)
         return True
         
     # If we get here, we failed to obtain the cookie
     logger.warning("Failed to obtain cf_clearance cookie")
+    status.finish_attempt(False)
     
     # Return if max attempts reached
     if attempt >= max_attempts:
@@ -0,0 +1,91 @@
+import mmap
+import os
+import struct
+import time
+from logger import logger
+
+# Writer for the cookie-prep slot of the coordinator's status board.
+# The layout is documented in coordinator/status_board.py; this copy (cookie-prep
+# runs on its own) and component-common/src/status_board.rs must match it.
+STATUS_BOARD_ENV = "NVIDIA_STATUS_BOARD"
+MAGIC = b"NVSTATB1"
+VERSION = 2
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+RECORD = struct.Struct("<IIQQQI4xQQ128s")
+SLOT_SIZE = 256
+DETAIL_SIZE = 128
+COOKIE_PREP_SLOT = 3
+
+STATE_STARTING, STATE_RUNNING, STATE_PAUSED, STATE_STOPPED = 1, 2, 3, 4
+
+
+class StatusPublisher:
+    """
+    Publishes the session manager's progress to the status board.
+    Does nothing when not started by the coordinator (NVIDIA_STATUS_BOARD unset).
+    """
+
+    def __init__(self):
+        self.attempt = 0
+        self.attempt_started = None
+        self.last_attempt_ms = 0
+        self.latency_ms = 0
+        self.cookies_saved = 0
+        self.failed_attempts = 0
+        self._map = None
+        self._offset = HEADER_SIZE + COOKIE_PREP_SLOT * SLOT_SIZE
+        self._seq = 0
+
+        path = os.environ.get(STATUS_BOARD_ENV)
+        if not path:
+            return
+        try:
+            with open(path, "r+b") as file:
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE)
+            magic, version, slots, slot_size, record_size = HEADER.unpack_from(mapping, 0)
+            if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE or record_size != RECORD.size \
+                    or slots <= COOKIE_PREP_SLOT:
+                logger.error(f"❌ Status board {path} has layout version {version} (slot {slot_size} / record "
+                             f"{record_size} bytes), this copy writes version {VERSION} ({SLOT_SIZE} / "
+                             f"{RECORD.size} bytes); not publishing status")
+                mapping.close()
+                return
+            self._map = mapping
+            # Continue after the previous run's sequence number (odd if it died mid-update)
+            self._seq = SEQ.unpack_from(mapping, self._offset)[0] | 1
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"❌ Status board unavailable: {e}")
+
+    def start_attempt(self, attempt):
+        self.attempt = attempt
+        self.attempt_started = time.time()
+        self.publish(STATE_RUNNING, f"attempt {attempt}: starting browser")
+
+    def finish_attempt(self, success):
+        if self.attempt_started is not None:
+            self.latency_ms = int((time.time() - self.attempt_started) * 1000)
+        self.last_attempt_ms = int(time.time() * 1000)
+        if success:
+            self.cookies_saved += 1
+        else:
+            self.failed_attempts += 1
+        self.publish(STATE_RUNNING, f"attempt {self.attempt}: {'cf_clearance obtained' if success else 'failed'}")
+
+    def publish(self, state, detail):
+        """Overwrite the cookie-prep record (seq odd while writing, even when done)"""
+        if self._map is None:
+            return
+        SEQ.pack_into(self._map, self._offset, self._seq)
+        RECORD.pack_into(
+            self._map, self._offset + SEQ.size,
+            os.getpid(), state, int(time.time() * 1000), self.attempt, self.last_attempt_ms,
+            self.latency_ms, self.cookies_saved, self.failed_attempts,
+            detail.encode("utf-8")[:DETAIL_SIZE],
+        )
+        SEQ.pack_into(self._map, self._offset, self._seq + 1)
+        self._seq += 2
+
+
+status = StatusPublisher()
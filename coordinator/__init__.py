@@ -0,0 +1,3 @@
+"""
+Supporting modules for nvidia_purchase_coordinator.py
+"""
@@ -0,0 +1,156 @@
+"""
+Local control socket for a running coordinator.
+
+Clients connect to a Unix socket, send one command line such as
+"pause scanner" or "set-interval early-warning 15", and receive one JSON line:
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}. Every connection
+is served on its own thread, and handlers only read or signal the live state
+(slow work such as a cookie refresh is started in the background), so a status
+request answers immediately whatever else is running.
+
+Unix sockets are not available on Windows; there the server logs a warning and
+does not start. `python -m coordinator.ctl` is the matching client.
+"""
+import inspect
+import json
+import logging
+import os
+import shlex
+import socket
+import threading
+
+logger = logging.getLogger("coordinator")
+
+DEFAULT_CONTROL_PATH = os.path.join("logs", "coordinator.sock")
+# Longest accepted command line
+MAX_COMMAND_BYTES = 4096
+CLIENT_TIMEOUT_SECS = 5
+
+
+class CommandError(Exception):
+    """Raised by a handler to reply with an error instead of a result"""
+
+
+class ControlServer:
+    """
+    Serves commands on a Unix socket.
+
+    Args:
+        path (str): Socket file; a stale one is replaced
+        handlers (dict): Command name -> callable taking the command's arguments
+            (strings) and returning a JSON-serializable result
+    """
+
+    def __init__(self, path=DEFAULT_CONTROL_PATH, handlers=None):
+        self.path = path
+        self.handlers = dict(handlers or {})
+        self.commands_served = 0
+
+    def run(self, shutdown_event):
+        """Thread function: accept connections until shutdown_event is set"""
+        if not hasattr(socket, "AF_UNIX"):
+            logger.warning("Control socket not available on this platform")
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.path)
+            # Only the user running the coordinator may control it
+            os.chmod(self.path, 0o600)
+            server.listen(8)
+            server.settimeout(1.0)
+            logger.info(f"Control socket listening on {self.path}")
+
+            while not shutdown_event.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                thread = threading.Thread(target=self._serve, args=(connection,), name="control-client")
+                thread.daemon = True
+                thread.start()
+        except OSError as e:
+            logger.error(f"Control socket error: {e}")
+        finally:
+            server.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _serve(self, connection):
+        with connection:
+            connection.settimeout(CLIENT_TIMEOUT_SECS)
+            try:
+                data = b""
+                while b"\n" not in data and len(data) < MAX_COMMAND_BYTES:
+                    chunk = connection.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                reply = self.execute(data.split(b"\n", 1)[0].decode("utf-8", errors="replace"))
+                connection.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+            except OSError as e:
+                logger.warning(f"Control client error: {e}")
+
+    def execute(self, line):
+        """
+        Run one command line.
+
+        Returns:
+            dict: The reply sent to the client
+        """
+        try:
+            parts = shlex.split(line)
+        except ValueError as e:
+            return {"ok": False, "error": f"Malformed command: {e}"}
+        if not parts:
+            return {"ok": False, "error": "Empty command"}
+
+        name, args = parts[0], parts[1:]
+        handler = self.handlers.get(name)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command '{name}' (known: {', '.join(sorted(self.handlers))})"}
+
+        # Checked up front, so a TypeError raised inside a handler is reported as the bug it is
+        try:
+            inspect.signature(handler).bind(*args)
+        except TypeError:
+            return {"ok": False, "error": f"Wrong arguments for '{name}'"}
+
+        self.commands_served += 1
+        if name != "status":
+            logger.info(f"Control command: {line.strip()}")
+        try:
+            return {"ok": True, "result": handler(*args)}
+        except CommandError as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Control command '{name}' failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+
+def send_control_command(line, path=DEFAULT_CONTROL_PATH, timeout=CLIENT_TIMEOUT_SECS):
+    """
+    Send one command to a running coordinator.
+
+    Returns:
+        dict: The coordinator's reply
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(line.encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode("utf-8"))
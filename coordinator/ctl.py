@@ -0,0 +1,45 @@
+"""
+Client for the coordinator's control socket.
+
+    python -m coordinator.ctl status
+    python -m coordinator.ctl refresh-cookies
+    python -m coordinator.ctl pause scanner
+    python -m coordinator.ctl resume scanner
+    python -m coordinator.ctl set-interval scanner 8000 [1000]
+    python -m coordinator.ctl set-interval early-warning 15
+    python -m coordinator.ctl reload-config [scanner|early-warning]
+    python -m coordinator.ctl dump-metrics
+"""
+import argparse
+import json
+import shlex
+import sys
+
+from coordinator.control import DEFAULT_CONTROL_PATH, send_control_command
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control a running NVIDIA purchase coordinator")
+    parser.add_argument("--socket", default=DEFAULT_CONTROL_PATH,
+                        help="Control socket path (relative to the coordinator's working directory)")
+    parser.add_argument("command", help="Command name, e.g. status")
+    parser.add_argument("args", nargs="*", help="Command arguments")
+    args = parser.parse_args(argv)
+
+    line = " ".join(shlex.quote(part) for part in [args.command, *args.args])
+    try:
+        reply = send_control_command(line, args.socket)
+    except (OSError, ValueError) as e:
+        print(f"Could not reach the coordinator at {args.socket}: {e}", file=sys.stderr)
+        return 2
+
+    if not reply.get("ok"):
+        print(f"Error: {reply.get('error')}", file=sys.stderr)
+        return 1
+    result = reply.get("result")
+    print(result if isinstance(result, str) else json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Drop-window analytics.
+
+Drops tend to cluster on certain weekdays and times of day. This module streams
+past availability and SKU-change events out of coordinator.log and the
+early-warning logs, counts on how many distinct days each (weekday, time slot)
+saw an event, and keeps the slots with a high enough probability as the drop
+window schedule. Shortly before each window the coordinator pre-arms (fresh
+cookies, fast polling); after the window it records whether an event actually
+happened, which gives the hit rate of the predictions.
+
+Print the schedule mined from the logs:
+
+    python -m coordinator.drop_windows
+"""
+import argparse
+import collections
+import glob
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("coordinator")
+
+SLOT_MINUTES = 30
+DEFAULT_PREARM_MINUTES = 10
+# A slot becomes a window when it saw events on this many distinct days...
+MIN_OCCURRENCES = 2
+# ...and on at least this share of the matching weekdays in the log history
+MIN_PROBABILITY = 0.25
+SCHEDULE_REBUILD_HOURS = 24
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Lowercase substrings identifying drop-related events in log lines
+EVENT_PATTERNS = {
+    "found available product": "available",
+    "launching purchase": "available",
+    "sku change detected": "sku_change",
+    "differs from reference": "reference_diff",
+}
+
+# coordinator.log lines start with "2025-01-30 14:03:22,123 - ...",
+# early-warning lines with "[2025-01-30 14:03:22] [WARN] ..."
+TIMESTAMP_RE = re.compile(r"^\[?(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+
+DropWindow = collections.namedtuple("DropWindow", ["weekday", "start_minute", "occurrences", "probability"])
+
+
+def default_log_paths(base_dir, early_warning_dir):
+    """Return the coordinator and early-warning log files to mine"""
+    return (sorted(glob.glob(os.path.join(base_dir, "coordinator.log*")))
+            + sorted(glob.glob(os.path.join(early_warning_dir, "logs", "nvidia-monitor_*.log"))))
+
+
+def classify(line):
+    """Return the event kind of a log line, or None"""
+    lower_line = line.lower()
+    for pattern, kind in EVENT_PATTERNS.items():
+        if pattern in lower_line:
+            return kind
+    return None
+
+
+def mine_events(paths):
+    """
+    Stream drop-related events out of log files, one line at a time.
+
+    Args:
+        paths (list): Log files to read
+
+    Yields:
+        tuple: (datetime, kind)
+    """
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as file:
+                for line in file:
+                    kind = classify(line)
+                    if kind is None:
+                        continue
+                    match = TIMESTAMP_RE.match(line)
+                    if match:
+                        yield datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S"), kind
+        except OSError as e:
+            logger.warning(f"Could not read {path} for drop-window analytics: {e}")
+
+
+def build_schedule(events, slot_minutes=SLOT_MINUTES, min_occurrences=MIN_OCCURRENCES,
+                   min_probability=MIN_PROBABILITY):
+    """
+    Turn events into a schedule of high-probability drop windows.
+
+    An event is counted once per day and slot, so repeated log lines (and the same
+    event in both logs) don't inflate a slot.
+
+    Returns:
+        list: DropWindow entries sorted by weekday and start time
+    """
+    days_per_slot = collections.defaultdict(set)
+    first_day = last_day = None
+    for when, _ in events:
+        day = when.date()
+        slot = (when.hour * 60 + when.minute) // slot_minutes * slot_minutes
+        days_per_slot[(when.weekday(), slot)].add(day)
+        first_day = day if first_day is None else min(first_day, day)
+        last_day = day if last_day is None else max(last_day, day)
+
+    if first_day is None:
+        return []
+
+    # How often each weekday occurred in the observed span
+    weekday_counts = collections.Counter()
+    day = first_day
+    while day <= last_day:
+        weekday_counts[day.weekday()] += 1
+        day += timedelta(days=1)
+
+    schedule = []
+    for (weekday, slot), days in days_per_slot.items():
+        probability = len(days) / weekday_counts[weekday]
+        if len(days) >= min_occurrences and probability >= min_probability:
+            schedule.append(DropWindow(weekday, slot, len(days), round(probability, 2)))
+    return sorted(schedule)
+
+
+def format_window(window, slot_minutes=SLOT_MINUTES):
+    start = f"{window.start_minute // 60:02d}:{window.start_minute % 60:02d}"
+    end_minute = window.start_minute + slot_minutes
+    end = f"{end_minute // 60 % 24:02d}:{end_minute % 60:02d}"
+    return f"{WEEKDAYS[window.weekday]} {start}-{end} (p={window.probability:.0%}, {window.occurrences} days)"
+
+
+class DropWindowPlanner:
+    """
+    Pre-arms the system before scheduled drop windows and tracks the hit rate.
+
+    Args:
+        log_paths (callable): Returns the log files to mine
+        prearm_minutes (float): How long before a window to pre-arm
+        slot_minutes (int): Length of a window
+    """
+
+    def __init__(self, log_paths, prearm_minutes=DEFAULT_PREARM_MINUTES, slot_minutes=SLOT_MINUTES):
+        self.log_paths = log_paths
+        self.prearm_secs = prearm_minutes * 60
+        self.slot_minutes = slot_minutes
+        self.schedule = []
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._active = None  # (start, end) of the armed window
+        self._active_hit = False
+        self.predictions = 0
+        self.hits = 0
+        self.events = 0
+        self.events_in_windows = 0
+
+    def rebuild(self):
+        """Mine the logs again and replace the schedule"""
+        started = time.monotonic()
+        schedule = build_schedule(mine_events(self.log_paths()), self.slot_minutes)
+        with self._lock:
+            self.schedule = schedule
+            self.built_at = datetime.now()
+        logger.info(f"Drop-window schedule built in {time.monotonic() - started:.1f}s: "
+                    f"{', '.join(format_window(w, self.slot_minutes) for w in schedule) or 'no windows'}")
+
+    def next_window(self, now):
+        """
+        Return the next window that has not ended yet.
+
+        Returns:
+            tuple: (start, end, DropWindow), or None if the schedule is empty
+        """
+        with self._lock:
+            schedule = list(self.schedule)
+        best = None
+        for window in schedule:
+            days_ahead = (window.weekday - now.weekday()) % 7
+            start = (datetime.combine(now.date(), datetime.min.time())
+                     + timedelta(days=days_ahead, minutes=window.start_minute))
+            end = start + timedelta(minutes=self.slot_minutes)
+            if end <= now:
+                start += timedelta(days=7)
+                end += timedelta(days=7)
+            if best is None or start < best[0]:
+                best = (start, end, window)
+        return best
+
+    def record_event(self, kind):
+        """Record a live drop-related event (called from the output readers)"""
+        now = datetime.now()
+        with self._lock:
+            self.events += 1
+            if self._active is not None and self._active[0] <= now < self._active[1]:
+                self.events_in_windows += 1
+                self._active_hit = True
+
+    def run(self, prearm, shutdown_event):
+        """
+        Loop pre-arming before every window and scoring it afterwards.
+
+        Args:
+            prearm (callable): Called with (DropWindow, start) shortly before a window
+            shutdown_event (threading.Event): Stops the loop when set
+        """
+        self.rebuild()
+        while not shutdown_event.is_set():
+            if datetime.now() - self.built_at > timedelta(hours=SCHEDULE_REBUILD_HOURS):
+                self.rebuild()
+
+            upcoming = self.next_window(datetime.now())
+            if upcoming is None:
+                shutdown_event.wait(SCHEDULE_REBUILD_HOURS * 3600)
+                continue
+            start, end, window = upcoming
+
+            prearm_at = start - timedelta(seconds=self.prearm_secs)
+            if shutdown_event.wait(max(0.0, (prearm_at - datetime.now()).total_seconds())):
+                return
+
+            logger.info(f"Pre-arming for drop window {format_window(window, self.slot_minutes)}")
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 🎯 Pre-arming for drop window "
+                  f"{format_window(window, self.slot_minutes)}")
+            with self._lock:
+                self._active = (start, end)
+                self._active_hit = False
+            try:
+                prearm(window, start)
+            except Exception as e:
+                logger.error(f"Error pre-arming for drop window: {e}")
+
+            if shutdown_event.wait(max(0.0, (end - datetime.now()).total_seconds())):
+                return
+
+            with self._lock:
+                hit = self._active_hit
+                self._active = None
+                self.predictions += 1
+                self.hits += hit
+                hit_rate = self.hits / self.predictions
+            logger.info(f"Drop window {format_window(window, self.slot_minutes)} was a "
+                        f"{'hit' if hit else 'miss'} (hit rate {self.hits}/{self.predictions} = {hit_rate:.0%})")
+
+    def metrics(self):
+        """
+        Return the schedule and prediction statistics.
+
+        Returns:
+            dict: Schedule, hit rate and event counters
+        """
+        upcoming = self.next_window(datetime.now())
+        with self._lock:
+            return {
+                "windows": [format_window(w, self.slot_minutes) for w in self.schedule],
+                "next_window": upcoming[0].isoformat(sep=" ", timespec="minutes") if upcoming else None,
+                "predictions": self.predictions,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.predictions, 2) if self.predictions else None,
+                "events": self.events,
+                "events_in_windows": self.events_in_windows,
+            }
+
+
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Mine drop windows from the coordinator and early-warning logs")
+    parser.add_argument("paths", nargs="*", help="Log files (default: coordinator.log and early-warning logs)")
+    parser.add_argument("--slot-minutes", type=int, default=SLOT_MINUTES, help="Length of a time slot")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or default_log_paths(base_dir, os.path.join(base_dir, "early-warning"))
+    schedule = build_schedule(mine_events(paths), args.slot_minutes)
+    print(f"Mined {len(paths)} log file(s)")
+    if not schedule:
+        print("No drop windows found")
+    for window in schedule:
+        print(format_window(window, args.slot_minutes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Always-on flight recorder for child output and coordinator events.
+
+Every line of scanner, early-warning and cookie-prep output, and every
+coordinator log record, is copied into a fixed-size ring of pre-allocated
+slots: one bytearray slab holding the (truncated) UTF-8 text and parallel
+arrays for time, length and source. Recording a line allocates nothing beyond
+its encoded bytes, and memory stays constant however long the coordinator runs.
+
+On an incident (product available, failed purchase, component crash, operator
+request) the last `window_minutes` of the ring are written to a snapshot file,
+so coordinator.log can stay terse while the full context of every incident is
+still kept.
+"""
+import logging
+import os
+import threading
+import time
+from array import array
+from datetime import datetime
+
+logger = logging.getLogger("coordinator")
+
+DEFAULT_FLIGHT_DIR = os.path.join("logs", "flight")
+DEFAULT_WINDOW_MINUTES = 10
+# 16384 slots of 384 bytes (6 MiB) hold well over 10 minutes of output at the fast polling rate
+DEFAULT_SLOTS = 16384
+SLOT_BYTES = 384
+# The same kind of incident (e.g. a product staying available) is dumped at most this often
+MIN_DUMP_INTERVAL_SECS = 60
+
+
+class FlightRecorder:
+    """
+    Ring buffer of recent lines with snapshot dumps.
+
+    Args:
+        directory (str): Where snapshots are written
+        window_minutes (float): How much history a snapshot contains
+        slots (int): Number of lines the ring holds
+        slot_bytes (int): Bytes kept per line; longer lines are truncated
+    """
+
+    def __init__(self, directory=DEFAULT_FLIGHT_DIR, window_minutes=DEFAULT_WINDOW_MINUTES,
+                 slots=DEFAULT_SLOTS, slot_bytes=SLOT_BYTES):
+        self.directory = directory
+        self.window_secs = window_minutes * 60
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._slab = bytearray(slots * slot_bytes)
+        self._times = array("d", bytes(8 * slots))
+        self._lengths = array("H", bytes(2 * slots))
+        self._sources = array("B", bytes(slots))
+        self._source_names = []
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._last_dump = {}
+        self._dump_requested = threading.Event()
+        self._dump_reason = None
+        self.dumps_written = 0
+
+    def source(self, name):
+        """
+        Register a source name once.
+
+        Returns:
+            int: The id to pass to record()
+        """
+        with self._lock:
+            if name not in self._source_names:
+                self._source_names.append(name)
+            return self._source_names.index(name)
+
+    def record(self, source_id, line):
+        """Copy one line into the ring, overwriting the oldest one when full"""
+        data = line.encode("utf-8", errors="replace")[:self.slot_bytes]
+        now = time.time()
+        with self._lock:
+            slot = self._next
+            start = slot * self.slot_bytes
+            self._slab[start:start + len(data)] = data
+            self._times[slot] = now
+            self._lengths[slot] = len(data)
+            self._sources[slot] = source_id
+            self._next = (slot + 1) % self.slots
+            self._count = min(self._count + 1, self.slots)
+
+    def _copy_window(self):
+        """Return (time, source, bytes) of the lines within the window, oldest first"""
+        cutoff = time.time() - self.window_secs
+        # Copy the raw buffers under the lock (a few memcpys) and decode outside it
+        with self._lock:
+            slab = bytes(self._slab)
+            times, lengths, sources = array("d", self._times), array("H", self._lengths), array("B", self._sources)
+            first = (self._next - self._count) % self.slots
+            count = self._count
+            names = list(self._source_names)
+
+        entries = []
+        for i in range(count):
+            slot = (first + i) % self.slots
+            if times[slot] < cutoff:
+                continue
+            start = slot * self.slot_bytes
+            entries.append((times[slot], sources[slot], slab[start:start + lengths[slot]]))
+        return entries, names
+
+    def dump(self, reason):
+        """
+        Write the current window to a snapshot file.
+
+        Returns:
+            str: Path of the snapshot
+        """
+        entries, names = self._copy_window()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.directory, f"flight_{stamp}_{reason.replace(' ', '_')}.log")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"# {reason}: {len(entries)} lines from the last {self.window_secs / 60:g} minutes\n")
+            for when, source, data in entries:
+                timestamp = datetime.fromtimestamp(when).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                file.write(f"{timestamp} [{names[source]}] {data.decode('utf-8', errors='replace')}\n")
+        self.dumps_written += 1
+        logger.info(f"Flight recorder snapshot ({reason}) written to {path}")
+        return path
+
+    def trigger(self, reason):
+        """
+        Dump in the background, unless the same reason was dumped within MIN_DUMP_INTERVAL_SECS.
+
+        Returns:
+            bool: True if a dump was started
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_dump.get(reason, -MIN_DUMP_INTERVAL_SECS) < MIN_DUMP_INTERVAL_SECS:
+                return False
+            self._last_dump[reason] = now
+        thread = threading.Thread(target=self._dump_safely, args=(reason,), name="flight-dump")
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def request_dump(self, reason="signal"):
+        """Ask run() for a dump; safe to call from a signal handler, unlike trigger() which takes the ring's lock"""
+        self._dump_reason = reason
+        self._dump_requested.set()
+
+    def run(self, shutdown_event):
+        """Thread function: write the dumps asked for with request_dump() until shutdown_event is set"""
+        while not shutdown_event.is_set():
+            if not self._dump_requested.wait(1):
+                continue
+            self._dump_requested.clear()
+            self._dump_safely(self._dump_reason or "request")
+
+    def _dump_safely(self, reason):
+        try:
+            self.dump(reason)
+        except OSError as e:
+            logger.error(f"Failed to write flight recorder snapshot: {e}")
+
+    def metrics(self):
+        """Return ring usage and dump counts"""
+        with self._lock:
+            count = self._count
+            oldest = self._times[(self._next - count) % self.slots] if count else None
+        return {
+            "lines": count,
+            "slots": self.slots,
+            "covered_secs": round(time.time() - oldest) if oldest else 0,
+            "dumps_written": self.dumps_written,
+        }
+
+
+class FlightRecorderHandler(logging.Handler):
+    """
+    Logging handler that copies coordinator log records into the flight recorder.
+
+    Args:
+        recorder (FlightRecorder): The recorder
+        source_name (str): Source name of the records
+        skip_prefixes (tuple): Messages starting with these (e.g. echoed child output that
+            is recorded separately) are left out
+    """
+
+    def __init__(self, recorder, source_name="coordinator", skip_prefixes=()):
+        super().__init__()
+        self.recorder = recorder
+        self.source_id = recorder.source(source_name)
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if message.startswith(self.skip_prefixes):
+                return
+            self.recorder.record(self.source_id, f"{record.levelname} {message}")
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,305 @@
+"""
+Change-only history of what the pollers observe.
+
+The scanner and the early-warning monitor report every inventory state and
+retailer SKU set they parse as "@@observe <kind> <key> <json>" lines. The
+coordinator normalizes each state and only stores it when it differs from the
+last state stored for the same (kind, key), so the database grows with the
+number of changes rather than the number of polls. Rows are written in batches
+by a background thread and never on the output reader threads.
+
+Query the store from the command line:
+
+    python -m coordinator.history sku-changes --days 30
+    python -m coordinator.history active-duration --sku 5090 --date 2025-01-30
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("coordinator")
+
+DEFAULT_HISTORY_PATH = os.path.join("logs", "history.sqlite3")
+
+# A batch is committed when it reaches this many rows or this age, whichever comes first
+BATCH_MAX_ROWS = 100
+BATCH_MAX_SECS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    detected_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_kind_key ON observations (kind, key, detected_at);
+CREATE INDEX IF NOT EXISTS observations_detected_at ON observations (detected_at);
+"""
+
+
+def normalize_state(state):
+    """Return the canonical JSON text of a state, so equal states compare equal"""
+    return json.dumps(state, sort_keys=True, separators=(",", ":"))
+
+
+def connect(path):
+    """Open the history database, creating it and its schema if needed"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class HistoryStore:
+    """
+    Deduplicates observed states in memory and writes changes to SQLite in batches.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.observations = 0
+        self.changes = 0
+        self.rows_written = 0
+        self.batches_written = 0
+
+        # Resume from the last stored state of every key so a restart doesn't duplicate rows
+        conn = connect(path)
+        try:
+            rows = conn.execute(
+                "SELECT kind, key, state FROM observations WHERE id IN "
+                "(SELECT MAX(id) FROM observations GROUP BY kind, key)"
+            ).fetchall()
+        finally:
+            conn.close()
+        self._last_states = {(kind, key): state for kind, key, state in rows}
+
+    def observe(self, source, kind, key, state):
+        """
+        Record an observed state. Only queues a row if the state changed.
+
+        Args:
+            source (str): Component that observed the state
+            kind (str): Kind of state, e.g. "inventory" or "retailer_skus"
+            key (str): What the state belongs to, e.g. "PROFESHOP5090_DE/DE"
+            state: JSON-compatible state
+
+        Returns:
+            bool: True if the state changed and will be stored
+        """
+        normalized = normalize_state(state)
+        with self._lock:
+            self.observations += 1
+            if self._last_states.get((kind, key)) == normalized:
+                return False
+            self._last_states[(kind, key)] = normalized
+            self.changes += 1
+
+        detected_at = datetime.now().isoformat(sep=" ", timespec="seconds")
+        self._queue.put((detected_at, source, kind, key, normalized))
+        logger.info(f"History: {kind} {key} changed ({source}): {normalized}")
+        return True
+
+    def run(self, shutdown_event):
+        """
+        Writer loop committing queued rows in batches; runs until stop().
+
+        shutdown_event doesn't end the loop: @@observe lines are still printed while the
+        pollers stop, and stop() is only called after them.
+        """
+        conn = connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                row = self._queue.get()
+                batch = []
+                deadline = time.monotonic() + BATCH_MAX_SECS
+                while True:
+                    if row is None:
+                        # Sentinel from stop(): flush and exit
+                        stopping = True
+                        break
+                    batch.append(row)
+                    if len(batch) >= BATCH_MAX_ROWS:
+                        break
+                    try:
+                        row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write(conn, batch)
+
+            # Rows queued by reader threads that were still finishing when stop() was called
+            batch = []
+            while True:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is not None:
+                    batch.append(row)
+            if batch:
+                self._write(conn, batch)
+        finally:
+            conn.close()
+            self._stopped.set()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO observations (detected_at, source, kind, key, state) VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(batch)} history rows: {e}")
+
+    def stop(self, timeout=5):
+        """Ask the writer to flush pending rows and exit, waiting up to timeout seconds"""
+        self._queue.put(None)
+        self._stopped.wait(timeout)
+
+    def metrics(self):
+        """
+        Return write statistics.
+
+        Returns:
+            dict: Observation, change and write counters
+        """
+        return {
+            "observations": self.observations,
+            "changes": self.changes,
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "pending": self._queue.qsize(),
+        }
+
+
+def sku_changes(conn, days):
+    """
+    Return every change of a retailer SKU set in the last `days` days.
+
+    Returns:
+        list: (detected_at, source, key, added, removed) tuples, oldest first
+    """
+    since = (datetime.now() - timedelta(days=days)).isoformat(sep=" ", timespec="seconds")
+    rows = conn.execute(
+        "SELECT detected_at, source, key, state, "
+        "(SELECT p.state FROM observations p WHERE p.kind = o.kind AND p.key = o.key AND p.id < o.id "
+        "ORDER BY p.id DESC LIMIT 1) "
+        "FROM observations o WHERE kind = 'retailer_skus' AND detected_at >= ? ORDER BY id",
+        (since,),
+    ).fetchall()
+
+    changes = []
+    for detected_at, source, key, state, previous in rows:
+        skus = set(json.loads(state))
+        previous_skus = set(json.loads(previous)) if previous else set()
+        changes.append((detected_at, source, key, sorted(skus - previous_skus), sorted(previous_skus - skus)))
+    return changes
+
+
+def active_duration(conn, sku, date):
+    """
+    Return how long each inventory entry matching `sku` had is_active "true" on `date`.
+
+    Args:
+        sku (str): Substring of the inventory key, e.g. "5090"
+        date (datetime.date): Local calendar day
+
+    Returns:
+        dict: Inventory key to timedelta
+    """
+    day_start = datetime.combine(date, datetime.min.time())
+    day_end = min(day_start + timedelta(days=1), datetime.now())
+    start_text = day_start.isoformat(sep=" ", timespec="seconds")
+    end_text = day_end.isoformat(sep=" ", timespec="seconds")
+
+    keys = [row[0] for row in conn.execute(
+        "SELECT DISTINCT key FROM observations WHERE kind = 'inventory' AND key LIKE ?", (f"%{sku}%",)
+    )]
+
+    durations = {}
+    for key in keys:
+        # The state in effect at the start of the day, followed by every change during it
+        rows = conn.execute(
+            "SELECT detected_at, state FROM observations WHERE kind = 'inventory' AND key = ? AND detected_at < ? "
+            "ORDER BY id DESC LIMIT 1",
+            (key, start_text),
+        ).fetchall()
+        rows += conn.execute(
+            "SELECT detected_at, state FROM observations WHERE kind = 'inventory' AND key = ? "
+            "AND detected_at >= ? AND detected_at < ? ORDER BY id",
+            (key, start_text, end_text),
+        ).fetchall()
+
+        total = timedelta()
+        for i, (detected_at, state) in enumerate(rows):
+            if json.loads(state).get("is_active") != "true":
+                continue
+            begin = max(datetime.fromisoformat(detected_at), day_start)
+            end = datetime.fromisoformat(rows[i + 1][0]) if i + 1 < len(rows) else day_end
+            if end > begin:
+                total += end - begin
+        durations[key] = total
+    return durations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the coordinator's observation history")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH, help="History database file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    changes_parser = subparsers.add_parser("sku-changes", help="List retailer SKU set changes")
+    changes_parser.add_argument("--days", type=float, default=30, help="How many days to look back")
+
+    duration_parser = subparsers.add_parser("active-duration", help="How long a SKU was active on a day")
+    duration_parser.add_argument("--sku", required=True, help="SKU or part of it, e.g. 5090")
+    duration_parser.add_argument("--date", required=True, help="Day in YYYY-MM-DD format")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"History database not found: {args.db}")
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.command == "sku-changes":
+            changes = sku_changes(conn, args.days)
+            if not changes:
+                print(f"No SKU changes in the last {args.days:g} days")
+            for detected_at, source, key, added, removed in changes:
+                diff = " ".join([f"+{sku}" for sku in added] + [f"-{sku}" for sku in removed])
+                print(f"{detected_at}  {key:<8} {source:<14} {diff or '(unchanged)'}")
+        else:
+            date = datetime.strptime(args.date, "%Y-%m-%d").date()
+            durations = active_duration(conn, args.sku, date)
+            if not durations:
+                print(f"No inventory history for SKU matching '{args.sku}'")
+            for key, duration in sorted(durations.items()):
+                print(f"{key}: is_active true for {duration} on {args.date}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Per-minute summaries of the scanner's request latency for coordinator.log.
+
+coordinator.log leaves the scanner's per-request response lines out unless
+--full-log is set. The coordinator's scanner output thread feeds every line
+to a LatencySummary and logs the one summary line per minute it returns, which
+`python -m coordinator.log_index latency` reads back.
+"""
+import re
+import statistics
+from datetime import datetime
+
+# Per-request latency printed by the scanner
+SCANNER_LATENCY_RE = re.compile(r"Server response \([^,]+, (\d+) ms")
+# The summary line written by LatencySummary
+SCANNER_LATENCY_SUMMARY_RE = re.compile(
+    r"Scanner latency \(minute \d\d:\d\d\): (\d+) requests, median (\d+) ms, max (\d+) ms")
+
+
+class LatencySummary:
+    """Collects scanner response latencies for one summary line per minute"""
+
+    def __init__(self):
+        self._minute = None
+        self._latencies = []
+
+    def add(self, line, now=None):
+        """
+        Record the latency of a scanner response line.
+
+        Returns:
+            str: Summary of the previous minute once a new minute starts, else None
+        """
+        match = SCANNER_LATENCY_RE.search(line)
+        if match is None:
+            return None
+        minute = (now or datetime.now()).strftime("%H:%M")
+        summary = self.flush() if minute != self._minute else None
+        self._minute = minute
+        self._latencies.append(int(match.group(1)))
+        return summary
+
+    def flush(self):
+        """Return the summary of the collected latencies (None if there are none) and start over"""
+        latencies, self._latencies = self._latencies, []
+        if not latencies:
+            return None
+        return (f"Scanner latency (minute {self._minute}): {len(latencies)} requests, "
+                f"median {statistics.median(latencies):.0f} ms, max {max(latencies)} ms")
@@ -0,0 +1,352 @@
+"""
+Indexed offline queries over coordinator.log and the early-warning logs.
+
+The logs are streamed once into a compact sidecar index (logs/.logindex/ next
+to each log directory): the byte offset of the first line of every minute, and
+postings (minute, offset) for availability, purchase, SKU change, cookie
+refresh and error lines. Queries seek straight to the relevant offsets instead
+of scanning. Re-running a query only indexes what was appended since; a log
+segment is identified by a hash of its first bytes, so a rotated segment
+(coordinator.log -> coordinator.log.1) keeps its index.
+
+    python -m coordinator.log_index update
+    python -m coordinator.log_index events --from "2025-10-03 14:02" --to "2025-10-03 14:05"
+    python -m coordinator.log_index events --type purchase --from 2025-10-03
+    python -m coordinator.log_index latency --window 5
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+from datetime import datetime, timedelta
+
+from coordinator.drop_windows import TIMESTAMP_RE, default_log_paths
+from coordinator.latency_summary import SCANNER_LATENCY_RE, SCANNER_LATENCY_SUMMARY_RE
+
+INDEX_DIR_NAME = ".logindex"
+INDEX_VERSION = 1
+# Bytes hashed to recognize a log segment, also after it was renamed by rotation
+FINGERPRINT_BYTES = 1024
+
+# Lowercase substrings per event type; a line can belong to several types
+EVENT_PATTERNS = {
+    "availability": ("found available product", "is available"),
+    "purchase": ("launching purchase", "purchase process completed", "purchase attempt failed",
+                 "all purchase attempts failed"),
+    "sku_change": ("sku change detected", "differs from reference"),
+    "cookie_refresh": ("running cookie-prep session manager", "refreshing cookies", "cookie refresh"),
+    "error": (" - error - ", "[error]", "❌"),
+}
+
+# Per-request latency printed by the early-warning monitor (the scanner's is in latency_summary)
+EARLY_WARNING_LATENCY_RE = re.compile(r"Response time: ([\d.]+)s")
+
+def minute_key(when):
+    """Return a sortable integer for the minute containing `when`"""
+    return when.toordinal() * 1440 + when.hour * 60 + when.minute
+
+
+def parse_time(text):
+    """Parse "YYYY-MM-DD", "YYYY-MM-DD HH:MM" or "YYYY-MM-DD HH:MM:SS" """
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid time: {text}")
+
+
+def line_time(line):
+    match = TIMESTAMP_RE.match(line)
+    return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S") if match else None
+
+
+def classify(lower_line):
+    return [event for event, patterns in EVENT_PATTERNS.items() if any(p in lower_line for p in patterns)]
+
+
+def fingerprint(path):
+    with open(path, "rb") as file:
+        head = file.read(FINGERPRINT_BYTES)
+    return hashlib.sha1(head).hexdigest(), len(head)
+
+
+class LogIndex:
+    """
+    Index of one log segment.
+
+    Args:
+        path (str): Log file
+        data (dict): Stored index, or None for a new one
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        data = data or {}
+        self.indexed_size = data.get("size", 0)
+        self.last_minute = data.get("last_minute")
+        self.buckets = data.get("buckets", [])  # [[minute, offset], ...]
+        self.postings = {event: data.get("postings", {}).get(event, []) for event in EVENT_PATTERNS}
+        self._minutes = [minute for minute, _ in self.buckets]
+
+    def to_dict(self, identity):
+        return {
+            "version": INDEX_VERSION,
+            "fingerprint": identity[0],
+            "fingerprint_len": identity[1],
+            "size": self.indexed_size,
+            "last_minute": self.last_minute,
+            "buckets": self.buckets,
+            "postings": self.postings,
+        }
+
+    def update(self):
+        """
+        Index lines appended since the last update. Only complete lines are indexed.
+
+        Returns:
+            int: Number of bytes indexed
+        """
+        start = self.indexed_size
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            offset = start
+            for raw_line in file:
+                if not raw_line.endswith(b"\n"):
+                    break  # still being written
+                line = raw_line.decode("utf-8", errors="replace")
+                when = line_time(line)
+                if when is not None:
+                    minute = minute_key(when)
+                    if self.last_minute is None or minute > self.last_minute:
+                        self.buckets.append([minute, offset])
+                        self._minutes.append(minute)
+                        self.last_minute = minute
+                if self.last_minute is not None:
+                    for event in classify(line.lower()):
+                        self.postings[event].append([self.last_minute, offset])
+                offset += len(raw_line)
+        self.indexed_size = offset
+        return offset - start
+
+    def offset_at(self, when):
+        """Return the offset of the first line at or after `when`'s minute (None if past the end)"""
+        i = bisect.bisect_left(self._minutes, minute_key(when))
+        return self.buckets[i][1] if i < len(self.buckets) else None
+
+    def read_range(self, start, end):
+        """Yield (time, line) for lines between start and end, seeking via the buckets"""
+        offset = self.offset_at(start)
+        if offset is None:
+            return
+        current = None
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            while file.tell() < self.indexed_size:
+                line = file.readline().decode("utf-8", errors="replace").rstrip("\n")
+                current = line_time(line) or current
+                if current is None or current < start:
+                    continue
+                if current > end:
+                    return
+                yield current, line
+
+    def read_at(self, offset):
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            return file.readline().decode("utf-8", errors="replace").rstrip("\n")
+
+
+def index_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), INDEX_DIR_NAME)
+
+
+def load_index(path):
+    """
+    Load (and incrementally update) the index for a log segment.
+
+    Returns:
+        LogIndex: The up-to-date index
+    """
+    identity = fingerprint(path)
+    directory = index_dir(path)
+    os.makedirs(directory, exist_ok=True)
+
+    data = None
+    stored_path = os.path.join(directory, f"{identity[0]}.json")
+    if os.path.exists(stored_path):
+        with open(stored_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != INDEX_VERSION or data.get("size", 0) > os.path.getsize(path):
+            data = None  # truncated, or an old index format
+
+    index = LogIndex(path, data)
+    if index.update() or data is None:
+        # A segment shorter than FINGERPRINT_BYTES gets a new identity as it grows
+        identity = fingerprint(path)
+        stored_path = os.path.join(directory, f"{identity[0]}.json")
+        tmp_path = stored_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(index.to_dict(identity), file, separators=(",", ":"))
+        os.replace(tmp_path, stored_path)
+    return index
+
+
+def prune_indexes(paths):
+    """
+    Remove index files whose log segment no longer exists.
+
+    Every file next to the queried logs counts, not just the queried ones, so a
+    query with --log keeps the indexes of the other (e.g. rotated) segments.
+    """
+    for directory in {index_dir(path) for path in paths}:
+        log_dir = os.path.dirname(directory)
+        live = set()
+        for name in os.listdir(log_dir):
+            path = os.path.join(log_dir, name)
+            if os.path.isfile(path):
+                try:
+                    live.add(f"{fingerprint(path)[0]}.json")
+                except OSError:
+                    continue
+        for name in os.listdir(directory):
+            if name.endswith(".json") and name not in live:
+                os.remove(os.path.join(directory, name))
+
+
+def load_all(paths):
+    indexes = [load_index(path) for path in paths if os.path.exists(path)]
+    prune_indexes([index.path for index in indexes])
+    return indexes
+
+
+def query_events(indexes, start, end, event=None):
+    """
+    Return log lines between start and end, optionally only those of one event type.
+
+    Returns:
+        list: (time, path, line) sorted by time
+    """
+    results = []
+    for index in indexes:
+        if event is None:
+            results.extend((when, index.path, line) for when, line in index.read_range(start, end))
+            continue
+        for minute, offset in index.postings[event]:
+            if minute_key(start) <= minute <= minute_key(end):
+                line = index.read_at(offset)
+                when = line_time(line)
+                if when is None or start <= when <= end:
+                    results.append((when or start, index.path, line))
+    return sorted(results, key=lambda result: result[0])
+
+
+def parse_latency(text):
+    """
+    Parse the request latency of one log line.
+
+    Returns:
+        tuple: (requests, median ms, max ms, from the scanner) or None
+    """
+    match = SCANNER_LATENCY_RE.search(text)
+    if match:
+        latency = float(match.group(1))
+        return 1, latency, latency, True
+    match = SCANNER_LATENCY_SUMMARY_RE.search(text)
+    if match:
+        return int(match.group(1)), float(match.group(2)), float(match.group(3)), True
+    match = EARLY_WARNING_LATENCY_RE.search(text)
+    if match:
+        latency = float(match.group(1)) * 1000
+        return 1, latency, latency, False
+    return None
+
+
+def latency_around_purchases(indexes, window_minutes):
+    """
+    Collect request latencies in the window around each purchase launch.
+
+    Returns:
+        tuple: (list of (time, line, before, after) per purchase launch, where before and
+            after are lists of (requests, median ms, max ms); True if any scanner latency was found)
+    """
+    launches = []
+    for index in indexes:
+        for _, offset in index.postings["purchase"]:
+            line = index.read_at(offset)
+            when = line_time(line)
+            if when is not None and "launching purchase" in line.lower():
+                launches.append((when, line))
+
+    window = timedelta(minutes=window_minutes)
+    results = []
+    scanner_seen = False
+    for when, line in sorted(launches):
+        before, after = [], []
+        for index in indexes:
+            for line_when, text in index.read_range(when - window, when + window):
+                latency = parse_latency(text)
+                if latency is not None:
+                    scanner_seen = scanner_seen or latency[3]
+                    (before if line_when < when else after).append(latency[:3])
+        results.append((when, line, before, after))
+    return results, scanner_seen
+
+
+def describe(latencies):
+    if not latencies:
+        return "no requests"
+    # Minute summaries count with their median once per request they cover
+    requests = sum(count for count, _, _ in latencies)
+    median = statistics.median([value for count, value, _ in latencies for _ in range(count)])
+    return f"{requests} requests, median {median:.0f} ms, max {max(peak for _, _, peak in latencies):.0f} ms"
+
+
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Indexed queries over the coordinator and early-warning logs")
+    parser.add_argument("--log", action="append", help="Log file (repeatable; default: all known logs)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("update", help="Index new log data")
+
+    events_parser = subparsers.add_parser("events", help="Lines in a time range")
+    events_parser.add_argument("--from", dest="start", type=parse_time, required=True)
+    events_parser.add_argument("--to", dest="end", type=parse_time,
+                               help="End of the range (default: end of the --from day)")
+    events_parser.add_argument("--type", choices=sorted(EVENT_PATTERNS), help="Only lines of this event type")
+
+    latency_parser = subparsers.add_parser("latency", help="Request latency around each purchase launch")
+    latency_parser.add_argument("--window", type=float, default=5, help="Minutes before and after")
+
+    args = parser.parse_args(argv)
+    paths = args.log or default_log_paths(os.getcwd(), os.path.join(base_dir, "early-warning"))
+    indexes = load_all(paths)
+
+    if args.command == "update":
+        for index in indexes:
+            print(f"{index.path}: {index.indexed_size} bytes, {len(index.buckets)} minutes, "
+                  + ", ".join(f"{len(offsets)} {event}" for event, offsets in index.postings.items()))
+    elif args.command == "events":
+        end = args.end or args.start.replace(hour=23, minute=59, second=59)
+        for when, path, line in query_events(indexes, args.start, end, args.type):
+            print(f"{os.path.basename(path)}: {line}")
+    else:
+        results, scanner_seen = latency_around_purchases(indexes, args.window)
+        for when, line, before, after in results:
+            print(line)
+            print(f"    {args.window:g} min before: {describe(before)}")
+            print(f"    {args.window:g} min after:  {describe(after)}")
+        if results and not scanner_seen:
+            print("Warning: no scanner latencies found around these purchases. coordinator.log has them as "
+                  "per-minute summaries (per request with --full-log); older logs only have them in the "
+                  "logs/flight snapshots", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
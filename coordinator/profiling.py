@@ -0,0 +1,196 @@
+"""
+Low-overhead profiling for long coordinator runs (enabled with --profile).
+
+Three views are written to the profile directory on a schedule and whenever a
+dump is requested (SIGUSR1 where available):
+
+- stacks_<time>.folded: collapsed stacks from a sampling profiler, one
+  "thread;frame;frame count" line per stack, ready for flamegraph.pl or
+  speedscope. Counts cover the time since the previous dump.
+- tracemalloc_<time>.txt: current traced memory and the top allocation
+  differences since the previous dump.
+- census_<time>.json: live threads grouped by name, open file descriptors and
+  the profiler's own CPU time.
+"""
+import collections
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+logger = logging.getLogger("coordinator")
+
+DEFAULT_PROFILE_DIR = os.path.join("logs", "profile")
+DEFAULT_DUMP_INTERVAL_SECS = 600
+# 20 samples per second keeps the sampler well below 1% of one core
+DEFAULT_SAMPLE_HZ = 20
+# One frame per allocation keeps tracemalloc's overhead low
+TRACEMALLOC_FRAMES = 1
+TOP_ALLOCATIONS = 25
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def _snapshot():
+    """Take a tracemalloc snapshot without tracemalloc's and importlib's own allocations"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+class Profiler:
+    """
+    Sampling profiler, tracemalloc diffs and thread/fd census.
+
+    Args:
+        directory (str): Where dumps are written
+        dump_interval_secs (float): Seconds between scheduled dumps
+        sample_hz (float): Stack samples per second
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, dump_interval_secs=DEFAULT_DUMP_INTERVAL_SECS,
+                 sample_hz=DEFAULT_SAMPLE_HZ):
+        self.directory = directory
+        self.dump_interval_secs = dump_interval_secs
+        self.sample_interval = 1.0 / sample_hz
+        self._stacks = collections.Counter()
+        self._samples = 0
+        self._lock = threading.Lock()
+        # Serializes dumps (dump thread, shutdown and callers) so the stacks and diff base aren't split
+        self._dump_lock = threading.Lock()
+        self._dump_requested = threading.Event()
+        self._dump_reason = None
+        self._previous_snapshot = None
+        self._sampler_cpu_secs = 0.0
+        self._started_at = time.monotonic()
+
+    def start(self, shutdown_event):
+        """Start tracemalloc, the sampler thread and the dump thread"""
+        os.makedirs(self.directory, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._previous_snapshot = _snapshot()
+
+        for target, name in ((self._sample_loop, "profiler-sampler"), (self._dump_loop, "profiler-dump")):
+            thread = threading.Thread(target=target, args=(shutdown_event,), name=name)
+            thread.daemon = True
+            thread.start()
+        logger.info(f"Profiling enabled, writing to {self.directory} every {self.dump_interval_secs}s")
+
+    def request_dump(self, reason="signal"):
+        """Ask for a dump; safe to call from a signal handler"""
+        self._dump_reason = reason
+        self._dump_requested.set()
+
+    def _sample_loop(self, shutdown_event):
+        while not shutdown_event.wait(self.sample_interval):
+            cpu_start = time.thread_time()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            samples = []
+            for ident, frame in sys._current_frames().items():
+                # Leave the profiler's own threads out of the stacks
+                if names.get(ident, "").startswith("profiler-"):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                samples.append(";".join(reversed(labels)))
+            with self._lock:
+                self._stacks.update(samples)
+                self._samples += 1
+            self._sampler_cpu_secs += time.thread_time() - cpu_start
+
+    def _dump_loop(self, shutdown_event):
+        next_dump = time.monotonic() + self.dump_interval_secs
+        while not shutdown_event.is_set():
+            requested = self._dump_requested.wait(max(0.0, next_dump - time.monotonic()))
+            if shutdown_event.is_set():
+                break
+            reason = "scheduled"
+            if requested:
+                self._dump_requested.clear()
+                reason = self._dump_reason or "request"
+            else:
+                next_dump = time.monotonic() + self.dump_interval_secs
+            try:
+                self.dump(reason)
+            except Exception as e:
+                logger.error(f"Failed to write profile dump: {e}")
+
+    def dump(self, reason="manual"):
+        """
+        Write stacks, allocation diff and census files.
+
+        Returns:
+            str: Timestamp suffix of the written files
+        """
+        with self._dump_lock:
+            return self._dump(reason)
+
+    def _dump(self, reason):
+        # Milliseconds, so dumps in the same second (e.g. SIGUSR1, then shutdown) don't overwrite each other
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S.%f")[:-3]
+
+        with self._lock:
+            stacks, self._stacks = self._stacks, collections.Counter()
+            samples, self._samples = self._samples, 0
+        with open(os.path.join(self.directory, f"stacks_{stamp}.folded"), "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        snapshot = _snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(os.path.join(self.directory, f"tracemalloc_{stamp}.txt"), "w", encoding="utf-8") as file:
+            file.write(f"# {reason} dump: traced {current / 1024:.1f} KiB (peak {peak / 1024:.1f} KiB)\n")
+            file.write(f"# top {TOP_ALLOCATIONS} differences since the previous dump\n")
+            for stat in snapshot.compare_to(self._previous_snapshot, "lineno")[:TOP_ALLOCATIONS]:
+                file.write(f"{stat}\n")
+        self._previous_snapshot = snapshot
+
+        census = self.census()
+        census.update({"reason": reason, "samples": samples, "traced_kib": round(current / 1024, 1)})
+        with open(os.path.join(self.directory, f"census_{stamp}.json"), "w", encoding="utf-8") as file:
+            json.dump(census, file, indent=2)
+
+        logger.info(f"Profile dump ({reason}) written to {self.directory}: {census['threads']} threads, "
+                    f"{census['open_fds']} fds, {current / 1024:.0f} KiB traced")
+        return stamp
+
+    def census(self):
+        """
+        Count live threads (grouped by name) and open file descriptors.
+
+        Returns:
+            dict: Census values
+        """
+        threads = threading.enumerate()
+        # "Thread-12 (read_output)" and "Thread-40 (read_output)" are the same kind of thread
+        by_name = collections.Counter(re.sub(r"-\d+", "", thread.name) for thread in threads)
+
+        open_fds = None
+        for fd_dir in ("/proc/self/fd", "/dev/fd"):
+            if os.path.isdir(fd_dir):
+                open_fds = len(os.listdir(fd_dir))
+                break
+
+        uptime = time.monotonic() - self._started_at
+        return {
+            "timestamp": datetime.now().isoformat(sep=" ", timespec="seconds"),
+            "threads": len(threads),
+            "threads_by_name": dict(by_name.most_common()),
+            "open_fds": open_fds,
+            "profiler_cpu_secs": round(self._sampler_cpu_secs, 2),
+            "profiler_cpu_share": round(self._sampler_cpu_secs / uptime, 4) if uptime else 0.0,
+        }
@@ -0,0 +1,146 @@
+"""
+Adaptive polling rate policy for the product scanner.
+
+The scanner polls at a slow baseline rate while nothing is happening. When the
+early-warning monitor reports a reference diff or an SKU change, the policy
+switches to a fast rate for a configurable window and then decays linearly back
+to the baseline.
+"""
+import threading
+import time
+import logging
+
+logger = logging.getLogger("coordinator")
+
+# Default scanner intervals in milliseconds
+DEFAULT_BASELINE_INTERVAL_MS = 10000
+DEFAULT_BOOST_INTERVAL_MS = 1000
+DEFAULT_BOOST_WINDOW_MINUTES = 30
+DEFAULT_DECAY_MINUTES = 15
+
+# Random jitter added on top of the interval (the scanner picks a value in [min, max))
+JITTER_RATIO = 0.1
+
+# Intervals are rounded to this granularity so a decay does not push a new value every tick
+INTERVAL_STEP_MS = 500
+
+
+class RatePolicy:
+    """
+    Computes the scanner polling interval from the time since the last boost signal.
+
+    Args:
+        baseline_interval_ms (int): Interval used while nothing is happening
+        boost_interval_ms (int): Interval used during a boost window
+        boost_window_minutes (float): How long the fast rate is held after a signal
+        decay_minutes (float): How long it takes to return from the fast rate to the baseline
+    """
+
+    def __init__(self, baseline_interval_ms=DEFAULT_BASELINE_INTERVAL_MS,
+                 boost_interval_ms=DEFAULT_BOOST_INTERVAL_MS,
+                 boost_window_minutes=DEFAULT_BOOST_WINDOW_MINUTES,
+                 decay_minutes=DEFAULT_DECAY_MINUTES):
+        self.baseline_interval_ms = baseline_interval_ms
+        self.boost_interval_ms = min(boost_interval_ms, baseline_interval_ms)
+        self.boost_window_secs = boost_window_minutes * 60
+        self.decay_secs = decay_minutes * 60
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._boost_until = None
+        self._last_reason = None
+
+    def signal(self, reason, window_minutes=None):
+        """
+        Start (or extend) a boost window.
+
+        Args:
+            reason (str): Human-readable cause, used for logging
+            window_minutes (float): Optional window length overriding the default
+        """
+        window_secs = self.boost_window_secs if window_minutes is None else window_minutes * 60
+        now = time.time()
+        with self._lock:
+            boost_until = now + window_secs
+            if self._boost_until is None or boost_until > self._boost_until:
+                self._boost_until = boost_until
+            self._last_reason = reason
+        self._changed.set()
+        logger.info(f"Rate policy boost ({reason}) for {window_secs / 60:.0f} minutes")
+
+    def set_intervals(self, baseline_interval_ms, boost_interval_ms=None):
+        """
+        Replace the baseline (and optionally the boost) interval at runtime.
+
+        Args:
+            baseline_interval_ms (int): New interval used while nothing is happening
+            boost_interval_ms (int): New interval used during a boost window
+        """
+        with self._lock:
+            self.baseline_interval_ms = baseline_interval_ms
+            if boost_interval_ms is not None:
+                self.boost_interval_ms = boost_interval_ms
+            self.boost_interval_ms = min(self.boost_interval_ms, baseline_interval_ms)
+        self._changed.set()
+        logger.info(f"Rate policy intervals set to {baseline_interval_ms} ms baseline, "
+                    f"{self.boost_interval_ms} ms boost")
+
+    def current_interval(self, now=None):
+        """
+        Return the interval the scanner should currently use.
+
+        Returns:
+            tuple: (min_ms, max_ms) sleep range between scanner requests
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            boost_until = self._boost_until
+
+        if boost_until is None or now >= boost_until + self.decay_secs:
+            interval = self.baseline_interval_ms
+        elif now < boost_until:
+            interval = self.boost_interval_ms
+        else:
+            # Linear decay from the boost interval back to the baseline
+            progress = (now - boost_until) / self.decay_secs
+            interval = self.boost_interval_ms + progress * (self.baseline_interval_ms - self.boost_interval_ms)
+            interval = max(self.boost_interval_ms, int(interval // INTERVAL_STEP_MS * INTERVAL_STEP_MS))
+
+        return interval, int(interval * (1 + JITTER_RATIO))
+
+    def state(self):
+        """Return a short description of the current policy state"""
+        now = time.time()
+        with self._lock:
+            boost_until = self._boost_until
+            reason = self._last_reason
+        if boost_until is None or now >= boost_until + self.decay_secs:
+            return "baseline"
+        if now < boost_until:
+            return f"boost ({reason}, {int(boost_until - now)}s left)"
+        return f"decay ({reason})"
+
+    def wait_for_signal(self, timeout):
+        """Block until a new signal arrives or the timeout expires"""
+        signalled = self._changed.wait(timeout)
+        self._changed.clear()
+        return signalled
+
+
+def run_rate_policy(policy, push_interval, shutdown_event, tick_secs=5):
+    """
+    Thread function that pushes the policy's interval to the scanner whenever it changes.
+
+    Args:
+        policy (RatePolicy): The policy to evaluate
+        push_interval (callable): Called with (min_ms, max_ms); returns True if delivered
+        shutdown_event (threading.Event): Stops the loop when set
+        tick_secs (float): How often the policy is re-evaluated
+    """
+    last_pushed = None
+    while not shutdown_event.is_set():
+        interval = policy.current_interval()
+        if interval != last_pushed:
+            if push_interval(*interval):
+                logger.info(f"Scanner interval set to {interval[0]}-{interval[1]} ms ({policy.state()})")
+                last_pushed = interval
+        policy.wait_for_signal(tick_secs)
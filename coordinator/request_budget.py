@@ -0,0 +1,182 @@
+"""
+Shared request budget for the NVIDIA API hosts.
+
+The product scanner and the early-warning monitor poll the same hosts. Instead of
+each component pacing itself, they ask the coordinator for a permit before every
+request. The coordinator keeps one token bucket per host and, when a host answers
+429 or 503, stops handing out permits for that host until its Retry-After expires.
+"""
+import collections
+import threading
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger("coordinator")
+
+# Per-host budgets: (bucket capacity, tokens refilled per second)
+DEFAULT_HOST_BUDGETS = {
+    "api.store.nvidia.com": (10, 2.0),
+    "api.nvidia.partners": (3, 0.5),
+}
+DEFAULT_BUDGET = (5, 1.0)
+
+# How long a host is blocked after a 429/503 without a usable Retry-After header
+DEFAULT_THROTTLE_SECS = 30
+MAX_THROTTLE_SECS = 600
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """
+    Token bucket with an additional throttle deadline for a single host.
+
+    Args:
+        capacity (int): Maximum number of tokens (burst size)
+        refill_per_sec (float): Tokens added per second
+    """
+
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.throttled_until = 0.0
+        self.pending = collections.deque()
+        self.granted = 0
+        self.throttle_events = 0
+        self.wait_secs_total = 0.0
+
+    def refill(self, now):
+        # No tokens accrue while the host is throttled, so there is no burst when it ends
+        start = max(self.last_refill, min(now, self.throttled_until))
+        elapsed = now - start
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_sec)
+        self.last_refill = now
+
+    def next_available(self, now):
+        """Return the monotonic time at which the next permit can be granted"""
+        ready = max(now, self.throttled_until)
+        if self.tokens < 1:
+            ready = max(ready, now + (1 - self.tokens) / self.refill_per_sec)
+        return ready
+
+
+class RequestBudget:
+    """
+    Hands out request permits per API host and applies throttling globally.
+
+    Args:
+        host_budgets (dict): Mapping of host to (capacity, refill_per_sec)
+        default_budget (tuple): Budget used for hosts not in host_budgets
+    """
+
+    def __init__(self, host_budgets=None, default_budget=DEFAULT_BUDGET):
+        self.host_budgets = dict(DEFAULT_HOST_BUDGETS if host_budgets is None else host_budgets)
+        self.default_budget = default_budget
+        self._buckets = {}
+        self._condition = threading.Condition()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            capacity, refill_per_sec = self.host_budgets.get(host, self.default_budget)
+            bucket = TokenBucket(capacity, refill_per_sec)
+            self._buckets[host] = bucket
+        return bucket
+
+    def request(self, host, on_grant):
+        """
+        Queue a permit request. on_grant is called from the dispatcher thread once
+        the host has budget and is not throttled.
+
+        Args:
+            host (str): API host the request will go to
+            on_grant (callable): Called without arguments when the permit is granted
+        """
+        with self._condition:
+            self._bucket(host).pending.append((time.monotonic(), on_grant))
+            self._condition.notify()
+
+    def report(self, host, status, retry_after=None):
+        """
+        Record the HTTP status a component received from a host.
+
+        Args:
+            host (str): API host that answered
+            status (int): HTTP status code
+            retry_after (int): Retry-After value in seconds, if the response had one
+        """
+        if status not in THROTTLE_STATUSES:
+            return
+
+        throttle_secs = DEFAULT_THROTTLE_SECS if retry_after is None else retry_after
+        throttle_secs = max(1, min(MAX_THROTTLE_SECS, throttle_secs))
+        with self._condition:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            already_throttled = now < bucket.throttled_until
+            until = now + throttle_secs
+            if until > bucket.throttled_until:
+                bucket.throttled_until = until
+                # Drop the remaining burst so requests resume at the refill rate
+                bucket.tokens = min(bucket.tokens, 0.0)
+            if not already_throttled:
+                bucket.throttle_events += 1
+            self._condition.notify()
+
+        if not already_throttled:
+            logger.warning(f"{host} answered {status}, pausing all requests to it for {throttle_secs}s")
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ⚠️ {host} answered {status}, "
+                  f"pausing requests for {throttle_secs}s")
+
+    def run(self, shutdown_event):
+        """Dispatcher loop granting queued permits; runs until shutdown_event is set"""
+        while not shutdown_event.is_set():
+            grants = []
+            with self._condition:
+                now = time.monotonic()
+                wake_at = now + 1.0
+                for bucket in self._buckets.values():
+                    bucket.refill(now)
+                    while bucket.pending and now >= bucket.throttled_until and bucket.tokens >= 1:
+                        requested_at, on_grant = bucket.pending.popleft()
+                        bucket.tokens -= 1
+                        bucket.granted += 1
+                        bucket.wait_secs_total += now - requested_at
+                        grants.append(on_grant)
+                    if bucket.pending:
+                        wake_at = min(wake_at, bucket.next_available(now))
+                if not grants:
+                    self._condition.wait(max(0.0, wake_at - now))
+
+            for on_grant in grants:
+                try:
+                    on_grant()
+                except Exception as e:
+                    logger.error(f"Error granting request permit: {e}")
+
+    def metrics(self):
+        """
+        Return the current budget and throttle state per host.
+
+        Returns:
+            dict: Host to metrics mapping
+        """
+        with self._condition:
+            now = time.monotonic()
+            result = {}
+            for host, bucket in self._buckets.items():
+                bucket.refill(now)
+                result[host] = {
+                    "tokens": round(bucket.tokens, 2),
+                    "capacity": bucket.capacity,
+                    "refill_per_sec": bucket.refill_per_sec,
+                    "throttled": now < bucket.throttled_until,
+                    "throttle_remaining_secs": round(max(0.0, bucket.throttled_until - now), 1),
+                    "throttle_events": bucket.throttle_events,
+                    "pending": len(bucket.pending),
+                    "granted": bucket.granted,
+                    "avg_wait_ms": round(1000 * bucket.wait_secs_total / bucket.granted, 1) if bucket.granted else 0.0,
+                }
+            return result
@@ -0,0 +1,126 @@
+"""
+Startup pipeline for the coordinator.
+
+Startup is a small dependency graph instead of a fixed sequence: every stage
+runs on its own thread as soon as the stages it depends on have succeeded, so
+slow stages (the cookie browser session, compiling the components) overlap.
+Each stage's duration and its finish time relative to the start of the
+pipeline are logged.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger("coordinator")
+
+
+class Stage:
+    """
+    One startup step.
+
+    Args:
+        name (str): Stage name used in logs and dependencies
+        func (callable): Runs the stage; a falsy return value means it failed
+        after (tuple): Names of stages that must succeed first
+    """
+
+    def __init__(self, name, func, after=()):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.result = None
+        self.ok = False
+        self.skipped = False
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+
+class StartupPipeline:
+    """Runs startup stages concurrently, respecting their dependencies"""
+
+    def __init__(self):
+        self._stages = {}
+        self._started_at = None
+
+    def add_stage(self, name, func, after=()):
+        """
+        Register a stage. Dependencies must be registered before start().
+
+        Args:
+            name (str): Stage name
+            func (callable): Called without arguments; a falsy return value means failure
+            after (tuple): Names of stages that must succeed before this one runs
+        """
+        self._stages[name] = Stage(name, func, after)
+
+    def start(self):
+        """Start every stage on its own thread"""
+        self._started_at = time.monotonic()
+        for stage in self._stages.values():
+            thread = threading.Thread(target=self._run_stage, args=(stage,), name=f"startup-{stage.name}")
+            thread.daemon = True
+            thread.start()
+
+    def _run_stage(self, stage):
+        for name in stage.after:
+            dependency = self._stages[name]
+            dependency.done.wait()
+            if not dependency.ok:
+                stage.skipped = True
+                logger.warning(f"Startup stage '{stage.name}' skipped because '{name}' failed")
+                stage.done.set()
+                return
+
+        stage.started_at = time.monotonic()
+        try:
+            stage.result = stage.func()
+            stage.ok = bool(stage.result)
+        except Exception as e:
+            logger.error(f"Startup stage '{stage.name}' raised: {e}")
+        stage.finished_at = time.monotonic()
+
+        message = (f"Startup stage '{stage.name}' {'done' if stage.ok else 'FAILED'} in "
+                   f"{stage.finished_at - stage.started_at:.1f}s "
+                   f"(t+{stage.finished_at - self._started_at:.1f}s)")
+        logger.info(message)
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ⏱️ {message}")
+        stage.done.set()
+
+    def wait(self, name, timeout=None):
+        """
+        Block until a stage has finished (or was skipped).
+
+        Returns:
+            bool: True if the stage succeeded
+        """
+        stage = self._stages[name]
+        stage.done.wait(timeout)
+        return stage.ok
+
+    def result(self, name):
+        """Return the value the stage's function returned"""
+        return self._stages[name].result
+
+    def timings(self):
+        """
+        Return per-stage timings.
+
+        Returns:
+            dict: Stage name to {"status", "duration_secs", "finished_at_secs"}
+        """
+        timings = {}
+        for stage in self._stages.values():
+            if stage.skipped:
+                status = "skipped"
+            elif stage.finished_at is None:
+                status = "running" if stage.started_at is not None else "waiting"
+            else:
+                status = "ok" if stage.ok else "failed"
+            timings[stage.name] = {
+                "status": status,
+                "duration_secs": round(stage.finished_at - stage.started_at, 1) if stage.finished_at else None,
+                "finished_at_secs": round(stage.finished_at - self._started_at, 1) if stage.finished_at else None,
+            }
+        return timings
@@ -0,0 +1,302 @@
+"""
+Memory-mapped live status board shared by all components.
+
+The coordinator creates a small file (logs/status.board) and passes its path to
+the scanner, early-warning and cookie-prep in NVIDIA_STATUS_BOARD. Each
+component owns one fixed slot and overwrites its record in place after every
+cycle, so its last poll, latency, cycle number and current target can be read
+at any time without parsing output or tailing logs:
+
+    python -m coordinator.status_board
+    python -m coordinator.status_board --watch 1
+
+Layout (little-endian), shared with component-common/src/status_board.rs (used
+by both Rust crates) and cookie-prep/src/status_board.py. Change all three
+together and bump VERSION; writers refuse a board whose version or sizes differ
+from theirs and report it as an error.
+
+    header (64 bytes): magic "NVSTATB1", u32 version, u32 slot count, u32 slot size,
+                       u32 record size (bytes after seq)
+    slot (256 bytes):
+        0   u64 seq            odd while the writer is updating the record
+        8   u32 pid
+        12  u32 state          see STATES
+        16  u64 updated_at_ms  Unix time of the last update
+        24  u64 cycle
+        32  u64 last_poll_ms   Unix time of the last completed cycle
+        40  u32 latency_ms     duration of the last cycle
+        48  u64 events
+        56  u64 errors
+        64  128 bytes detail   UTF-8, NUL padded
+
+Every slot has a single writer, which makes seq odd, writes the record and
+makes seq even again (a seqlock). Readers copy the slot and retry while seq is
+odd or changed during the copy, so they never see a torn record. Publishing is
+a few stores into the mapping: no syscalls, locks or allocations on the
+writer's hot path. The Python writers rely on the store ordering of the
+platforms the system runs on (x86-64); the Rust writers use explicit fences.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_STATUS_BOARD_PATH = os.path.join("logs", "status.board")
+# Environment variable with the absolute path of the board, set for every child
+STATUS_BOARD_ENV = "NVIDIA_STATUS_BOARD"
+
+MAGIC = b"NVSTATB1"
+VERSION = 2
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+# Everything after seq: pid, state, updated_at_ms, cycle, last_poll_ms, latency_ms, events, errors, detail
+RECORD = struct.Struct("<IIQQQI4xQQ128s")
+SLOT_SIZE = 256
+DETAIL_SIZE = 128
+
+# Fixed slot per component
+SLOTS = ("coordinator", "scanner", "early-warning", "cookie-prep")
+COORDINATOR_SLOT, SCANNER_SLOT, EARLY_WARNING_SLOT, COOKIE_PREP_SLOT = range(len(SLOTS))
+
+STATES = {0: "-", 1: "starting", 2: "running", 3: "paused", 4: "stopped"}
+STATE_STARTING, STATE_RUNNING, STATE_PAUSED, STATE_STOPPED = 1, 2, 3, 4
+
+# What cycle/last poll/latency/events/errors mean for each component
+FIELD_MEANINGS = {
+    "coordinator": "cycle = cookie refreshes, last poll = last refresh, latency = refresh duration, "
+                   "events = successful refreshes, errors = failed refreshes",
+    "scanner": "cycle = polling cycle, latency = cycle duration, events = purchases launched, "
+               "errors = failed cycles",
+    "early-warning": "cycle = check cycle, latency = check duration, events = changes detected, "
+                     "errors = failed checks",
+    "cookie-prep": "cycle = attempt, last poll = last attempt finished, latency = attempt duration, "
+                   "events = cookies saved, errors = failed attempts",
+}
+
+# A record that is being rewritten this many times in a row is reported as busy
+READ_RETRIES = 100
+# Records of running components not updated for this long are flagged as stale
+STALE_SECS = 120
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class StatusBoard:
+    """
+    Memory-mapped status board.
+
+    Use StatusBoard.create() in the coordinator and StatusBoard.open() everywhere else.
+
+    Args:
+        path (str): Board file
+        mapping (mmap.mmap): The mapped file
+    """
+
+    def __init__(self, path, mapping):
+        self.path = path
+        self._map = mapping
+        self._seqs = {}
+        # Serializes writers within this process (e.g. a publisher thread and shutdown)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, slots=len(SLOTS)):
+        """Create (or reset) the board file and map it"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = bytearray(HEADER_SIZE + slots * SLOT_SIZE)
+        HEADER.pack_into(data, 0, MAGIC, VERSION, slots, SLOT_SIZE, RECORD.size)
+        # Write a new file and rename it so readers of an old board keep a consistent mapping
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        return cls.open(path, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False):
+        """
+        Map an existing board.
+
+        Raises:
+            OSError: If the file can't be opened
+            ValueError: If it isn't a status board of this version
+        """
+        with open(path, "r+b" if writable else "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, slots, slot_size, record_size = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC:
+            mapping.close()
+            raise ValueError(f"{path} is not a status board")
+        if version != VERSION or slot_size != SLOT_SIZE or record_size != RECORD.size \
+                or len(mapping) < HEADER_SIZE + slots * SLOT_SIZE:
+            mapping.close()
+            raise ValueError(f"{path} has layout version {version} (slot {slot_size} / record {record_size} bytes), "
+                             f"expected version {VERSION} ({SLOT_SIZE} / {RECORD.size} bytes)")
+        return cls(path, mapping)
+
+    @property
+    def slots(self):
+        return HEADER.unpack_from(self._map, 0)[2]
+
+    def publish(self, slot, state, cycle=0, last_poll_ms=0, latency_ms=0, events=0, errors=0, detail=""):
+        """Overwrite the record of a slot; only the slot's owner process may call this"""
+        offset = HEADER_SIZE + slot * SLOT_SIZE
+        record = (
+            os.getpid(), state, now_ms(), cycle, last_poll_ms,
+            min(latency_ms, 0xFFFFFFFF), events, errors,
+            detail.encode("utf-8")[:DETAIL_SIZE],
+        )
+        with self._lock:
+            seq = self._seqs.get(slot)
+            if seq is None:
+                # Continue after a previous writer of the slot (odd if it died mid-update)
+                seq = SEQ.unpack_from(self._map, offset)[0] | 1
+            else:
+                seq += 1
+            SEQ.pack_into(self._map, offset, seq)
+            RECORD.pack_into(self._map, offset + SEQ.size, *record)
+            SEQ.pack_into(self._map, offset, seq + 1)
+            self._seqs[slot] = seq + 1
+
+    def read(self, slot):
+        """
+        Read a consistent copy of a slot.
+
+        Returns:
+            dict: The record, None if the slot was never written, or {"busy": True, "pid": ...}
+                  if the writer kept changing it (or died in the middle of an update)
+        """
+        offset = HEADER_SIZE + slot * SLOT_SIZE
+        for _ in range(READ_RETRIES):
+            seq = SEQ.unpack_from(self._map, offset)[0]
+            if seq & 1:
+                continue
+            data = self._map[offset:offset + SLOT_SIZE]
+            if SEQ.unpack_from(self._map, offset)[0] != seq:
+                continue
+            if seq == 0:
+                return None
+            pid, state, updated_at_ms, cycle, last_poll_ms, latency_ms, events, errors, detail = \
+                RECORD.unpack_from(data, SEQ.size)
+            return {
+                "pid": pid,
+                "state": STATES.get(state, str(state)),
+                "updated_at_ms": updated_at_ms,
+                "cycle": cycle,
+                "last_poll_ms": last_poll_ms,
+                "latency_ms": latency_ms,
+                "events": events,
+                "errors": errors,
+                "detail": detail.rstrip(b"\0").decode("utf-8", errors="replace"),
+            }
+        # The pid never changes while a writer is alive, so it is safe to read on its own
+        return {"busy": True, "pid": struct.unpack_from("<I", self._map, offset + SEQ.size)[0]}
+
+    def read_all(self):
+        """Return {component name: record} for every slot"""
+        return {
+            SLOTS[slot] if slot < len(SLOTS) else f"slot-{slot}": self.read(slot)
+            for slot in range(self.slots)
+        }
+
+    def close(self):
+        self._map.close()
+
+
+def process_exists(pid):
+    """Return False if the process is known to be gone (True when it can't be checked)"""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def format_age(when_ms, now):
+    if not when_ms:
+        return "-"
+    age = max(0.0, now - when_ms / 1000)
+    return f"{age:.1f}s ago" if age < 120 else datetime.fromtimestamp(when_ms / 1000).strftime("%H:%M:%S")
+
+
+def format_board(records, now=None):
+    """Render records as a table"""
+    now = now or time.time()
+    rows = [("component", "state", "pid", "updated", "cycle", "last poll", "latency", "events", "errors", "detail")]
+    for name, record in records.items():
+        if record is None:
+            rows.append((name, "-", "", "", "", "", "", "", "", ""))
+            continue
+        if record.get("busy"):
+            state = "busy" if process_exists(record["pid"]) else "exited"
+            rows.append((name, state, str(record["pid"]), "", "", "", "", "", "", ""))
+            continue
+        state = record["state"]
+        if state not in ("stopped", "-") and not process_exists(record["pid"]):
+            state = "exited"
+        elif state == "running" and now - record["updated_at_ms"] / 1000 > STALE_SECS:
+            state = "stale"
+        rows.append((
+            name, state, str(record["pid"]), format_age(record["updated_at_ms"], now), str(record["cycle"]),
+            format_age(record["last_poll_ms"], now), f"{record['latency_ms']} ms",
+            str(record["events"]), str(record["errors"]), record["detail"],
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+    return "\n".join(
+        "  ".join(value.ljust(width) for value, width in zip(row, widths)) + "  " + row[-1]
+        for row in rows
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the live status board of the coordinator's components")
+    parser.add_argument("--board", default=DEFAULT_STATUS_BOARD_PATH, help="Status board file")
+    parser.add_argument("--watch", type=float, metavar="SECS", help="Redraw every SECS seconds")
+    parser.add_argument("--json", action="store_true", help="Print the records as JSON")
+    parser.add_argument("--legend", action="store_true", help="Explain the columns per component")
+    args = parser.parse_args(argv)
+
+    try:
+        board = StatusBoard.open(args.board)
+    except (OSError, ValueError) as e:
+        print(f"Cannot open the status board: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        while True:
+            records = board.read_all()
+            if args.json:
+                print(json.dumps(records, indent=2))
+            else:
+                if args.watch:
+                    print("\033[2J\033[H", end="")
+                print(format_board(records))
+                if args.legend:
+                    print()
+                    for name, meaning in FIELD_MEANINGS.items():
+                        print(f"{name}: {meaning}")
+            if not args.watch:
+                return 0
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        board.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
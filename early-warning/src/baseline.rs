@@ -0,0 +1,136 @@
+use anyhow::{Context, Result};
+use log::{info, warn};
+use std::collections::BTreeMap;
+use std::fmt;
+use std::fs;
+use std::path::{Path, PathBuf};
+
+use crate::{NvidiaResponse, ProductInfo};
+
+/// One field that differs between the last seen response and a new one
+#[derive(Debug, PartialEq)]
+pub enum FieldChange {
+    Success { old: bool, new: bool },
+    Map,
+    Added(ProductInfo),
+    Removed(ProductInfo),
+    Field { fe_sku: String, field: &'static str, old: String, new: String },
+}
+
+impl fmt::Display for FieldChange {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        match self {
+            FieldChange::Success { old, new } => write!(f, "success: {} -> {}", old, new),
+            FieldChange::Map => write!(f, "map changed"),
+            FieldChange::Added(product) => write!(f, "{}: added (is_active {}, price {}, url '{}')",
+                                                  product.fe_sku, product.is_active, product.price, product.product_url),
+            FieldChange::Removed(product) => write!(f, "{}: removed", product.fe_sku),
+            FieldChange::Field { fe_sku, field, old, new } => write!(f, "{}: {} '{}' -> '{}'", fe_sku, field, old, new),
+        }
+    }
+}
+
+/// Field-level differences from `old` to `new`, with products matched by `fe_sku`
+pub fn diff(old: &NvidiaResponse, new: &NvidiaResponse) -> Vec<FieldChange> {
+    let mut changes = Vec::new();
+    if old.success != new.success {
+        changes.push(FieldChange::Success { old: old.success, new: new.success });
+    }
+    if old.map != new.map {
+        changes.push(FieldChange::Map);
+    }
+
+    let old_products: BTreeMap<&str, &ProductInfo> = old.list_map.iter().map(|p| (p.fe_sku.as_str(), p)).collect();
+    let new_products: BTreeMap<&str, &ProductInfo> = new.list_map.iter().map(|p| (p.fe_sku.as_str(), p)).collect();
+    for (fe_sku, old_product) in &old_products {
+        match new_products.get(fe_sku) {
+            None => changes.push(FieldChange::Removed((*old_product).clone())),
+            Some(new_product) => {
+                let fields = [
+                    ("is_active", &old_product.is_active, &new_product.is_active),
+                    ("product_url", &old_product.product_url, &new_product.product_url),
+                    ("price", &old_product.price, &new_product.price),
+                    ("locale", &old_product.locale, &new_product.locale),
+                ];
+                for (field, old_value, new_value) in fields {
+                    if old_value != new_value {
+                        changes.push(FieldChange::Field {
+                            fe_sku: fe_sku.to_string(),
+                            field,
+                            old: old_value.clone(),
+                            new: new_value.clone(),
+                        });
+                    }
+                }
+            }
+        }
+    }
+    for (fe_sku, new_product) in &new_products {
+        if !old_products.contains_key(fe_sku) {
+            changes.push(FieldChange::Added((*new_product).clone()));
+        }
+    }
+    changes
+}
+
+/// Last seen inventory response, persisted next to the config file.
+///
+/// The `[reference]` block from the config is only the starting point: once a
+/// change has been reported, the new response becomes the baseline, so each
+/// distinct change alerts once and a restart resumes from the persisted state.
+pub struct Baseline {
+    path: PathBuf,
+    state: NvidiaResponse,
+}
+
+impl Baseline {
+    /// Loads the persisted state from `path`, or starts from `reference` when there is none
+    pub fn load(path: PathBuf, reference: NvidiaResponse) -> Self {
+        let persisted = fs::read(&path)
+            .ok()
+            .and_then(|bytes| match serde_json::from_slice::<NvidiaResponse>(&bytes) {
+                Ok(state) => Some(state),
+                Err(e) => {
+                    warn!("Ignoring unreadable last seen state {}: {}", path.display(), e);
+                    None
+                }
+            });
+        let state = match persisted {
+            Some(state) => {
+                info!("Resuming from last seen state in {}", path.display());
+                state
+            }
+            None => {
+                info!("No last seen state yet, starting from the config reference");
+                reference
+            }
+        };
+        Baseline { path, state }
+    }
+
+    /// Compares `response` with the baseline; a differing response becomes the new baseline
+    pub fn update(&mut self, response: NvidiaResponse) -> Vec<FieldChange> {
+        let changes = diff(&self.state, &response);
+        if !changes.is_empty() {
+            self.state = response;
+            if let Err(e) = self.save() {
+                warn!("Failed to persist last seen state: {}", e);
+            }
+        }
+        changes
+    }
+
+    fn save(&self) -> Result<()> {
+        // Write to a temporary file first so a crash never leaves a truncated state behind
+        let tmp_path = self.path.with_extension("json.tmp");
+        let json = serde_json::to_vec_pretty(&self.state).context("Failed to serialize last seen state")?;
+        fs::write(&tmp_path, json).with_context(|| format!("Failed to write {}", tmp_path.display()))?;
+        fs::rename(&tmp_path, &self.path).with_context(|| format!("Failed to replace {}", self.path.display()))?;
+        Ok(())
+    }
+}
+
+/// `last_seen.json` in the directory of the config file
+pub fn default_path(config_path: &str) -> PathBuf {
+    Path::new(config_path).with_file_name("last_seen.json")
+}
@@ -0,0 +1,174 @@
+use std::collections::HashMap;
+use std::env;
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::sync::{Arc, Mutex};
+use log::{info, warn};
+use tokio::io::{AsyncBufReadExt, BufReader};
+use tokio::sync::{oneshot, Notify};
+
+/// Environment variable set by the coordinator when it starts the monitor
+const COORDINATOR_ENV: &str = "NVIDIA_COORDINATOR";
+
+/// Runtime link to the coordinator.
+///
+/// When the monitor is started by the coordinator, it asks for a permit before
+/// every request by printing `@@permit <id> <host>` and waits for the matching
+/// `grant <id>` line on stdin. Non-success statuses are reported with
+/// `@@http <host> <status> <retry_after>` so the coordinator can throttle the
+/// host for all components, and changed inventory states are reported with
+/// `@@observe <kind> <key> <json>` for the history store. The coordinator can
+/// also send `interval <secs>`, `pause`, `resume` and `reload` (re-read the
+/// config file). When run standalone every permit is granted immediately.
+pub struct CoordinatorLink {
+    enabled: AtomicBool,
+    next_permit_id: AtomicU64,
+    pending_permits: Mutex<HashMap<u64, oneshot::Sender<()>>>,
+    paused: AtomicBool,
+    /// Check interval requested by the coordinator, 0 if none is pending
+    requested_interval_secs: AtomicU64,
+    reload_requested: AtomicBool,
+    changed: Notify,
+}
+
+impl CoordinatorLink {
+    pub fn new() -> Arc<Self> {
+        Arc::new(CoordinatorLink {
+            enabled: AtomicBool::new(env::var(COORDINATOR_ENV).is_ok()),
+            next_permit_id: AtomicU64::new(1),
+            pending_permits: Mutex::new(HashMap::new()),
+            paused: AtomicBool::new(false),
+            requested_interval_secs: AtomicU64::new(0),
+            reload_requested: AtomicBool::new(false),
+            changed: Notify::new(),
+        })
+    }
+
+    pub fn is_enabled(&self) -> bool {
+        self.enabled.load(Ordering::SeqCst)
+    }
+
+    /// Starts reading coordinator commands from stdin in the background
+    pub fn spawn_listener(self: &Arc<Self>) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        let link = Arc::clone(self);
+        tokio::spawn(async move {
+            let mut lines = BufReader::new(tokio::io::stdin()).lines();
+            while let Ok(Some(line)) = lines.next_line().await {
+                link.handle_command(line.trim());
+            }
+            // Without a coordinator nobody grants permits, so fall back to standalone mode
+            warn!("Coordinator command channel closed, continuing standalone");
+            link.enabled.store(false, Ordering::SeqCst);
+            link.pending_permits.lock().unwrap().clear();
+            link.paused.store(false, Ordering::SeqCst);
+            link.changed.notify_waiters();
+        });
+        info!("Listening for coordinator commands on stdin");
+    }
+
+    fn handle_command(&self, line: &str) {
+        let parts: Vec<&str> = line.split_whitespace().collect();
+        match parts.as_slice() {
+            ["grant", id] => {
+                let sender = id.parse::<u64>().ok()
+                    .and_then(|id| self.pending_permits.lock().unwrap().remove(&id));
+                match sender {
+                    Some(sender) => { let _ = sender.send(()); }
+                    None => warn!("Grant for unknown permit: {}", line),
+                }
+            }
+            ["interval", secs] => match secs.parse::<u64>() {
+                Ok(secs) if secs > 0 => {
+                    self.requested_interval_secs.store(secs, Ordering::SeqCst);
+                    self.changed.notify_waiters();
+                }
+                _ => warn!("Invalid interval command: {}", line),
+            },
+            ["pause"] => {
+                if !self.paused.swap(true, Ordering::SeqCst) {
+                    info!("Monitoring paused by the coordinator");
+                    self.changed.notify_waiters();
+                }
+            }
+            ["resume"] => {
+                if self.paused.swap(false, Ordering::SeqCst) {
+                    info!("Monitoring resumed by the coordinator");
+                    self.changed.notify_waiters();
+                }
+            }
+            ["reload"] => {
+                self.reload_requested.store(true, Ordering::SeqCst);
+                self.changed.notify_waiters();
+            }
+            [] => {}
+            _ => warn!("Unknown coordinator command: {}", line),
+        }
+    }
+
+    /// Waits until the coordinator grants a permit for one request to `host`
+    pub async fn acquire_permit(&self, host: &str) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        let (sender, receiver) = oneshot::channel();
+        let id = self.next_permit_id.fetch_add(1, Ordering::SeqCst);
+        self.pending_permits.lock().unwrap().insert(id, sender);
+        if !self.is_enabled() {
+            // The channel closed while we were registering
+            self.pending_permits.lock().unwrap().remove(&id);
+            return;
+        }
+
+        println!("@@permit {} {}", id, host);
+        // Resolves on grant, or with an error when the command channel closes
+        let _ = receiver.await;
+    }
+
+    /// Reports a non-success response status so the coordinator can throttle the host
+    pub fn report_status(&self, host: &str, status: u16, retry_after_secs: Option<u64>) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        match retry_after_secs {
+            Some(secs) => println!("@@http {} {} {}", host, status, secs),
+            None => println!("@@http {} {} -", host, status),
+        }
+    }
+
+    /// Reports an observed state (compact JSON) for the coordinator's history store
+    pub fn observe(&self, kind: &str, key: &str, state: &serde_json::Value) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        println!("@@observe {} {} {}", kind, key, state);
+    }
+
+    /// Returns true while the coordinator has paused monitoring
+    pub fn is_paused(&self) -> bool {
+        self.paused.load(Ordering::SeqCst)
+    }
+
+    /// Returns the check interval the coordinator asked for, once
+    pub fn take_interval_request(&self) -> Option<u64> {
+        match self.requested_interval_secs.swap(0, Ordering::SeqCst) {
+            0 => None,
+            secs => Some(secs),
+        }
+    }
+
+    /// Returns true once after the coordinator asked for a configuration reload
+    pub fn take_reload_request(&self) -> bool {
+        self.reload_requested.swap(false, Ordering::SeqCst)
+    }
+
+    /// Resolves when an interval change or reload request arrives
+    pub async fn changed(&self) {
+        self.changed.notified().await
+    }
+}
@@ -3,13 +3,23 @@ use clap::Parser;
 use config::Config;
 use log::{error, info, warn};
 use notify_rust::Notification;
-use reqwest::header::{HeaderMap, HeaderValue};
+use reqwest::header::{HeaderMap, HeaderValue, RETRY_AFTER};
+use reqwest::StatusCode;
 use rodio::{source::SineWave, OutputStream, Sink, Source};
 use serde::{Deserialize, Serialize};
 use serde_json::Value;
-use std::{thread::sleep, time::{Duration, Instant}};
+use std::{collections::{BTreeSet, HashSet}, fmt, sync::atomic::{AtomicU64, Ordering}, time::{Duration, Instant}};
 use chrono::Local;
 use std::fs;
+use tokio::time::MissedTickBehavior;
+
+mod baseline;
+mod coordinator_link;
+
+use baseline::Baseline;
+use component_common::body_digest::body_digest;
+use component_common::status_board::{self, StatusBoard, StatusRecord, EARLY_WARNING_SLOT, STATE_PAUSED, STATE_RUNNING, STATE_STARTING};
+use coordinator_link::CoordinatorLink;
 
 // Command line arguments
 #[derive(Parser, Debug)]
@@ -57,18 +67,89 @@ struct RetailerInfo {
     sku: Option<String>,
 }
 
-async fn check_nvidia_api(url: &str, settings: &Config) -> Result<NvidiaResponse> {
-    let client = reqwest::Client::new();
-    
-    // Get SKUs from config
-    let skus: Vec<String> = settings.get("skus.list")
-        .context("Failed to get SKUs from config")?;
-    
-    // Get retailers URL from config
-    let retailers_url = settings.get_string("api.retailers_url")
-        .context("Failed to get retailers URL from config")?;
+/// Error returned when the API answers 429 or 503
+#[derive(Debug)]
+struct ThrottledError {
+    status: u16,
+    retry_after_secs: Option<u64>,
+}
+
+impl fmt::Display for ThrottledError {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        match self.retry_after_secs {
+            Some(secs) => write!(f, "API throttled with status {} (Retry-After {}s)", self.status, secs),
+            None => write!(f, "API throttled with status {}", self.status),
+        }
+    }
+}
+
+impl std::error::Error for ThrottledError {}
+
+/// Parses a Retry-After header given either in seconds or as an HTTP date
+fn parse_retry_after(headers: &HeaderMap) -> Option<u64> {
+    let value = headers.get(RETRY_AFTER)?.to_str().ok()?.trim();
+    if let Ok(secs) = value.parse::<u64>() {
+        return Some(secs);
+    }
+    let date = chrono::DateTime::parse_from_rfc2822(value).ok()?;
+    let secs = (date.with_timezone(&chrono::Utc) - chrono::Utc::now()).num_seconds();
+    Some(secs.max(0) as u64)
+}
+
+/// Settings parsed once at startup and reused for every cycle
+struct MonitorConfig {
+    inventory_url: reqwest::Url,
+    retailers_url: reqwest::Url,
+    retailers_locale: String,
+    skus: HashSet<String>,
+}
+
+impl MonitorConfig {
+    /// Describes what is monitored for the status board
+    fn summary(&self, interval_secs: u64) -> String {
+        format!("{} ({} SKUs), every {}s", self.retailers_locale, self.skus.len(), interval_secs)
+    }
 
-    // Configure headers based on the existing config
+    fn load(settings: &Config, inventory_url: &str) -> Result<Self> {
+        // Get SKUs from config
+        let skus: Vec<String> = settings.get("skus.list")
+            .context("Failed to get SKUs from config")?;
+
+        // Get retailers URL from config
+        let retailers_url = settings.get_string("api.retailers_url")
+            .context("Failed to get retailers URL from config")?;
+
+        let retailers_url = reqwest::Url::parse(&retailers_url).context("Invalid retailers URL")?;
+        let retailers_locale = retailers_url.query_pairs()
+            .find(|(key, _)| key == "locale")
+            .map(|(_, value)| value.into_owned())
+            .unwrap_or_else(|| "default".to_string());
+
+        Ok(MonitorConfig {
+            inventory_url: reqwest::Url::parse(inventory_url).context("Invalid FE inventory URL")?,
+            retailers_url,
+            retailers_locale,
+            skus: skus.into_iter().collect(),
+        })
+    }
+}
+
+/// Digests of the last parsed response bodies, used to skip parsing unchanged ones
+#[derive(Default)]
+struct LastDigests {
+    retailers: AtomicU64,
+    inventory: AtomicU64,
+}
+
+/// Result of an inventory check
+enum InventoryCheck {
+    /// Body is identical to the previous one apart from its timestamp
+    Unchanged,
+    Changed(NvidiaResponse),
+}
+
+/// Browser emulation headers sent with every request
+fn default_headers() -> HeaderMap {
     let mut headers = HeaderMap::new();
     headers.insert("User-Agent", HeaderValue::from_static("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"));
     headers.insert("Accept", HeaderValue::from_static("application/json, text/plain, */*"));
@@ -84,20 +165,108 @@ async fn check_nvidia_api(url: &str, settings: &Config) -> Result<NvidiaResponse
     headers.insert("Sec-Ch-Ua", HeaderValue::from_static("\"Google Chrome\";v=\"123\", \"Not:A-Brand\";v=\"8\""));
     headers.insert("Sec-Ch-Ua-Mobile", HeaderValue::from_static("?0"));
     headers.insert("Sec-Ch-Ua-Platform", HeaderValue::from_static("\"Windows\""));
+    headers
+}
 
-    // Make request to the retailers API endpoint
-    let retailers_response = client
-        .get(retailers_url)
-        .headers(headers.clone())
+/// Builds the client shared by all requests; headers are set once as defaults
+fn build_client() -> Result<reqwest::Client> {
+    reqwest::Client::builder()
+        .default_headers(default_headers())
         .timeout(Duration::from_secs(30))
+        .connect_timeout(Duration::from_secs(10))
+        .pool_idle_timeout(Duration::from_secs(90))
+        .tcp_keepalive(Duration::from_secs(30))
+        .build()
+        .context("Failed to build HTTP client")
+}
+
+/// Sends a GET request within the coordinator's request budget for the URL's host
+async fn send_request(
+    client: &reqwest::Client,
+    url: &reqwest::Url,
+    link: &CoordinatorLink,
+) -> Result<reqwest::Response> {
+    let host = url.host_str().unwrap_or_default();
+    link.acquire_permit(host).await;
+
+    let response = client
+        .get(url.clone())
         .send()
-        .await
-        .context("Failed to send request to NVIDIA retailers API")?
-        .json::<Value>()
-        .await
-        .context("Failed to parse NVIDIA retailers API response")?;
+        .await?;
+
+    let status = response.status();
+    if !status.is_success() {
+        let retry_after_secs = parse_retry_after(response.headers());
+        link.report_status(host, status.as_u16(), retry_after_secs);
+        if status == StatusCode::TOO_MANY_REQUESTS || status == StatusCode::SERVICE_UNAVAILABLE {
+            return Err(ThrottledError { status: status.as_u16(), retry_after_secs }.into());
+        }
+    }
+
+    Ok(response)
+}
+
+async fn check_nvidia_api(
+    client: &reqwest::Client,
+    config: &MonitorConfig,
+    link: &CoordinatorLink,
+    last_digests: &LastDigests,
+) -> Result<InventoryCheck> {
+    // Run the retailers request and the inventory request concurrently
+    let retailers_request = async {
+        send_request(client, &config.retailers_url, link)
+            .await
+            .context("Failed to send request to NVIDIA retailers API")?
+            .bytes()
+            .await
+            .context("Failed to read NVIDIA retailers API response")
+    };
+    let inventory_request = async {
+        send_request(client, &config.inventory_url, link)
+            .await
+            .context("Failed to send request to NVIDIA API")?
+            .bytes()
+            .await
+            .context("Failed to read NVIDIA API response")
+    };
+    let (retailers_body, inventory_body) = tokio::join!(retailers_request, inventory_request);
+    let retailers_body = retailers_body?;
 
-    // Check for SKU changes
+    // Only parse and scan the retailers response when it changed since the last cycle
+    let retailers_digest = body_digest(&retailers_body);
+    if retailers_digest == last_digests.retailers.load(Ordering::Relaxed) {
+        info!("Retailers response unchanged");
+    } else {
+        let retailers_response: Value = serde_json::from_slice(&retailers_body)
+            .context("Failed to parse NVIDIA retailers API response")?;
+        let retailer_skus = check_retailer_skus(&retailers_response, config);
+        link.observe("retailer_skus", &config.retailers_locale, &serde_json::json!(retailer_skus));
+        last_digests.retailers.store(retailers_digest, Ordering::Relaxed);
+    }
+
+    let inventory_body = inventory_body?;
+    let inventory_digest = body_digest(&inventory_body);
+    if inventory_digest == last_digests.inventory.load(Ordering::Relaxed) {
+        return Ok(InventoryCheck::Unchanged);
+    }
+
+    let response: NvidiaResponse = serde_json::from_slice(&inventory_body)
+        .context("Failed to parse NVIDIA API response")?;
+    last_digests.inventory.store(inventory_digest, Ordering::Relaxed);
+    for product in &response.list_map {
+        link.observe("inventory", &format!("{}/{}", product.fe_sku, product.locale), &serde_json::json!({
+            "is_active": product.is_active,
+            "price": product.price,
+            "available": !product.product_url.is_empty(),
+        }));
+    }
+    Ok(InventoryCheck::Changed(response))
+}
+
+/// Alerts on every retailer SKU that is not in the configured list
+/// Returns all SKUs found in the response
+fn check_retailer_skus(retailers_response: &Value, config: &MonitorConfig) -> BTreeSet<String> {
+    let mut found = BTreeSet::new();
     if let Some(searched_products) = retailers_response["searchedProducts"].as_object() {
         info!("Checking SKUs in retailers response...");
         if let Some(product_details) = searched_products.get("productDetails") {
@@ -107,8 +276,9 @@ async fn check_nvidia_api(url: &str, settings: &Config) -> Result<NvidiaResponse
                         for retailer in retailers {
                             if let Some(sku) = retailer["sku"].as_str() {
                                 info!("Found SKU: {}", sku);
+                                found.insert(sku.to_string());
                                 // Compare with default SKUs
-                                if !skus.contains(&sku.to_string()) {
+                                if !config.skus.contains(sku) {
                                     let msg = format!("SKU change detected! New SKU: {}", sku);
                                     warn!("{}", msg);
                                     show_notification("SKU Change Alert", &msg);
@@ -123,20 +293,7 @@ async fn check_nvidia_api(url: &str, settings: &Config) -> Result<NvidiaResponse
     } else {
         info!("No searched products found in retailers response");
     }
-
-    // Continue with the original inventory check
-    let response = client
-        .get(url)
-        .headers(headers)
-        .timeout(Duration::from_secs(30))
-        .send()
-        .await
-        .context("Failed to send request to NVIDIA API")?
-        .json::<NvidiaResponse>()
-        .await
-        .context("Failed to parse NVIDIA API response")?;
-
-    Ok(response)
+    found
 }
 
 fn load_reference_response(settings: &Config) -> Result<NvidiaResponse> {
@@ -235,7 +392,7 @@ async fn main() -> Result<()> {
         .context("Failed to load configuration")?;
     
     // Get API URL from command line args or config file
-    let api_url = args.url.unwrap_or_else(|| {
+    let api_url = args.url.clone().unwrap_or_else(|| {
         settings.get_string("api.fe_inventory_url")
             .expect("Failed to get FE inventory URL from config")
     });
@@ -248,31 +405,133 @@ async fn main() -> Result<()> {
     info!("Monitoring URL: {}", api_url);
     info!("Check interval: {} seconds", args.interval);
 
-    // Load reference response from config
+    // Compare against the last seen state, starting from the config reference on the first run
     let reference_response = load_reference_response(&settings)?;
     info!("Loaded reference response from config");
+    let mut baseline = Baseline::load(baseline::default_path(&args.config), reference_response);
+    
+    // Parse config and build the shared client once instead of every cycle
+    let mut monitor_config = MonitorConfig::load(&settings, &api_url)?;
+    let client = build_client()?;
+    
+    // Request permits are granted by the coordinator when it runs the monitor
+    let link = CoordinatorLink::new();
+    link.spawn_listener();
+    let last_digests = LastDigests::default();
     
     let mut cycle_count = 0;
+    let mut interval_secs = args.interval;
+    let mut interval = tokio::time::interval(Duration::from_secs(interval_secs));
+    interval.set_missed_tick_behavior(MissedTickBehavior::Delay);
+    
+    // Live status for `python -m coordinator.status_board`, updated in place after every check
+    let mut status_board = StatusBoard::open(EARLY_WARNING_SLOT);
+    let mut status = StatusRecord {
+        state: STATE_STARTING,
+        detail: monitor_config.summary(interval_secs),
+        ..Default::default()
+    };
+    status_board.publish(&status);
     
     // Main monitoring loop
     loop {
+        // Coordinator commands wake the loop early; only a tick runs a check
+        let ticked = tokio::select! {
+            _ = interval.tick() => true,
+            _ = link.changed() => false,
+        };
+        
+        if let Some(secs) = link.take_interval_request() {
+            interval_secs = secs;
+            interval = tokio::time::interval_at(
+                tokio::time::Instant::now() + Duration::from_secs(secs),
+                Duration::from_secs(secs),
+            );
+            interval.set_missed_tick_behavior(MissedTickBehavior::Delay);
+            info!("Check interval set to {} seconds", secs);
+            status.detail = monitor_config.summary(interval_secs);
+        }
+        
+        if link.take_reload_request() {
+            let reloaded = Config::builder()
+                .add_source(config::File::with_name(&args.config))
+                .build()
+                .context("Failed to load configuration")
+                .and_then(|settings| {
+                    let url = match &args.url {
+                        Some(url) => url.clone(),
+                        None => settings.get_string("api.fe_inventory_url")
+                            .context("Failed to get FE inventory URL from config")?,
+                    };
+                    MonitorConfig::load(&settings, &url)
+                });
+            match reloaded {
+                Ok(config) => {
+                    monitor_config = config;
+                    status.detail = monitor_config.summary(interval_secs);
+                    // Rescan the next responses against the new settings
+                    last_digests.retailers.store(0, Ordering::Relaxed);
+                    last_digests.inventory.store(0, Ordering::Relaxed);
+                    info!("Configuration reloaded from {}", args.config);
+                }
+                Err(e) => error!("Failed to reload configuration, keeping the current one: {:#}", e),
+            }
+        }
+        
+        if link.is_paused() {
+            if status.state != STATE_PAUSED {
+                status.state = STATE_PAUSED;
+                status_board.publish(&status);
+            }
+            continue;
+        }
+        if !ticked {
+            if status.state == STATE_PAUSED {
+                // Resumed: check right away and count the interval from here
+                interval.reset();
+            } else {
+                // Woken by an interval change or reload: show it right away
+                status_board.publish(&status);
+                continue;
+            }
+        }
         cycle_count += 1;
         let start_time = Instant::now();
         
-        match check_nvidia_api(&api_url, &settings).await {
-            Ok(response) => {
+        let result = check_nvidia_api(&client, &monitor_config, &link, &last_digests).await;
+        status.state = STATE_RUNNING;
+        status.cycle = cycle_count;
+        status.last_poll_ms = status_board::now_ms();
+        status.latency_ms = start_time.elapsed().as_millis() as u32;
+        match &result {
+            Ok(InventoryCheck::Changed(response)) if !response.success => status.errors += 1,
+            Err(_) => status.errors += 1,
+            _ => {}
+        }
+        
+        match result {
+            Ok(InventoryCheck::Unchanged) => {
+                info!(
+                    "Cycle #{}: Response time: {:.2}s - Response unchanged",
+                    cycle_count,
+                    start_time.elapsed().as_secs_f64()
+                );
+            }
+            Ok(InventoryCheck::Changed(response)) => {
                 let elapsed = start_time.elapsed();
                 
                 if response.success {
-                    info!("API Response: {:?}", response);
-                    
-                    if response != reference_response {
-                        warn!("Response differs from reference - possible SKU or inventory change!");
-                        info!("Expected: {:?}", reference_response);
-                        info!("Received: {:?}", response);
+                    let changes = baseline.update(response);
+                    if !changes.is_empty() {
+                        status.events += changes.len() as u64;
+                        warn!("Response differs from reference - possible SKU or inventory change! ({} field changes)",
+                              changes.len());
+                        for change in &changes {
+                            warn!("  {}", change);
+                        }
                         show_notification(
                             "NVIDIA FE Response Change!",
-                            "API response differs from reference - possible SKU or inventory change!"
+                            &changes.iter().map(|change| change.to_string()).collect::<Vec<_>>().join("\n")
                         );
                         play_alert_sound();
                     } else {
@@ -298,9 +557,17 @@ async fn main() -> Result<()> {
                     elapsed.as_secs_f64(),
                     e
                 );
+                
+                // Standalone, honor Retry-After ourselves; the coordinator does it for us otherwise
+                if let Some(throttled) = e.downcast_ref::<ThrottledError>() {
+                    let retry_after_secs = throttled.retry_after_secs.unwrap_or(0);
+                    if !link.is_enabled() && retry_after_secs > interval_secs {
+                        tokio::time::sleep(Duration::from_secs(retry_after_secs - interval_secs)).await;
+                        interval.reset();
+                    }
+                }
             }
         }
-        
-        sleep(Duration::from_secs(args.interval));
+        status_board.publish(&status);
     }
 }
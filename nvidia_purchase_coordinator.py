@@ -7,19 +7,59 @@ This script coordinates all components of the NVIDIA purchase system:
 2. Periodically refreshes cookies (every 12-15 minutes)
 3. Starts the product-scanner/purchase logic
 4. Runs the early-warning indicator to detect API status changes
+5. Adapts the scanner's polling rate to early-warning signals
+6. Shares one request budget per API host between scanner and early-warning
+7. Records every change the pollers observe in a SQLite history store
+8. Pre-arms cookies and polling before drop windows mined from past logs
+9. Accepts runtime commands on a local control socket (python -m coordinator.ctl)
+10. Keeps recent output in a flight recorder that is dumped on incidents
+11. Publishes the live state of every component on a memory-mapped status board
 """
 import argparse
 import os
 import random
+import shlex
 import signal
 import subprocess
 import sys
 import time
 import threading
-import winsound
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import codecs
+import json
+try:
+    import winsound
+except ImportError:  # Sound alerts are only available on Windows
+    winsound = None
+from coordinator.rate_policy import (
+    RatePolicy,
+    run_rate_policy,
+    DEFAULT_BASELINE_INTERVAL_MS,
+    DEFAULT_BOOST_INTERVAL_MS,
+    DEFAULT_BOOST_WINDOW_MINUTES,
+)
+from coordinator.request_budget import RequestBudget
+from coordinator.history import HistoryStore, DEFAULT_HISTORY_PATH
+from coordinator.startup import StartupPipeline
+from coordinator.profiling import Profiler, DEFAULT_PROFILE_DIR, DEFAULT_DUMP_INTERVAL_SECS
+from coordinator.drop_windows import DropWindowPlanner, default_log_paths, DEFAULT_PREARM_MINUTES
+from coordinator.control import ControlServer, CommandError, DEFAULT_CONTROL_PATH
+from coordinator.latency_summary import LatencySummary
+from coordinator.flight_recorder import (
+    FlightRecorder,
+    FlightRecorderHandler,
+    DEFAULT_FLIGHT_DIR,
+    DEFAULT_WINDOW_MINUTES,
+)
+from coordinator.status_board import (
+    StatusBoard,
+    DEFAULT_STATUS_BOARD_PATH,
+    STATUS_BOARD_ENV,
+    COORDINATOR_SLOT,
+    STATE_RUNNING,
+    STATE_STOPPED,
+)
 
 # Configure logging with UTF-8 encoding
 def setup_logging():
@@ -49,6 +89,25 @@ def setup_logging():
 # Create logger instance
 logger = setup_logging()
 
+# Always-on ring buffer of recent child output and coordinator events, dumped on incidents
+flight_recorder = FlightRecorder()
+# Child output is recorded as it is read, so its echo in the log is skipped
+logger.addHandler(FlightRecorderHandler(flight_recorder, skip_prefixes=("Scanner: ", "Purchase: ", "Early Warning: ")))
+SCANNER_SOURCE = flight_recorder.source("scanner")
+EARLY_WARNING_SOURCE = flight_recorder.source("early-warning")
+COOKIE_PREP_SOURCE = flight_recorder.source("cookie-prep")
+
+# Per-cycle output that only goes to the flight recorder (and the console) unless --full-log is set
+ROUTINE_OUTPUT_MARKERS = (
+    "📡 Server response",
+    "⏱️ Polling interval set",
+    "Response unchanged",
+    "Retailers response unchanged",
+    "Checking SKUs in retailers response",
+    "Found SKU:",
+    "Response matches reference",
+)
+
 # Paths to main components
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 COOKIE_PREP_DIR = os.path.join(BASE_DIR, "cookie-prep", "src")
@@ -56,11 +115,63 @@ PRODUCT_SCANNER_DIR = os.path.join(BASE_DIR, "product-scanner")
 EARLY_WARNING_DIR = os.path.join(BASE_DIR, "early-warning")
 COOKIE_OUTPUT_PATH = os.path.join(BASE_DIR, "shared", "scripts", "captured_cookies.json")
 
+# Component commands; the soak harness (tools/soak) replaces them with stubs
+SCANNER_COMMAND = ["cargo", "run", "--bin", "product-scanner"]  # The binary name must match Cargo.toml
+EARLY_WARNING_COMMAND = ["cargo", "run", "--release", "--", "--verbose"]  # "--interval <secs>" is appended
+COOKIE_PREP_SCRIPT = os.path.join(COOKIE_PREP_DIR, "main.py")
+DEFAULT_COOKIE_REFRESH_MINUTES = (12, 15)
+
 # Global variables
 scanner_process = None
 early_warning_process = None
 shutdown_event = threading.Event()
 silent_mode = False  # Default to sound alerts enabled
+full_log = False  # Also write routine per-cycle output to coordinator.log
+rate_policy = None
+request_budget = None
+history_store = None
+drop_window_planner = None
+startup_pipeline = None
+profiler = None
+control_server = None
+paused_components = set()
+early_warning_interval = None
+started_at = time.time()
+first_poll_event = threading.Event()
+command_lock = threading.Lock()
+cookie_refresh_lock = threading.Lock()
+last_cookie_refresh = 0.0  # time.time() of the last cookie refresh attempt
+cookie_refreshes = 0
+cookie_refresh_failures = 0
+last_cookie_refresh_ms = 0  # Duration of the last cookie refresh
+status_board = None
+status_board_env = {}  # Passes the board's path to the components
+scanner_command = SCANNER_COMMAND
+early_warning_command = EARLY_WARNING_COMMAND
+cookie_prep_script = COOKIE_PREP_SCRIPT
+cookie_output_path = COOKIE_OUTPUT_PATH
+cookie_refresh_minutes = DEFAULT_COOKIE_REFRESH_MINUTES
+
+# Metrics snapshot written periodically for external tools
+METRICS_PATH = os.path.join("logs", "metrics.json")
+METRICS_INTERVAL_SECS = 15
+STATUS_INTERVAL_SECS = 1
+
+# Prefix of machine-readable lines in component output
+COMPONENT_MESSAGE_PREFIX = "@@"
+
+# How long to wait for the scanner's first poll (includes compiling it)
+FIRST_POLL_TIMEOUT_SECS = 15 * 60
+
+# Cookies older than this are refreshed when pre-arming for a drop window
+PREARM_COOKIE_MAX_AGE_SECS = 5 * 60
+
+# Early-warning check interval in seconds
+DEFAULT_EARLY_WARNING_INTERVAL = 30
+
+# Environment variable telling child components that they are run by the coordinator
+# and should accept commands on stdin
+COORDINATOR_ENV = {"NVIDIA_COORDINATOR": "1"}
 
 # Sound settings for different events
 SOUND_PATTERNS = {
@@ -81,8 +192,8 @@ def play_sound(sound_type):
     """
     global silent_mode
     
-    if silent_mode:
-        logger.debug(f"Silent mode: Sound alert for {sound_type} suppressed")
+    if silent_mode or winsound is None:
+        logger.debug(f"Sound alert for {sound_type} suppressed")
         return
     
     if sound_type in SOUND_PATTERNS:
@@ -102,19 +213,179 @@ def format_timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+def send_command(process, command):
+    """
+    Send a single-line command to a child component over its stdin.
+
+    Args:
+        process (subprocess.Popen): The child process
+        command (str): The command line, without trailing newline
+
+    Returns:
+        bool: True if the command was written, False otherwise
+    """
+    if process is None or process.stdin is None or process.poll() is not None:
+        return False
+
+    try:
+        with command_lock:
+            process.stdin.write(command + "\n")
+            process.stdin.flush()
+        return True
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to send command '{command}': {e}")
+        return False
+
+
+def push_scanner_interval(min_ms, max_ms):
+    """Push a new polling interval to the running product scanner"""
+    return send_command(scanner_process, f"interval {min_ms} {max_ms}")
+
+
+def signal_rate_policy(reason, window_minutes=None):
+    """Start a fast-polling window in the rate policy, if it is running"""
+    if rate_policy is not None:
+        rate_policy.signal(reason, window_minutes)
+
+
+def record_drop_event(reason):
+    """Handle a drop-related event seen in component output"""
+    signal_rate_policy(reason)
+    if drop_window_planner is not None:
+        drop_window_planner.record_event(reason)
+
+
+def handle_component_message(process, line, source):
+    """
+    Handle a machine-readable line from a child component.
+
+    Supported messages:
+        @@permit <id> <host>                 Request a permit for one request to host
+        @@http <host> <status> <retry_after> Report the status of a response ("-" if no Retry-After)
+        @@observe <kind> <key> <json>        Report an observed state for the history store
+
+    Args:
+        process (subprocess.Popen): The component that sent the line
+        line (str): The line including the "@@" prefix
+        source (str): Name of the component, stored with observed states
+    """
+    parts = line[len(COMPONENT_MESSAGE_PREFIX):].split(maxsplit=3)
+    if not parts:
+        return
+
+    try:
+        if parts[0] == "permit" and len(parts) == 3:
+            permit_id, host = parts[1], parts[2]
+            if request_budget is None:
+                send_command(process, f"grant {permit_id}")
+            else:
+                request_budget.request(host, lambda: send_command(process, f"grant {permit_id}"))
+        elif parts[0] == "http" and len(parts) == 4:
+            retry_after = None if parts[3] == "-" else int(parts[3])
+            if request_budget is not None:
+                request_budget.report(parts[1], int(parts[2]), retry_after)
+        elif parts[0] == "observe" and len(parts) == 4:
+            if history_store is not None:
+                history_store.observe(source, parts[1], parts[2], json.loads(parts[3]))
+        else:
+            logger.warning(f"Unknown component message: {line}")
+    except ValueError:
+        logger.warning(f"Malformed component message: {line}")
+
+
+def collect_metrics():
+    """
+    Gather the metrics of all running coordinator services.
+
+    Returns:
+        dict: Metrics as written to METRICS_PATH
+    """
+    metrics = {"timestamp": format_timestamp()}
+    if request_budget is not None:
+        metrics["request_budget"] = request_budget.metrics()
+    if history_store is not None:
+        metrics["history"] = history_store.metrics()
+    if drop_window_planner is not None:
+        metrics["drop_windows"] = drop_window_planner.metrics()
+    if startup_pipeline is not None:
+        metrics["startup"] = startup_pipeline.timings()
+    metrics["flight_recorder"] = flight_recorder.metrics()
+    return metrics
+
+
+def write_metrics(metrics):
+    """Atomically replace METRICS_PATH with the given metrics"""
+    try:
+        tmp_path = METRICS_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(metrics, file, indent=2)
+        os.replace(tmp_path, METRICS_PATH)
+    except OSError as e:
+        logger.error(f"Failed to write metrics: {e}")
+
+
+def publish_status(state=STATE_RUNNING):
+    """Write the coordinator's own record to the status board"""
+    if status_board is None:
+        return
+    details = []
+    if rate_policy is not None:
+        min_ms, max_ms = rate_policy.current_interval()
+        details.append(f"polling {rate_policy.state()} {min_ms}-{max_ms} ms")
+    if paused_components:
+        details.append(f"paused: {', '.join(sorted(paused_components))}")
+    age = cookie_age_secs()
+    if cookie_refresh_lock.locked():
+        details.append("refreshing cookies")
+    elif age is not None:
+        details.append(f"cookies {age / 60:.0f} min old")
+    status_board.publish(
+        COORDINATOR_SLOT, state,
+        cycle=cookie_refreshes + cookie_refresh_failures,
+        last_poll_ms=int(last_cookie_refresh * 1000),
+        latency_ms=last_cookie_refresh_ms,
+        events=cookie_refreshes,
+        errors=cookie_refresh_failures,
+        detail=", ".join(details),
+    )
+
+
+def status_board_publisher():
+    """
+    Thread function that keeps the coordinator's status board record current.
+    """
+    while not shutdown_event.wait(STATUS_INTERVAL_SECS):
+        publish_status()
+
+
+def is_routine_output(line):
+    """Return True for per-cycle output that is left out of coordinator.log"""
+    return not full_log and any(marker in line for marker in ROUTINE_OUTPUT_MARKERS)
+
+
+def metrics_writer():
+    """
+    Thread function that periodically writes the request budget metrics to METRICS_PATH.
+    """
+    while not shutdown_event.wait(METRICS_INTERVAL_SECS):
+        if request_budget is None:
+            continue
+        write_metrics(collect_metrics())
+
+
 def check_session_cookies():
     """
     Check if session cookies exist and are valid
     Returns True if valid cookies are found, False otherwise
     """
     try:
-        if not os.path.exists(COOKIE_OUTPUT_PATH):
+        if not os.path.exists(cookie_output_path):
             logger.warning("Cookie file not found")
             print(f"[{format_timestamp()}] Cookie file not found")
             return False
             
         # Check if the cookie file has content and contains the cf_clearance cookie
-        with open(COOKIE_OUTPUT_PATH, 'r') as file:
+        with open(cookie_output_path, 'r') as file:
             cookie_content = file.read()
             if not cookie_content:
                 logger.warning("Cookie file is empty")
@@ -143,7 +414,7 @@ def run_session_manager():
     Returns:
         bool: True if successful, False otherwise
     """
-    cookie_prep_path = os.path.join(COOKIE_PREP_DIR, "main.py")
+    cookie_prep_path = cookie_prep_script
     
     if not os.path.exists(cookie_prep_path):
         logger.error(f"Cookie prep script not found at {cookie_prep_path}")
@@ -158,10 +429,11 @@ def run_session_manager():
             [sys.executable, cookie_prep_path],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            cwd=COOKIE_PREP_DIR,
+            cwd=os.path.dirname(cookie_prep_path),
             text=True,
             encoding='utf-8',  # Specify UTF-8 encoding
-            errors='replace'   # Replace invalid characters
+            errors='replace',  # Replace invalid characters
+            env={**os.environ, **status_board_env},
         )
         
         # Create threads to read stdout and stderr in real-time
@@ -171,6 +443,7 @@ def run_session_manager():
                     line = line.rstrip()
                     if not line:
                         continue
+                    flight_recorder.record(COOKIE_PREP_SOURCE, line)
                         
                     # Let through ALL retry messages, error messages with cookies, and others that might be important
                     if (is_error and "cookie" in line.lower()) or "retry" in line.lower() or "trying again" in line.lower():
@@ -209,9 +482,9 @@ def run_session_manager():
         return_code = process.returncode
         
         if return_code == 0:
-            if os.path.exists(COOKIE_OUTPUT_PATH):
+            if os.path.exists(cookie_output_path):
                 # Check if the cookies file was updated in the last minute
-                if time.time() - os.path.getmtime(COOKIE_OUTPUT_PATH) < 60:
+                if time.time() - os.path.getmtime(cookie_output_path) < 60:
                     logger.info("Cookie refresh successful")
                     print(f"[{format_timestamp()}] Cookie refresh successful")
                     return True
@@ -221,7 +494,7 @@ def run_session_manager():
                     play_sound("cookie_error")
                     return False
             else:
-                logger.error(f"Cookie file not found at {COOKIE_OUTPUT_PATH}")
+                logger.error(f"Cookie file not found at {cookie_output_path}")
                 print(f"[{format_timestamp()}] Cookie refresh failed - file not found")
                 play_sound("cookie_error")
                 return False
@@ -254,8 +527,10 @@ def start_product_scanner():
         # Navigate to product-scanner directory and run cargo run with specific binary
         # The binary name must match exactly what's in Cargo.toml: "product-scanner" (with hyphen)
         scanner_process = subprocess.Popen(
-            ["cargo", "run", "--bin", "product-scanner"],  # Explicitly specify the binary name
+            scanner_command,
             cwd=PRODUCT_SCANNER_DIR,
+            # Commands such as interval changes are sent over stdin
+            stdin=subprocess.PIPE,
             # Don't capture output so it's displayed in real-time
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -263,14 +538,29 @@ def start_product_scanner():
             encoding='utf-8',  # Specify UTF-8 encoding
             errors='replace',   # Replace invalid characters
             bufsize=1,  # Line buffered
+            env={**os.environ, **COORDINATOR_ENV, **status_board_env},
         )
         
         # Create a thread to read and log output
-        def log_scanner_output():
-            for line in scanner_process.stdout:
+        def log_scanner_output(process):
+            # Response lines are routine output; their latencies go to coordinator.log once per minute
+            latency_summary = LatencySummary()
+            for line in process.stdout:
                 line = line.rstrip()
+                flight_recorder.record(SCANNER_SOURCE, line)
+                if line.startswith(COMPONENT_MESSAGE_PREFIX):
+                    handle_component_message(process, line, "scanner")
+                    continue
                 print(line)
                 
+                if not first_poll_event.is_set() and "📡 Server response" in line:
+                    first_poll_event.set()
+                if is_routine_output(line):
+                    summary = latency_summary.add(line)
+                    if summary:
+                        logger.info(summary)
+                    continue
+                
                 # Add specific prefixes for purchase-related logs to make them more identifiable
                 if "[INFO] Loading cookies" in line or "[INFO] Loaded" in line or "[INFO] Found cf_clearance" in line:
                     logger.info(f"Purchase: {line}")
@@ -288,15 +578,24 @@ def start_product_scanner():
                 # Check for specific messages to trigger sound alerts
                 lower_line = line.lower()
                 if "is available" in lower_line or "launching purchase" in lower_line:
+                    record_drop_event("product available")
+                    flight_recorder.trigger("product_available")
                     play_sound("product_available")
                 elif "purchase process completed successfully" in lower_line:
                     play_sound("product_available")  # Use same sound for successful purchase
                 elif "all purchase attempts failed" in lower_line:
+                    flight_recorder.trigger("purchase_failed")
                     play_sound("api_error")  # Use error sound for failed purchase
+                elif "purchase attempt failed" in lower_line:
+                    flight_recorder.trigger("purchase_failed")
                 elif "api response" in lower_line and "200" not in lower_line:
                     play_sound("api_error")
+            
+            summary = latency_summary.flush()
+            if summary:
+                logger.info(summary)
         
-        output_thread = threading.Thread(target=log_scanner_output)
+        output_thread = threading.Thread(target=log_scanner_output, args=(scanner_process,))
         output_thread.daemon = True
         output_thread.start()
         
@@ -309,10 +608,13 @@ def start_product_scanner():
         return None
 
 
-def start_early_warning():
+def start_early_warning(interval=DEFAULT_EARLY_WARNING_INTERVAL):
     """
     Start the early-warning monitor process.
     
+    Args:
+        interval (int): Check interval in seconds
+    
     Returns:
         subprocess.Popen: The early-warning process object
     """
@@ -324,8 +626,10 @@ def start_early_warning():
     try:
         # Navigate to early-warning directory and run cargo run with verbose flag
         early_warning_process = subprocess.Popen(
-            ["cargo", "run", "--release", "--", "--verbose", "--interval", "30"],
+            early_warning_command + ["--interval", str(interval)],
             cwd=EARLY_WARNING_DIR,
+            # Request permits are granted over stdin
+            stdin=subprocess.PIPE,
             # Don't capture output so it's displayed in real-time
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -333,26 +637,41 @@ def start_early_warning():
             encoding='utf-8',  # Specify UTF-8 encoding
             errors='replace',   # Replace invalid characters
             bufsize=1,  # Line buffered
-            env={**os.environ, "RUST_LOG": "info"}  # Set logging level for the early-warning component
+            env={**os.environ, **COORDINATOR_ENV, **status_board_env, "RUST_LOG": "info"}  # Set logging level for the early-warning component
         )
         
         # Create a thread to read and log output
-        def log_early_warning_output():
-            for line in early_warning_process.stdout:
+        def log_early_warning_output(process):
+            for line in process.stdout:
                 line = line.rstrip()
+                if line:
+                    flight_recorder.record(EARLY_WARNING_SOURCE, line)
+                if line.startswith(COMPONENT_MESSAGE_PREFIX):
+                    handle_component_message(process, line, "early-warning")
+                    continue
                 # Only print if line is not empty
                 if line:
                     print(f"[Early Warning] {line}")
-                    logger.info(f"Early Warning: {line}")
+                    if not is_routine_output(line):
+                        logger.info(f"Early Warning: {line}")
                     
                     # Check for specific messages to trigger sound alerts
                     lower_line = line.lower()
+                    if "sku change detected" in lower_line:
+                        record_drop_event("SKU change")
+                    elif "differs from reference" in lower_line:
+                        record_drop_event("reference diff")
+                    
                     if "detected changes" in lower_line or "status change" in lower_line:
                         play_sound("early_warning")
                     elif "error" in lower_line:
                         play_sound("api_error")
+            
+            if not shutdown_event.is_set():
+                logger.warning("Early-warning monitor output ended unexpectedly")
+                flight_recorder.trigger("early_warning_exit")
         
-        output_thread = threading.Thread(target=log_early_warning_output)
+        output_thread = threading.Thread(target=log_early_warning_output, args=(early_warning_process,))
         output_thread.daemon = True
         output_thread.start()
         
@@ -429,26 +748,265 @@ def stop_early_warning():
         early_warning_process = None
 
 
+def refresh_cookies():
+    """
+    Run the session manager, unless another refresh is already in progress.
+
+    Returns:
+        bool: True if cookies were refreshed, False otherwise
+    """
+    global last_cookie_refresh, cookie_refreshes, cookie_refresh_failures, last_cookie_refresh_ms
+    
+    if not cookie_refresh_lock.acquire(blocking=False):
+        logger.info("Cookie refresh already in progress")
+        return False
+    try:
+        last_cookie_refresh = time.time()
+        refreshed = run_session_manager()
+        last_cookie_refresh_ms = int((time.time() - last_cookie_refresh) * 1000)
+        if refreshed:
+            cookie_refreshes += 1
+        else:
+            cookie_refresh_failures += 1
+        return refreshed
+    finally:
+        cookie_refresh_lock.release()
+
+
+def cookie_age_secs():
+    """Return the age of the cookie file in seconds (None if it doesn't exist)"""
+    try:
+        return time.time() - os.path.getmtime(cookie_output_path)
+    except OSError:
+        return None
+
+
+def prepare_initial_cookies():
+    """
+    Startup stage: use the existing cookies if they are valid, otherwise run the session manager.
+
+    Returns:
+        bool: True if valid cookies are available
+    """
+    if check_session_cookies():
+        return True
+    return refresh_cookies()
+
+
+def wait_for_first_poll():
+    """
+    Startup stage: wait until the scanner has received its first inventory response.
+
+    Returns:
+        bool: True if the scanner polled within FIRST_POLL_TIMEOUT_SECS
+    """
+    deadline = time.monotonic() + FIRST_POLL_TIMEOUT_SECS
+    while not first_poll_event.wait(1):
+        if shutdown_event.is_set() or scanner_process is None or scanner_process.poll() is not None:
+            return False
+        if time.monotonic() > deadline:
+            logger.warning("No scanner poll within the startup timeout")
+            return False
+    return True
+
+
 def cookie_refresh_scheduler():
     """
     Thread function that periodically runs the session manager to refresh cookies.
     """
     while not shutdown_event.is_set():
-        # Wait 12-15 minutes before refreshing cookies
-        minutes = random.randint(12, 15)
+        # Refresh 12-15 minutes after the last refresh (which may have been a pre-arm)
+        min_minutes, max_minutes = cookie_refresh_minutes
+        minutes = random.uniform(min_minutes, max_minutes)
         seconds = minutes * 60
         
-        logger.info(f"Scheduled next cookie refresh in {minutes} minutes")
-        print(f"[{format_timestamp()}] Scheduled next cookie refresh in {minutes} minutes")
+        logger.info(f"Scheduled next cookie refresh in {minutes:.1f} minutes")
+        print(f"[{format_timestamp()}] Scheduled next cookie refresh in {minutes:.1f} minutes")
         
         # Sleep in small increments to check for shutdown
-        for _ in range(seconds):
+        while time.time() - last_cookie_refresh < seconds:
             if shutdown_event.is_set():
                 return
             time.sleep(1)
         
         # Run session manager to refresh cookies
-        run_session_manager()
+        refresh_cookies()
+
+
+def prearm_for_drop_window(window, start):
+    """
+    Get ready for a likely drop: fresh cookies and fast polling through the window.
+
+    Args:
+        window (DropWindow): The upcoming window
+        start (datetime): When the window starts
+    """
+    age = cookie_age_secs()
+    if age is None or age > PREARM_COOKIE_MAX_AGE_SECS:
+        logger.info("Refreshing cookies before drop window")
+        refresh_cookies()
+    
+    end = start + timedelta(minutes=drop_window_planner.slot_minutes)
+    signal_rate_policy("drop window", max(1.0, (end - datetime.now()).total_seconds() / 60))
+
+
+def component_process(name):
+    """
+    Return the process of a component addressed by a control command.
+
+    Raises:
+        CommandError: If the name is unknown or the component is not running
+    """
+    processes = {"scanner": scanner_process, "early-warning": early_warning_process}
+    if name not in processes:
+        raise CommandError(f"Unknown component '{name}' (expected scanner or early-warning)")
+    process = processes[name]
+    if process is None or process.poll() is not None:
+        raise CommandError(f"{name} is not running")
+    return process
+
+
+def control_status():
+    """Control command: component, polling and cookie state (never blocks)"""
+    components = {}
+    for name, process in (("scanner", scanner_process), ("early-warning", early_warning_process)):
+        running = process is not None and process.poll() is None
+        components[name] = {
+            "running": running,
+            "pid": process.pid if process is not None else None,
+            "paused": name in paused_components,
+        }
+    components["early-warning"]["interval_secs"] = early_warning_interval
+
+    age = cookie_age_secs()
+    status = {
+        "uptime_secs": round(time.time() - started_at),
+        "components": components,
+        "cookies": {
+            "age_secs": round(age) if age is not None else None,
+            "refresh_in_progress": cookie_refresh_lock.locked(),
+            "last_refresh": datetime.fromtimestamp(last_cookie_refresh).strftime("%Y-%m-%d %H:%M:%S")
+            if last_cookie_refresh else None,
+        },
+    }
+    if rate_policy is not None:
+        min_ms, max_ms = rate_policy.current_interval()
+        status["polling"] = {
+            "state": rate_policy.state(),
+            "interval_ms": [min_ms, max_ms],
+            "baseline_interval_ms": rate_policy.baseline_interval_ms,
+            "boost_interval_ms": rate_policy.boost_interval_ms,
+        }
+    if startup_pipeline is not None:
+        status["startup"] = startup_pipeline.timings()
+    return status
+
+
+def control_refresh_cookies():
+    """Control command: start a cookie refresh in the background"""
+    if cookie_refresh_lock.locked():
+        return "Cookie refresh already in progress"
+    thread = threading.Thread(target=refresh_cookies, name="control-cookie-refresh")
+    thread.daemon = True
+    thread.start()
+    return "Cookie refresh started"
+
+
+def control_pause(component):
+    """Control command: stop a component from polling without stopping its process"""
+    if not send_command(component_process(component), "pause"):
+        raise CommandError(f"Could not reach {component}")
+    paused_components.add(component)
+    print(f"[{format_timestamp()}] ⏸️ {component} paused")
+    return f"{component} paused"
+
+
+def control_resume(component):
+    """Control command: let a paused component poll again"""
+    if not send_command(component_process(component), "resume"):
+        raise CommandError(f"Could not reach {component}")
+    paused_components.discard(component)
+    print(f"[{format_timestamp()}] ▶️ {component} resumed")
+    return f"{component} resumed"
+
+
+def control_set_interval(component, *values):
+    """
+    Control command: change a polling interval.
+
+    "set-interval scanner <baseline_ms> [<boost_ms>]" changes the rate policy, which pushes
+    the new interval to the scanner; "set-interval early-warning <secs>" is sent directly.
+    """
+    global early_warning_interval
+    
+    try:
+        values = [int(value) for value in values]
+    except ValueError:
+        raise CommandError("Intervals must be integers")
+    if not values or len(values) > 2 or min(values) <= 0:
+        raise CommandError("Expected one or two positive intervals")
+    
+    if component == "scanner":
+        if rate_policy is None:
+            raise CommandError("Rate policy is not running")
+        rate_policy.set_intervals(*values)
+        return {"baseline_interval_ms": rate_policy.baseline_interval_ms,
+                "boost_interval_ms": rate_policy.boost_interval_ms}
+    if len(values) != 1:
+        raise CommandError("Expected one interval in seconds for early-warning")
+    if not send_command(component_process(component), f"interval {values[0]}"):
+        raise CommandError(f"Could not reach {component}")
+    early_warning_interval = values[0]
+    return {"interval_secs": early_warning_interval}
+
+
+def control_reload_config(component=None):
+    """Control command: make one or both components re-read their config/default.toml"""
+    if component:
+        if not send_command(component_process(component), "reload"):
+            raise CommandError(f"Could not reach {component}")
+        return f"Reload requested for {component}"
+
+    reloaded = [name for name, process in (("scanner", scanner_process), ("early-warning", early_warning_process))
+                if send_command(process, "reload")]
+    if not reloaded:
+        raise CommandError("No component is running")
+    return f"Reload requested for {', '.join(reloaded)}"
+
+
+def control_flight_dump():
+    """Control command: write a flight recorder snapshot now"""
+    return flight_recorder.dump("operator")
+
+
+def control_dump_metrics():
+    """Control command: write metrics now and return them"""
+    metrics = collect_metrics()
+    write_metrics(metrics)
+    return metrics
+
+
+CONTROL_COMMANDS = {
+    "status": control_status,
+    "refresh-cookies": control_refresh_cookies,
+    "pause": control_pause,
+    "resume": control_resume,
+    "set-interval": control_set_interval,
+    "reload-config": control_reload_config,
+    "dump-metrics": control_dump_metrics,
+    "flight-dump": control_flight_dump,
+}
+
+
+def dump_flight_recorder_on_crash(reason, original_hook):
+    """Wrap an exception hook so an uncaught exception writes a flight recorder snapshot first"""
+    def hook(*args):
+        try:
+            flight_recorder.dump(reason)
+        except OSError:
+            pass
+        original_hook(*args)
+    return hook
 
 
 def signal_handler(sig, frame):
@@ -465,6 +1023,15 @@ def signal_handler(sig, frame):
     stop_product_scanner()
     stop_early_warning()
     
+    # Flush observed state changes that are still queued
+    if history_store is not None:
+        history_store.stop()
+    
+    if profiler is not None:
+        profiler.dump("shutdown")
+    
+    publish_status(STATE_STOPPED)
+    
     print(f"[{format_timestamp()}] Coordinator shutdown complete")
     sys.exit(0)
 
@@ -478,6 +1045,44 @@ def parse_arguments():
     """
     parser = argparse.ArgumentParser(description="NVIDIA Purchase Coordinator")
     parser.add_argument("--silent", action="store_true", help="Run in silent mode (no sound alerts)")
+    parser.add_argument("--baseline-interval-ms", type=int, default=DEFAULT_BASELINE_INTERVAL_MS,
+                        help="Scanner polling interval while nothing is happening")
+    parser.add_argument("--boost-interval-ms", type=int, default=DEFAULT_BOOST_INTERVAL_MS,
+                        help="Scanner polling interval after an early-warning signal")
+    parser.add_argument("--boost-window", type=float, default=DEFAULT_BOOST_WINDOW_MINUTES,
+                        help="Minutes to keep the fast polling rate after an early-warning signal")
+    parser.add_argument("--history-db", default=DEFAULT_HISTORY_PATH,
+                        help="SQLite file storing observed inventory and SKU changes")
+    parser.add_argument("--prearm-minutes", type=float, default=DEFAULT_PREARM_MINUTES,
+                        help="How long before a predicted drop window to refresh cookies and boost polling")
+    parser.add_argument("--no-drop-windows", action="store_true",
+                        help="Disable drop-window analytics and pre-arming")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write sampled stacks, tracemalloc diffs and a thread/fd census to the profile directory")
+    parser.add_argument("--profile-dir", default=DEFAULT_PROFILE_DIR, help="Where --profile writes its dumps")
+    parser.add_argument("--profile-interval", type=float, default=DEFAULT_DUMP_INTERVAL_SECS,
+                        help="Seconds between profile dumps")
+    parser.add_argument("--early-warning-interval", type=int, default=DEFAULT_EARLY_WARNING_INTERVAL,
+                        help="Early-warning check interval in seconds")
+    parser.add_argument("--control-socket", default=DEFAULT_CONTROL_PATH,
+                        help="Unix socket for python -m coordinator.ctl (empty to disable)")
+    parser.add_argument("--flight-dir", default=DEFAULT_FLIGHT_DIR,
+                        help="Where flight recorder snapshots are written")
+    parser.add_argument("--flight-minutes", type=float, default=DEFAULT_WINDOW_MINUTES,
+                        help="Minutes of output kept in each flight recorder snapshot")
+    parser.add_argument("--status-board", default=DEFAULT_STATUS_BOARD_PATH,
+                        help="Memory-mapped status board for python -m coordinator.status_board (empty to disable)")
+    parser.add_argument("--full-log", action="store_true",
+                        help="Also write routine per-cycle component output to coordinator.log")
+    parser.add_argument("--cookie-refresh-minutes", type=float, nargs=2, metavar=("MIN", "MAX"),
+                        default=DEFAULT_COOKIE_REFRESH_MINUTES, help="Random delay range between cookie refreshes")
+    # Component overrides, used by the soak harness to run the coordinator against stubs
+    parser.add_argument("--scanner-cmd", help="Command line replacing the product scanner")
+    parser.add_argument("--early-warning-cmd",
+                        help="Command line replacing the early-warning monitor (\"--interval <secs>\" is appended)")
+    parser.add_argument("--cookie-prep-script", default=COOKIE_PREP_SCRIPT,
+                        help="Python script run to refresh cookies")
+    parser.add_argument("--cookie-file", default=COOKIE_OUTPUT_PATH, help="Cookie file written by cookie-prep")
     return parser.parse_args()
 
 
@@ -485,11 +1090,27 @@ def main():
     """
     Main coordinator function.
     """
-    global silent_mode
+    global scanner_command, early_warning_command, cookie_prep_script, cookie_output_path, cookie_refresh_minutes
+    global silent_mode, full_log, rate_policy, request_budget, history_store, drop_window_planner, last_cookie_refresh
+    global startup_pipeline, profiler, control_server, early_warning_interval, status_board
     
     # Parse command-line arguments
     args = parse_arguments()
     silent_mode = args.silent
+    full_log = args.full_log
+    if args.scanner_cmd:
+        scanner_command = shlex.split(args.scanner_cmd)
+    if args.early_warning_cmd:
+        early_warning_command = shlex.split(args.early_warning_cmd)
+    cookie_prep_script = os.path.abspath(args.cookie_prep_script)
+    cookie_output_path = os.path.abspath(args.cookie_file)
+    cookie_refresh_minutes = tuple(args.cookie_refresh_minutes)
+    flight_recorder.directory = args.flight_dir
+    flight_recorder.window_secs = args.flight_minutes * 60
+    
+    # Uncaught exceptions in the coordinator write a snapshot before the usual traceback
+    sys.excepthook = dump_flight_recorder_on_crash("crash", sys.excepthook)
+    threading.excepthook = dump_flight_recorder_on_crash("thread_crash", threading.excepthook)
     
     if silent_mode:
         logger.info("Running in silent mode (sound alerts disabled)")
@@ -502,44 +1123,136 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C
     signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
     
+    if args.profile:
+        profiler = Profiler(args.profile_dir, args.profile_interval)
+        profiler.start(shutdown_event)
+        # Dump on demand with `kill -USR1 <pid>` (not available on Windows)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda sig, frame: profiler.request_dump("SIGUSR1"))
+        print(f"[{format_timestamp()}] Profiling enabled, writing to {args.profile_dir}")
+    
+    # Flight recorder snapshot on demand with `kill -USR2 <pid>` (not available on Windows).
+    # The handler only sets an event: the ring's lock may be held by the interrupted main thread
+    flight_thread = threading.Thread(target=flight_recorder.run, args=(shutdown_event,), name="flight-requests")
+    flight_thread.daemon = True
+    flight_thread.start()
+    if hasattr(signal, "SIGUSR2"):
+        signal.signal(signal.SIGUSR2, lambda sig, frame: flight_recorder.request_dump("SIGUSR2"))
+    
     print(f"\n[{format_timestamp()}] ===== NVIDIA Purchase Coordinator =====")
     logger.info("Coordinator starting")
     
     # Initial notification sound
     play_sound("notification")
     
-    # Initial cookie preparation
-    if not check_session_cookies():
-        if not run_session_manager():
-            print(f"[{format_timestamp()}] Failed to get initial cookies, exiting")
-            return 1
+    # Share one request budget per API host between scanner and early-warning
+    request_budget = RequestBudget()
+    budget_thread = threading.Thread(target=request_budget.run, args=(shutdown_event,))
+    budget_thread.daemon = True
+    budget_thread.start()
     
-    # Start cookie refresh in a background thread
-    refresh_thread = threading.Thread(target=cookie_refresh_scheduler)
-    refresh_thread.daemon = True
-    refresh_thread.start()
+    # Persist observed state changes in the background
+    history_store = HistoryStore(args.history_db)
+    history_thread = threading.Thread(target=history_store.run, args=(shutdown_event,))
+    history_thread.daemon = True
+    history_thread.start()
+    
+    metrics_thread = threading.Thread(target=metrics_writer)
+    metrics_thread.daemon = True
+    metrics_thread.start()
+    
+    # Push the adaptive polling rate to the scanner (retried until the scanner is running)
+    rate_policy = RatePolicy(
+        baseline_interval_ms=args.baseline_interval_ms,
+        boost_interval_ms=args.boost_interval_ms,
+        boost_window_minutes=args.boost_window,
+    )
+    rate_thread = threading.Thread(target=run_rate_policy, args=(rate_policy, push_scanner_interval, shutdown_event))
+    rate_thread.daemon = True
+    rate_thread.start()
     
-    # Start the product scanner
-    scanner = start_product_scanner()
-    if not scanner:
+    # Runtime commands (status, pause/resume, intervals, ...) over a local socket
+    early_warning_interval = args.early_warning_interval
+    if args.control_socket:
+        control_server = ControlServer(args.control_socket, CONTROL_COMMANDS)
+        control_thread = threading.Thread(target=control_server.run, args=(shutdown_event,))
+        control_thread.daemon = True
+        control_thread.start()
+    
+    # Live component state, published in place by every component
+    if args.status_board:
+        try:
+            status_board = StatusBoard.create(args.status_board)
+            # Components run in their own directories
+            status_board_env[STATUS_BOARD_ENV] = os.path.abspath(args.status_board)
+            publish_status()
+            status_thread = threading.Thread(target=status_board_publisher)
+            status_thread.daemon = True
+            status_thread.start()
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to create status board: {e}")
+            print(f"[{format_timestamp()}] Status board disabled: {e}")
+    
+    # Cookie preparation runs alongside building and starting the components;
+    # only the scanner's purchase step waits for the cookie
+    last_cookie_refresh = time.time()
+    startup_pipeline = StartupPipeline()
+    startup_pipeline.add_stage("cookies", prepare_initial_cookies)
+    startup_pipeline.add_stage("scanner", start_product_scanner)
+    startup_pipeline.add_stage("early-warning", lambda: start_early_warning(args.early_warning_interval))
+    startup_pipeline.add_stage("first-poll", wait_for_first_poll, after=("scanner",))
+    startup_pipeline.add_stage("cookie-gate", lambda: send_command(scanner_process, "cookie-ready"),
+                               after=("cookies", "scanner"))
+    startup_pipeline.start()
+    
+    if not startup_pipeline.wait("scanner"):
         print(f"[{format_timestamp()}] Failed to start product scanner, exiting")
+        stop_early_warning()
         return 1
+    scanner = startup_pipeline.result("scanner")
     
-    # Start the early-warning monitor
-    early_warning = start_early_warning()
-    if not early_warning:
+    if not startup_pipeline.wait("early-warning"):
         print(f"[{format_timestamp()}] Failed to start early-warning monitor")
         logger.warning("Early-warning monitor failed to start, continuing without it")
         # Continue execution, don't exit
     
+    if not startup_pipeline.wait("cookies"):
+        print(f"[{format_timestamp()}] Failed to get initial cookies, exiting")
+        stop_product_scanner()
+        stop_early_warning()
+        return 1
+    
+    # Start cookie refresh in a background thread
+    refresh_thread = threading.Thread(target=cookie_refresh_scheduler)
+    refresh_thread.daemon = True
+    refresh_thread.start()
+    
+    # Pre-arm before drop windows mined from past logs
+    if not args.no_drop_windows:
+        drop_window_planner = DropWindowPlanner(
+            # coordinator.log is written to the working directory
+            lambda: default_log_paths(os.getcwd(), EARLY_WARNING_DIR),
+            prearm_minutes=args.prearm_minutes,
+        )
+        drop_window_thread = threading.Thread(
+            target=drop_window_planner.run, args=(prearm_for_drop_window, shutdown_event)
+        )
+        drop_window_thread.daemon = True
+        drop_window_thread.start()
+    
     print(f"[{format_timestamp()}] Coordinator running. Press Ctrl+C to exit.")
     
-    # Wait for the scanner to complete (it should run indefinitely)
+    # Wait for the scanner to complete (it should run indefinitely). Polled rather than a blocking
+    # wait(): the signal handler runs on this thread, and while an interrupted wait() holds the
+    # process's wait lock, stop_product_scanner() can't reap the scanner and times out
     try:
-        scanner.wait()
+        while scanner.poll() is None:
+            time.sleep(1)
         logger.warning("Product scanner exited unexpectedly")
+        flight_recorder.dump("scanner_exit")
         print(f"[{format_timestamp()}] Product scanner exited unexpectedly. Shutting down...")
         play_sound("api_error")
+        history_store.stop()
         return 1
     except KeyboardInterrupt:
         # This should be caught by the signal handler above
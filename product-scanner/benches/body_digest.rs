@@ -0,0 +1,107 @@
+//! Compares full JSON parsing with the digest fast path on recorded response bodies.
+//!
+//! Run with `cargo bench --bench body_digest`.
+
+use std::alloc::{GlobalAlloc, Layout, System};
+use std::hint::black_box;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::time::Instant;
+use serde::Deserialize;
+
+use component_common::body_digest::body_digest;
+
+/// Global allocator that counts allocations and allocated bytes
+struct CountingAllocator;
+
+static ALLOCATIONS: AtomicUsize = AtomicUsize::new(0);
+static ALLOCATED_BYTES: AtomicUsize = AtomicUsize::new(0);
+
+unsafe impl GlobalAlloc for CountingAllocator {
+    unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        ALLOCATED_BYTES.fetch_add(layout.size(), Ordering::Relaxed);
+        System.alloc(layout)
+    }
+
+    unsafe fn dealloc(&self, ptr: *mut u8, layout: Layout) {
+        System.dealloc(ptr, layout)
+    }
+
+    unsafe fn realloc(&self, ptr: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        ALLOCATED_BYTES.fetch_add(new_size, Ordering::Relaxed);
+        System.realloc(ptr, layout, new_size)
+    }
+}
+
+#[global_allocator]
+static GLOBAL: CountingAllocator = CountingAllocator;
+
+// Mirrors of the response models used by the pollers
+#[allow(dead_code)]
+#[derive(Deserialize)]
+struct FeInventoryResponse {
+    success: bool,
+    map: Option<serde_json::Value>,
+    #[serde(rename = "listMap")]
+    list_map: Vec<FeProductInfo>,
+}
+
+#[allow(dead_code)]
+#[derive(Deserialize)]
+struct FeProductInfo {
+    is_active: String,
+    product_url: String,
+    price: String,
+    fe_sku: String,
+    locale: String,
+}
+
+const ITERATIONS: usize = 100_000;
+
+fn measure<F: FnMut()>(name: &str, mut f: F) {
+    // Warm up
+    for _ in 0..1000 {
+        f();
+    }
+
+    let allocations = ALLOCATIONS.load(Ordering::Relaxed);
+    let bytes = ALLOCATED_BYTES.load(Ordering::Relaxed);
+    let start = Instant::now();
+    for _ in 0..ITERATIONS {
+        f();
+    }
+    let elapsed = start.elapsed();
+
+    println!(
+        "{:<36} {:>10.0} ns/iter {:>8.1} allocs/iter {:>10.1} bytes/iter",
+        name,
+        elapsed.as_nanos() as f64 / ITERATIONS as f64,
+        (ALLOCATIONS.load(Ordering::Relaxed) - allocations) as f64 / ITERATIONS as f64,
+        (ALLOCATED_BYTES.load(Ordering::Relaxed) - bytes) as f64 / ITERATIONS as f64,
+    );
+}
+
+fn main() {
+    let inventory = include_bytes!("data/feinventory.json");
+    let retailers = include_bytes!("data/retailers_search.json");
+    let inventory_digest = body_digest(inventory);
+    let retailers_digest = body_digest(retailers);
+
+    println!("Recorded bodies: feinventory {} bytes, retailers search {} bytes", inventory.len(), retailers.len());
+
+    measure("inventory: parse FeInventoryResponse", || {
+        let parsed: FeInventoryResponse = serde_json::from_slice(black_box(inventory)).unwrap();
+        black_box(parsed);
+    });
+    measure("inventory: digest (unchanged path)", || {
+        black_box(body_digest(black_box(inventory)) == inventory_digest);
+    });
+    measure("retailers: parse serde_json::Value", || {
+        let parsed: serde_json::Value = serde_json::from_slice(black_box(retailers)).unwrap();
+        black_box(parsed);
+    });
+    measure("retailers: digest (unchanged path)", || {
+        black_box(body_digest(black_box(retailers)) == retailers_digest);
+    });
+}
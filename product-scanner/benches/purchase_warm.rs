@@ -0,0 +1,77 @@
+//! Measures the handshake time a warm purchase connection saves per attempt.
+//!
+//! Needs a TLS server for the retailer host, e.g. the local stand-in:
+//!
+//!     python3 benches/tls_stand_in.py --port 8443
+//!     cargo bench --bench purchase_warm -- https://127.0.0.1:8443/ --insecure
+
+use std::env;
+use std::error::Error;
+use std::time::Duration;
+
+#[allow(dead_code)]
+#[path = "../src/execute_purchase.rs"]
+mod execute_purchase;
+
+use execute_purchase::PurchaseClient;
+
+const DEFAULT_ATTEMPTS: usize = 20;
+
+fn client(insecure: bool) -> Result<PurchaseClient, reqwest::Error> {
+    if insecure { PurchaseClient::insecure() } else { PurchaseClient::new() }
+}
+
+fn summarize(label: &str, samples: &mut [Duration]) -> f64 {
+    samples.sort();
+    let mean_ms = samples.iter().map(Duration::as_secs_f64).sum::<f64>() * 1000.0 / samples.len() as f64;
+    println!("{:<28} mean {:>8.2} ms   median {:>8.2} ms   max {:>8.2} ms",
+             label, mean_ms,
+             samples[samples.len() / 2].as_secs_f64() * 1000.0,
+             samples[samples.len() - 1].as_secs_f64() * 1000.0);
+    mean_ms
+}
+
+#[tokio::main]
+async fn main() -> Result<(), Box<dyn Error>> {
+    // cargo bench passes --bench to harness-less benchmarks
+    let args: Vec<String> = env::args().skip(1).filter(|arg| arg != "--bench").collect();
+    let insecure = args.iter().any(|arg| arg == "--insecure");
+    let attempts = args.iter().position(|arg| arg == "--attempts")
+        .and_then(|i| args.get(i + 1))
+        .and_then(|value| value.parse().ok())
+        .unwrap_or(DEFAULT_ATTEMPTS);
+    let url = match args.iter().find(|arg| arg.starts_with("http")) {
+        Some(url) => reqwest::Url::parse(url)?,
+        None => {
+            println!("usage: cargo bench --bench purchase_warm -- <https-url> [--insecure] [--attempts N]");
+            return Ok(());
+        }
+    };
+
+    println!("Purchase request to {} ({} attempts each)", url, attempts);
+
+    // Cold: what a purchase paid before, a fresh connection (DNS, TCP, TLS) per attempt.
+    // The clients are built up front, so loading root certificates and setting up the
+    // TLS connector isn't counted as handshake time
+    let cold_clients = (0..attempts).map(|_| client(insecure)).collect::<Result<Vec<_>, _>>()?;
+    let mut cold = Vec::with_capacity(attempts);
+    for cold_client in &cold_clients {
+        cold.push(cold_client.warm(&url).await?);
+    }
+    drop(cold_clients);
+
+    // Warm: one client whose pooled connection was established ahead of time
+    let warm_client = client(insecure)?;
+    warm_client.warm(&url).await?;
+    let mut warm = Vec::with_capacity(attempts);
+    for _ in 0..attempts {
+        tokio::time::sleep(Duration::from_millis(50)).await;
+        warm.push(warm_client.warm(&url).await?);
+    }
+
+    let cold_ms = summarize("cold (new connection)", &mut cold);
+    let warm_ms = summarize("warm (pooled connection)", &mut warm);
+    println!("handshake time saved per attempt: {:.2} ms", cold_ms - warm_ms);
+
+    Ok(())
+}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Local HTTPS stand-in for the retailer host, used by the purchase_warm benchmark.
+
+Serves an empty 200 response to every GET/HEAD over HTTP/1.1 keep-alive. Without
+--cert/--key a throwaway self-signed certificate is created with openssl.
+"""
+import argparse
+import http.server
+import os
+import ssl
+import subprocess
+import tempfile
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.do_HEAD()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def self_signed_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+         "-days", "1", "-subj", "/CN=localhost"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTPS stand-in for the retailer host")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--cert", help="PEM certificate (default: generate a self-signed one)")
+    parser.add_argument("--key", help="PEM private key")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = (args.cert, args.key) if args.cert else self_signed_certificate(directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        print(f"Serving https://127.0.0.1:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+use std::collections::HashMap;
+use std::env;
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::sync::{Arc, Mutex};
+use std::time::Duration;
+use chrono::Local;
+use log::{info, warn};
+use tokio::io::{AsyncBufReadExt, BufReader};
+use tokio::sync::{oneshot, watch, Notify};
+
+/// Environment variable set by the coordinator when it starts the scanner
+const COORDINATOR_ENV: &str = "NVIDIA_COORDINATOR";
+
+/// Runtime link to the coordinator.
+///
+/// When the scanner is started by the coordinator, commands arrive as single
+/// lines on stdin (e.g. `interval 10000 11000`, `grant 7`) and requests to the
+/// coordinator are printed as lines starting with `@@`. The coordinator prepares
+/// cookies while the scanner is already polling and sends `cookie-ready` once
+/// they are valid; purchases wait for it. `pause` and `resume` stop and restart
+/// polling, and `reload` asks the main loop to re-read its configuration. When
+/// run standalone the link is disabled: the configured values are used
+/// unchanged, every request permit is granted immediately and the cookie file
+/// is assumed to be ready.
+pub struct CoordinatorLink {
+    enabled: AtomicBool,
+    sleep_ms_min: AtomicU64,
+    sleep_ms_max: AtomicU64,
+    interval_changed: Notify,
+    next_permit_id: AtomicU64,
+    pending_permits: Mutex<HashMap<u64, oneshot::Sender<()>>>,
+    cookie_ready: watch::Sender<bool>,
+    paused: AtomicBool,
+    reload_requested: AtomicBool,
+}
+
+impl CoordinatorLink {
+    pub fn new(sleep_ms_min: u64, sleep_ms_max: u64) -> Arc<Self> {
+        let enabled = env::var(COORDINATOR_ENV).is_ok();
+        Arc::new(CoordinatorLink {
+            enabled: AtomicBool::new(enabled),
+            sleep_ms_min: AtomicU64::new(sleep_ms_min),
+            sleep_ms_max: AtomicU64::new(sleep_ms_max),
+            interval_changed: Notify::new(),
+            next_permit_id: AtomicU64::new(1),
+            pending_permits: Mutex::new(HashMap::new()),
+            cookie_ready: watch::channel(!enabled).0,
+            paused: AtomicBool::new(false),
+            reload_requested: AtomicBool::new(false),
+        })
+    }
+
+    pub fn is_enabled(&self) -> bool {
+        self.enabled.load(Ordering::SeqCst)
+    }
+
+    /// Starts reading coordinator commands from stdin in the background
+    pub fn spawn_listener(self: &Arc<Self>) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        let link = Arc::clone(self);
+        tokio::spawn(async move {
+            let mut lines = BufReader::new(tokio::io::stdin()).lines();
+            while let Ok(Some(line)) = lines.next_line().await {
+                link.handle_command(line.trim());
+            }
+            // Without a coordinator nobody grants permits, so fall back to standalone mode
+            warn!("Coordinator command channel closed, continuing standalone");
+            link.enabled.store(false, Ordering::SeqCst);
+            link.pending_permits.lock().unwrap().clear();
+            link.cookie_ready.send_replace(true);
+            link.paused.store(false, Ordering::SeqCst);
+            link.interval_changed.notify_waiters();
+        });
+        info!("Listening for coordinator commands on stdin");
+    }
+
+    fn handle_command(&self, line: &str) {
+        let parts: Vec<&str> = line.split_whitespace().collect();
+        match parts.as_slice() {
+            ["interval", min, max] => match (min.parse::<u64>(), max.parse::<u64>()) {
+                (Ok(min), Ok(max)) if min > 0 => {
+                    self.sleep_ms_min.store(min, Ordering::SeqCst);
+                    self.sleep_ms_max.store(max.max(min), Ordering::SeqCst);
+                    self.interval_changed.notify_waiters();
+                    println!("[{}] ⏱️ Polling interval set to {}-{} ms",
+                             Local::now().format("%Y-%m-%d %H:%M:%S"), min, max.max(min));
+                }
+                _ => warn!("Invalid interval command: {}", line),
+            },
+            ["grant", id] => {
+                let sender = id.parse::<u64>().ok()
+                    .and_then(|id| self.pending_permits.lock().unwrap().remove(&id));
+                match sender {
+                    Some(sender) => { let _ = sender.send(()); }
+                    None => warn!("Grant for unknown permit: {}", line),
+                }
+            }
+            ["cookie-ready"] => {
+                if !self.cookie_ready.send_replace(true) {
+                    println!("[{}] 🍪 Cookies ready, purchases enabled",
+                             Local::now().format("%Y-%m-%d %H:%M:%S"));
+                }
+            }
+            ["pause"] => {
+                if !self.paused.swap(true, Ordering::SeqCst) {
+                    println!("[{}] ⏸️ Polling paused", Local::now().format("%Y-%m-%d %H:%M:%S"));
+                }
+            }
+            ["resume"] => {
+                if self.paused.swap(false, Ordering::SeqCst) {
+                    println!("[{}] ▶️ Polling resumed", Local::now().format("%Y-%m-%d %H:%M:%S"));
+                    self.interval_changed.notify_waiters();
+                }
+            }
+            ["reload"] => {
+                self.reload_requested.store(true, Ordering::SeqCst);
+                // Wake the main loop so the reload is applied before the next cycle
+                self.interval_changed.notify_waiters();
+            }
+            [] => {}
+            _ => {
+                warn!("Unknown coordinator command: {}", line);
+                println!("[{}] ⚠️ Unknown coordinator command: {}",
+                         Local::now().format("%Y-%m-%d %H:%M:%S"), line);
+            }
+        }
+    }
+
+    /// Waits until the coordinator grants a permit for one request to `host`
+    pub async fn acquire_permit(&self, host: &str) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        let (sender, receiver) = oneshot::channel();
+        let id = self.next_permit_id.fetch_add(1, Ordering::SeqCst);
+        self.pending_permits.lock().unwrap().insert(id, sender);
+        if !self.is_enabled() {
+            // The channel closed while we were registering
+            self.pending_permits.lock().unwrap().remove(&id);
+            return;
+        }
+
+        println!("@@permit {} {}", id, host);
+        // Resolves on grant, or with an error when the command channel closes
+        let _ = receiver.await;
+    }
+
+    /// Reports a non-success response status so the coordinator can throttle the host
+    pub fn report_status(&self, host: &str, status: u16, retry_after_secs: Option<u64>) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        match retry_after_secs {
+            Some(secs) => println!("@@http {} {} {}", host, status, secs),
+            None => println!("@@http {} {} -", host, status),
+        }
+    }
+
+    /// Reports an observed state (compact JSON) for the coordinator's history store
+    pub fn observe(&self, kind: &str, key: &str, state: &serde_json::Value) {
+        if !self.is_enabled() {
+            return;
+        }
+
+        println!("@@observe {} {} {}", kind, key, state);
+    }
+
+    /// Returns true once the coordinator has reported valid cookies (always true standalone)
+    pub fn is_cookie_ready(&self) -> bool {
+        *self.cookie_ready.borrow()
+    }
+
+    /// Waits until the coordinator reports valid cookies
+    pub async fn wait_cookie_ready(&self) {
+        let mut ready = self.cookie_ready.subscribe();
+        // The sender lives as long as the link, so this only returns once ready
+        let _ = ready.wait_for(|ready| *ready).await;
+    }
+
+    /// Returns true while the coordinator has paused polling
+    pub fn is_paused(&self) -> bool {
+        self.paused.load(Ordering::SeqCst)
+    }
+
+    /// Returns true once after the coordinator asked for a configuration reload
+    pub fn take_reload_request(&self) -> bool {
+        self.reload_requested.swap(false, Ordering::SeqCst)
+    }
+
+    /// Returns the current (min, max) sleep range between requests in ms
+    pub fn sleep_range(&self) -> (u64, u64) {
+        (self.sleep_ms_min.load(Ordering::SeqCst), self.sleep_ms_max.load(Ordering::SeqCst))
+    }
+
+    /// Sleeps for the given duration, returning early if the interval or pause state changes
+    pub async fn sleep(&self, duration: Duration) {
+        tokio::select! {
+            _ = tokio::time::sleep(duration) => {}
+            _ = self.interval_changed.notified() => {}
+        }
+    }
+}
@@ -1,12 +1,22 @@
 use std::error::Error;
-use std::fs::{self, File};
-use std::io::Write;
-use std::time::Instant;
+use std::path::PathBuf;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use reqwest::header::{HeaderMap, HeaderValue, COOKIE, LOCATION, SET_COOKIE};
+use reqwest::redirect::Policy;
 use serde::{Deserialize, Serialize};
 use serde_json::{self, json};
 use rand::{thread_rng, Rng};
 use rand::distributions::Alphanumeric;
 use chrono::Local;
+use tokio::sync::mpsc;
+use tokio::task::JoinHandle;
+
+/// Maximum number of redirects followed for one purchase request
+const MAX_REDIRECTS: usize = 10;
+
+/// Result type of a purchase attempt; errors can cross task boundaries
+pub type PurchaseResult = Result<bool, Box<dyn Error + Send + Sync>>;
 
 #[derive(Debug, Serialize, Deserialize)]
 struct Cookie {
@@ -57,7 +67,193 @@ fn generate_unique_filename() -> String {
     format!("captured_purchase_cookies_{}_{}.json", get_timestamp(), random_string)
 }
 
-pub fn fast_purchase(purchase_url: &str) -> Result<bool, Box<dyn Error>> {
+/// File produced by a purchase attempt, written by the background [`ArtifactWriter`]
+struct Artifact {
+    path: PathBuf,
+    contents: Vec<u8>,
+    description: &'static str,
+}
+
+/// Writes purchase artifacts (final page, redirect history, cookies) off the
+/// purchase path, so the reported purchase time doesn't include disk writes.
+pub struct ArtifactWriter {
+    sender: mpsc::UnboundedSender<Artifact>,
+    task: JoinHandle<()>,
+}
+
+impl ArtifactWriter {
+    pub fn spawn() -> Self {
+        let (sender, mut receiver) = mpsc::unbounded_channel::<Artifact>();
+        let task = tokio::spawn(async move {
+            while let Some(artifact) = receiver.recv().await {
+                match tokio::fs::write(&artifact.path, &artifact.contents).await {
+                    Ok(()) => println!("[INFO] Saved {} to {}", artifact.description, artifact.path.display()),
+                    Err(e) => println!("[ERROR] Failed to save {} to {}: {}", artifact.description, artifact.path.display(), e),
+                }
+            }
+        });
+        ArtifactWriter { sender, task }
+    }
+
+    fn write(&self, path: PathBuf, contents: Vec<u8>, description: &'static str) {
+        if self.sender.send(Artifact { path, contents, description }).is_err() {
+            println!("[ERROR] Artifact writer stopped, {} not saved", description);
+        }
+    }
+
+    /// Waits until every queued artifact has been written
+    pub async fn close(self) {
+        drop(self.sender);
+        let _ = self.task.await;
+    }
+}
+
+/// How long an idle purchase connection is kept; warm intervals must stay below it
+const POOL_IDLE_TIMEOUT: Duration = Duration::from_secs(90);
+
+/// Reusable client for purchase requests.
+///
+/// Redirects are followed manually so that every hop (and the cookies set
+/// along the way) is recorded. Optionally a keep-alive connection to the
+/// retailer host is kept warm, so the first purchase request after
+/// availability skips DNS, TCP and TLS.
+pub struct PurchaseClient {
+    client: reqwest::Client,
+}
+
+impl PurchaseClient {
+    pub fn new() -> Result<Self, reqwest::Error> {
+        Self::build(false)
+    }
+
+    /// Builds a client that accepts self-signed certificates (local TLS stand-ins only)
+    #[allow(dead_code)]
+    pub fn insecure() -> Result<Self, reqwest::Error> {
+        Self::build(true)
+    }
+
+    fn build(accept_invalid_certs: bool) -> Result<Self, reqwest::Error> {
+        let client = reqwest::Client::builder()
+            .redirect(Policy::none())
+            .timeout(Duration::from_secs(60))
+            .connect_timeout(Duration::from_secs(10))
+            .pool_idle_timeout(POOL_IDLE_TIMEOUT)
+            .tcp_keepalive(Duration::from_secs(30))
+            .tcp_nodelay(true)
+            .danger_accept_invalid_certs(accept_invalid_certs)
+            .default_headers(browser_headers())
+            .build()?;
+        Ok(PurchaseClient { client })
+    }
+
+    /// Sends a HEAD request to `url`, leaving an idle keep-alive connection in the pool.
+    /// Returns how long the request took.
+    pub async fn warm(&self, url: &reqwest::Url) -> Result<Duration, reqwest::Error> {
+        let start = Instant::now();
+        self.client.head(url.clone()).send().await?;
+        Ok(start.elapsed())
+    }
+
+    /// Keeps a connection to the host of `url` warm, re-warming every `interval`
+    pub fn spawn_warmer(self: &Arc<Self>, url: reqwest::Url, interval: Duration) {
+        let interval = interval.min(POOL_IDLE_TIMEOUT - Duration::from_secs(10));
+        let client = Arc::clone(self);
+        tokio::spawn(async move {
+            let host = url.host_str().unwrap_or_default().to_string();
+            let mut warm = false;
+            loop {
+                match client.warm(&url).await {
+                    Ok(elapsed) if !warm => {
+                        warm = true;
+                        println!("[{}] 🔥 Warm connection to {} ready ({} ms)",
+                                 Local::now().format("%Y-%m-%d %H:%M:%S"), host, elapsed.as_millis());
+                    }
+                    Ok(_) => {}
+                    Err(e) => {
+                        // Only report the transition, the warmer keeps retrying quietly
+                        if warm {
+                            println!("[{}] ⚠️ Warm connection to {} lost: {}",
+                                     Local::now().format("%Y-%m-%d %H:%M:%S"), host, e);
+                        }
+                        warm = false;
+                    }
+                }
+                tokio::time::sleep(interval).await;
+            }
+        });
+    }
+}
+
+/// Browser fingerprinting headers - MUST match original request to obtain cf_clearance cookie
+fn browser_headers() -> HeaderMap {
+    let mut headers = HeaderMap::new();
+    headers.insert("Accept", HeaderValue::from_static("text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"));
+    headers.insert("Accept-Language", HeaderValue::from_static("de-DE,de;q=0.7"));
+    headers.insert("priority", HeaderValue::from_static("u=0, i"));
+    headers.insert("referer", HeaderValue::from_static("https://marketplace.nvidia.com/"));
+    headers.insert("sec-ch-ua", HeaderValue::from_static("\"Chromium\";v=\"134\", \"Not:A-Brand\";v=\"24\", \"Brave\";v=\"134\""));
+    headers.insert("sec-ch-ua-arch", HeaderValue::from_static("\"x86\""));
+    headers.insert("sec-ch-ua-bitness", HeaderValue::from_static("\"64\""));
+    headers.insert("sec-ch-ua-full-version-list", HeaderValue::from_static("\"Chromium\";v=\"134.0.0.0\", \"Not:A-Brand\";v=\"24.0.0.0\", \"Brave\";v=\"134.0.0.0\""));
+    headers.insert("sec-ch-ua-mobile", HeaderValue::from_static("?0"));
+    headers.insert("sec-ch-ua-model", HeaderValue::from_static("\"\""));
+    headers.insert("sec-ch-ua-platform", HeaderValue::from_static("\"Windows\""));
+    headers.insert("sec-ch-ua-platform-version", HeaderValue::from_static("\"19.0.0\""));
+    headers.insert("sec-fetch-dest", HeaderValue::from_static("document"));
+    headers.insert("sec-fetch-mode", HeaderValue::from_static("navigate"));
+    headers.insert("sec-fetch-site", HeaderValue::from_static("cross-site"));
+    headers.insert("sec-fetch-user", HeaderValue::from_static("?1"));
+    headers.insert("sec-gpc", HeaderValue::from_static("1"));
+    headers.insert("upgrade-insecure-requests", HeaderValue::from_static("1"));
+    headers.insert("user-agent", HeaderValue::from_static("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"));
+    headers
+}
+
+/// Parses the Set-Cookie headers of a response
+fn parse_set_cookies(headers: &HeaderMap) -> Vec<Cookie> {
+    let mut cookies = Vec::new();
+    for value in headers.get_all(SET_COOKIE) {
+        if let Ok(cookie_str) = value.to_str() {
+            // More comprehensive cookie parsing
+            let parts: Vec<&str> = cookie_str.split(';').collect();
+            if let Some(name_value) = parts.first() {
+                if let Some((name, value)) = name_value.split_once('=') {
+                    // Try to extract domain from cookie string
+                    let domain = parts.iter()
+                        .find(|part| part.trim().to_lowercase().starts_with("domain="))
+                        .and_then(|domain_part| domain_part.split_once('='))
+                        .map(|(_, domain)| domain.trim().to_string());
+
+                    cookies.push(Cookie {
+                        name: name.trim().to_string(),
+                        value: value.trim().to_string(),
+                        domain,
+                    });
+                }
+            }
+        }
+    }
+    cookies
+}
+
+/// Adds or replaces cookies by name
+fn merge_cookies(cookies: &mut Vec<Cookie>, new_cookies: Vec<Cookie>) {
+    for cookie in new_cookies {
+        match cookies.iter_mut().find(|c| c.name == cookie.name) {
+            Some(existing) => *existing = cookie,
+            None => cookies.push(cookie),
+        }
+    }
+}
+
+fn cookie_header(cookies: &[Cookie]) -> String {
+    cookies.iter()
+        .map(|cookie| format!("{}={}", cookie.name, cookie.value))
+        .collect::<Vec<_>>()
+        .join("; ")
+}
+
+pub async fn fast_purchase(client: &PurchaseClient, artifacts: &ArtifactWriter, purchase_url: &str) -> PurchaseResult {
     // Start timing
     let start_time = Instant::now();
 
@@ -65,7 +261,7 @@ pub fn fast_purchase(purchase_url: &str) -> Result<bool, Box<dyn Error>> {
     let cookies_path = get_shared_scripts_path().join("captured_cookies.json");
     println!("[INFO] Loading cookies from {}", cookies_path.display());
     
-    let cookie_file = fs::read_to_string(&cookies_path)?;
+    let cookie_file = tokio::fs::read_to_string(&cookies_path).await?;
     let cookie_data: CookieData = serde_json::from_str(&cookie_file)?;
     
     println!("[INFO] Loaded {} cookies from {}", cookie_data.cookies.len(), cookies_path.display());
@@ -87,132 +283,63 @@ pub fn fast_purchase(purchase_url: &str) -> Result<bool, Box<dyn Error>> {
         return Ok(false);
     }
 
-    // Create request with cookies
-    let mut request = attohttpc::get(purchase_url);
-    
-    // Add cookies to the request - using a single Cookie header with all cookies
-    let mut all_cookies = String::new();
-    for cookie in &cookie_data.cookies {
-        if !all_cookies.is_empty() {
-            all_cookies.push_str("; ");
-        }
-        all_cookies.push_str(&format!("{}={}", cookie.name, cookie.value));
-    }
-    
-    // Add the combined cookie header
-    request = request.header("Cookie", all_cookies);
-
-    // Set browser fingerprinting headers - MUST match original request to obtain cf_clearance cookie
-    request = request
-        .header("Accept", "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8")
-        .header("Accept-Language", "de-DE,de;q=0.7")
-        .header("priority", "u=0, i")
-        .header("referer", "https://marketplace.nvidia.com/")
-        .header("sec-ch-ua", "\"Chromium\";v=\"134\", \"Not:A-Brand\";v=\"24\", \"Brave\";v=\"134\"")
-        .header("sec-ch-ua-arch", "\"x86\"")
-        .header("sec-ch-ua-bitness", "\"64\"")
-        .header("sec-ch-ua-full-version-list", "\"Chromium\";v=\"134.0.0.0\", \"Not:A-Brand\";v=\"24.0.0.0\", \"Brave\";v=\"134.0.0.0\"")
-        .header("sec-ch-ua-mobile", "?0")
-        .header("sec-ch-ua-model", "\"\"")
-        .header("sec-ch-ua-platform", "\"Windows\"")
-        .header("sec-ch-ua-platform-version", "\"19.0.0\"")
-        .header("sec-fetch-dest", "document")
-        .header("sec-fetch-mode", "navigate")
-        .header("sec-fetch-site", "cross-site")
-        .header("sec-fetch-user", "?1")
-        .header("sec-gpc", "1")
-        .header("upgrade-insecure-requests", "1")
-        .header("user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36");
+    // Cookies sent with every hop; Set-Cookie headers along the redirect chain update them
+    let mut session_cookies = cookie_data.cookies;
+    let mut redirects = Vec::new();
+    let mut url = reqwest::Url::parse(purchase_url)?;
 
     println!("[INFO] Making request to {}", purchase_url);
 
-    // Make request with automatic redirect handling and increased timeout
-    let response = request
-        .timeout(std::time::Duration::from_secs(60))  // Increased timeout to match Python
-        .follow_redirects(true)
-        .send()?;
+    // Follow redirects manually to record the full chain
+    let response = loop {
+        let response = client.client
+            .get(url.clone())
+            .header(COOKIE, cookie_header(&session_cookies))
+            .send()
+            .await?;
+
+        merge_cookies(&mut session_cookies, parse_set_cookies(response.headers()));
+
+        let status = response.status();
+        let location = response.headers().get(LOCATION).and_then(|value| value.to_str().ok());
+        let next_url = match location {
+            Some(location) if status.is_redirection() => url.join(location)?,
+            _ => break response,
+        };
+        if redirects.len() >= MAX_REDIRECTS {
+            return Err(format!("Too many redirects (more than {})", MAX_REDIRECTS).into());
+        }
+
+        println!("[INFO] Redirect {} -> {} ({})", url, next_url, status.as_u16());
+        redirects.push(Redirect {
+            from: url.to_string(),
+            to: next_url.to_string(),
+            status_code: status.as_u16(),
+        });
+        url = next_url;
+    };
 
     // Store important information before consuming the response
     let status = response.status();
     let final_url = response.url().to_string();
     
-    // Extract cookies from response headers
-    let mut updated_cookies = Vec::new();
-    
-    // Process Set-Cookie headers if present
-    for header in response.headers().iter() {
-        if header.0.as_str().to_lowercase() == "set-cookie" {
-            if let Ok(cookie_str) = header.1.to_str() {
-                // More comprehensive cookie parsing
-                let parts: Vec<&str> = cookie_str.split(';').collect();
-                if let Some(name_value) = parts.first() {
-                    if let Some((name, value)) = name_value.split_once('=') {
-                        // Try to extract domain from cookie string
-                        let domain = parts.iter()
-                            .find(|part| part.trim().to_lowercase().starts_with("domain="))
-                            .and_then(|domain_part| domain_part.split_once('='))
-                            .map(|(_, domain)| domain.trim().to_string());
-                        
-                        updated_cookies.push(Cookie {
-                            name: name.trim().to_string(),
-                            value: value.trim().to_string(),
-                            domain,
-                        });
-                    }
-                }
-            }
-        }
-    }
-    
     // Print the final URL after all redirects
     println!("[INFO] Final URL after redirects: {}", final_url);
 
     // Get response body - this consumes the response
-    let response_text = response.text()?;
-
-    // Save the final HTML page
-    let html_output_path = get_shared_scripts_path().join("final_page_rs.html");
-    let mut file = File::create(&html_output_path)?;
-    file.write_all(response_text.as_bytes())?;
-    println!("[INFO] Saved final page HTML to {}", html_output_path.display());
-
-    // Unfortunately, attohttpc doesn't provide redirect history directly
-    // We'll just create an empty history for now
-    let redirect_history = RedirectHistory {
-        timestamp: get_timestamp(),
-        final_url,
-        redirects: Vec::new(),
-    };
-
-    // Save redirect history
-    let redirects_output_path = get_shared_scripts_path().join("redirect_history_rs.json");
-    let redirect_json = serde_json::to_string_pretty(&redirect_history)?;
-    let mut file = File::create(&redirects_output_path)?;
-    file.write_all(redirect_json.as_bytes())?;
-    println!("[INFO] Saved redirect history to {}", redirects_output_path.display());
-
-    // Combine original cookies with any new ones
-    for cookie in cookie_data.cookies {
-        if !updated_cookies.iter().any(|c| c.name == cookie.name) {
-            updated_cookies.push(cookie);
-        }
-    }
+    let response_text = response.text().await?;
 
-    // Save updated cookies
-    let output_data = json!({
-        "timestamp": get_timestamp(),
-        "cookies": updated_cookies
-    });
-
-    let filename = generate_unique_filename();
-    let cookies_output_path = get_shared_scripts_path().join(filename);
-    let cookie_json = serde_json::to_string_pretty(&output_data)?;
-    let mut file = File::create(&cookies_output_path)?;
-    file.write_all(cookie_json.as_bytes())?;
-    println!("[INFO] Saved cookies to {}", cookies_output_path.display());
+    // Report results before handing the artifacts to the background writer
+    let elapsed_time = start_time.elapsed();
+    println!(
+        "[INFO] Request completed with status {} in {:.2}s ({} redirects)",
+        status,
+        elapsed_time.as_secs_f64(),
+        redirects.len()
+    );
 
     // Check for ASP.NET_SessionId cookie
-    let asp_session = updated_cookies.iter()
+    let asp_session = session_cookies.iter()
         .find(|cookie| cookie.name == "ASP.NET_SessionId")
         .map(|cookie| &cookie.value);
     
@@ -222,12 +349,30 @@ pub fn fast_purchase(purchase_url: &str) -> Result<bool, Box<dyn Error>> {
         println!("[WARNING] No ASP.NET_SessionId cookie found");
     }
 
-    // Report results
-    let elapsed_time = start_time.elapsed();
-    println!(
-        "[INFO] Request completed with status {} in {:.2}s",
-        status,
-        elapsed_time.as_secs_f64()
+    // Save the final HTML page
+    artifacts.write(get_shared_scripts_path().join("final_page_rs.html"), response_text.into_bytes(), "final page HTML");
+
+    // Save redirect history
+    let redirect_history = RedirectHistory {
+        timestamp: get_timestamp(),
+        final_url,
+        redirects,
+    };
+    artifacts.write(
+        get_shared_scripts_path().join("redirect_history_rs.json"),
+        serde_json::to_vec_pretty(&redirect_history)?,
+        "redirect history",
+    );
+
+    // Save updated cookies (original cookies combined with any new ones)
+    let output_data = json!({
+        "timestamp": get_timestamp(),
+        "cookies": session_cookies
+    });
+    artifacts.write(
+        get_shared_scripts_path().join(generate_unique_filename()),
+        serde_json::to_vec_pretty(&output_data)?,
+        "cookies",
     );
 
     Ok(status.is_success())
@@ -235,16 +380,21 @@ pub fn fast_purchase(purchase_url: &str) -> Result<bool, Box<dyn Error>> {
 
 // For testing purposes only to run script standalone
 #[allow(dead_code)]
-pub fn main() -> Result<(), Box<dyn Error>> {
+#[tokio::main]
+pub async fn main() -> Result<(), Box<dyn Error>> {
     // Default test URL
     let default_url = "https://www.proshop.de/Basket/BuyNvidiaGraphicCard?t=C8HgkfqkAbdVIyPnb%2B%2BHQOoYO6UhnuDDA8853HMVzu6Wh3v2YAtSuPC5hOcGnQqGZve77PQt9%2FdBgsLw327GJu35bgsktZFF01sZq2Ggu5VIedzHT6GMr%2BVdEl%2BqK6TJO6kIOoOFHkGPYbDnU8scv53inA8cgPvwQ4n8soRyD7EDfEYavWDPah8%2B%2BIPQye8LL8ymAba361B0pjcQgb1L2a4ap8SgOYum1voEi19FqaiPbcOn%2F1tmFZfTqw38ZrsV0wrokDAOcjaGLeiD5ujyc%2F9uY7GAJRGtEasilCzFJhECHYSimA9q8Pd9vJh%2FVhd9j%2BW3WlTmmTM4Pt3vimM2KQ%3D%3D";
 
+    let client = PurchaseClient::new()?;
+    let artifacts = ArtifactWriter::spawn();
+
     // Run the purchase function
-    match fast_purchase(default_url) {
+    match fast_purchase(&client, &artifacts, default_url).await {
         Ok(true) => println!("[INFO] Purchase attempt completed successfully!"),
         Ok(false) => println!("[ERROR] Purchase attempt failed"),
         Err(e) => println!("[ERROR] Purchase attempt failed with error: {}", e),
     }
 
+    artifacts.close().await;
     Ok(())
 }
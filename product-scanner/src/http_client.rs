@@ -0,0 +1,137 @@
+use std::cell::Cell;
+use std::collections::HashMap;
+use std::future::Future;
+use std::net::SocketAddr;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex, RwLock};
+use std::time::{Duration, Instant};
+use chrono::Local;
+use log::warn;
+use reqwest::dns::{Addrs, Name, Resolve, Resolving};
+
+/// How long resolved addresses are reused before looking the host up again
+const DNS_CACHE_TTL: Duration = Duration::from_secs(300);
+
+tokio::task_local! {
+    /// New connections opened while polling the request wrapped by `ApiClient::track_connection`
+    static REQUEST_CONNECTIONS: Cell<u64>;
+}
+
+/// DNS resolver that caches lookups and counts how often it is asked.
+///
+/// The connection pool only resolves a host when it has to open a new
+/// connection, so the number of calls equals the number of TCP+TLS handshakes.
+/// The pool starts connecting while the request's future is polled, so each
+/// call is also credited to the request that triggered it.
+struct CachingResolver {
+    cache: Arc<Mutex<HashMap<String, (Vec<SocketAddr>, Instant)>>>,
+    connections: AtomicU64,
+}
+
+impl Resolve for CachingResolver {
+    fn resolve(&self, name: Name) -> Resolving {
+        self.connections.fetch_add(1, Ordering::SeqCst);
+        // Outside a tracked request (e.g. a connect the pool finishes in the background) there's nobody to credit
+        let _ = REQUEST_CONNECTIONS.try_with(|count| count.set(count.get() + 1));
+        let host = name.as_str().to_string();
+
+        let cached = self.cache.lock().unwrap().get(&host)
+            .filter(|(_, resolved_at)| resolved_at.elapsed() < DNS_CACHE_TTL)
+            .map(|(addrs, _)| addrs.clone());
+        if let Some(addrs) = cached {
+            return Box::pin(async move { Ok(Box::new(addrs.into_iter()) as Addrs) });
+        }
+
+        let cache = Arc::clone(&self.cache);
+        Box::pin(async move {
+            let addrs: Vec<SocketAddr> = tokio::net::lookup_host((host.as_str(), 0)).await?.collect();
+            cache.lock().unwrap().insert(host, (addrs.clone(), Instant::now()));
+            Ok(Box::new(addrs.into_iter()) as Addrs)
+        })
+    }
+}
+
+/// Long-lived HTTP client for the inventory API.
+///
+/// Keeps one keep-alive connection pool (HTTP/2 where the server negotiates it)
+/// across poll cycles and is only rebuilt after connection-level errors.
+pub struct ApiClient {
+    client: RwLock<reqwest::Client>,
+    resolver: Arc<CachingResolver>,
+    timeout: Duration,
+    user_agent: String,
+    requests: AtomicU64,
+    rebuilds: AtomicU64,
+}
+
+impl ApiClient {
+    pub fn new(timeout_secs: u64, user_agent: &str) -> Result<Self, reqwest::Error> {
+        let resolver = Arc::new(CachingResolver {
+            cache: Arc::new(Mutex::new(HashMap::new())),
+            connections: AtomicU64::new(0),
+        });
+        let timeout = Duration::from_secs(timeout_secs);
+        let client = build_client(timeout, user_agent, &resolver)?;
+
+        Ok(ApiClient {
+            client: RwLock::new(client),
+            resolver,
+            timeout,
+            user_agent: user_agent.to_string(),
+            requests: AtomicU64::new(0),
+            rebuilds: AtomicU64::new(0),
+        })
+    }
+
+    /// Returns a handle to the shared client (cheap, shares the connection pool)
+    pub fn client(&self) -> reqwest::Client {
+        self.client.read().unwrap().clone()
+    }
+
+    /// Replaces the client and its connection pool after a connection-level error
+    pub fn rebuild(&self) {
+        match build_client(self.timeout, &self.user_agent, &self.resolver) {
+            Ok(client) => {
+                *self.client.write().unwrap() = client;
+                let rebuilds = self.rebuilds.fetch_add(1, Ordering::SeqCst) + 1;
+                println!("[{}] 🔌 Rebuilt HTTP client after connection error ({} rebuilds)",
+                         Local::now().format("%Y-%m-%d %H:%M:%S"), rebuilds);
+            }
+            Err(e) => warn!("Failed to rebuild HTTP client, keeping the old one: {}", e),
+        }
+    }
+
+    /// Number of new connections (and therefore handshakes) opened so far
+    pub fn connections(&self) -> u64 {
+        self.resolver.connections.load(Ordering::SeqCst)
+    }
+
+    /// Runs a request and returns its result and whether it opened a new connection.
+    ///
+    /// The flag belongs to this request even while other targets share the pool concurrently.
+    pub async fn track_connection<F: Future>(&self, request: F) -> (F::Output, bool) {
+        REQUEST_CONNECTIONS.scope(Cell::new(0), async move {
+            let output = request.await;
+            (output, REQUEST_CONNECTIONS.with(|count| count.get()) > 0)
+        }).await
+    }
+
+    /// Counts a request and returns the total number of requests sent so far
+    pub fn count_request(&self) -> u64 {
+        self.requests.fetch_add(1, Ordering::SeqCst) + 1
+    }
+}
+
+fn build_client(timeout: Duration, user_agent: &str, resolver: &Arc<CachingResolver>) -> Result<reqwest::Client, reqwest::Error> {
+    reqwest::Client::builder()
+        .timeout(timeout)
+        .connect_timeout(Duration::from_secs(5))
+        .user_agent(user_agent)
+        .pool_idle_timeout(Duration::from_secs(90))
+        .pool_max_idle_per_host(4)
+        .tcp_keepalive(Duration::from_secs(30))
+        .tcp_nodelay(true)
+        .http2_adaptive_window(true)
+        .dns_resolver(Arc::clone(resolver))
+        .build()
+}
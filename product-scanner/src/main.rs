@@ -1,11 +1,11 @@
 use std::error::Error;
 use std::time::Duration;
 use std::sync::atomic::{AtomicBool, Ordering};
-use std::sync::Arc;
+use std::sync::{Arc, Mutex};
+use std::collections::HashSet;
 use rand::Rng;
 use chrono::Local;
 use log::{info, error};
-use reqwest;
 use config::Config as AppConfig;
 use tokio;
 use std::env;
@@ -13,24 +13,65 @@ use std::time::Instant;
 
 mod product_checker;
 mod execute_purchase;
+mod coordinator_link;
+mod http_client;
 
-use product_checker::{check_nvidia_api, ApiConfig, HeadersConfig, RequestConfig, simulate_available_product};
-use execute_purchase::fast_purchase;
+use product_checker::{check_nvidia_api, ApiConfig, HeadersConfig, InventoryTarget, RequestConfig, TargetConfig, simulate_available_product};
+use execute_purchase::{fast_purchase, ArtifactWriter, PurchaseClient};
+use coordinator_link::CoordinatorLink;
+use http_client::ApiClient;
+use component_common::status_board::{self, StatusBoard, StatusRecord, SCANNER_SLOT, STATE_PAUSED, STATE_RUNNING, STATE_STARTING, STATE_STOPPED};
 
-#[tokio::main]
-async fn main() -> Result<(), Box<dyn Error>> {
-    // Check for test mode
-    let args: Vec<String> = env::args().collect();
-    let test_mode = args.len() > 1 && (args[1] == "--test" || args[1] == "--test-error");
-    let test_error_mode = args.len() > 1 && args[1] == "--test-error";
-    
-    // Load configuration
-    let settings = AppConfig::builder()
-        .add_source(config::File::with_name("config/default"))
-        .build()?;
+/// How long shutdown waits for purchases in flight before exiting anyway
+const PURCHASE_DRAIN_TIMEOUT: Duration = Duration::from_secs(30);
+
+/// Marks a SKU as being purchased for as long as its purchase task holds it.
+///
+/// Dropping it (also when the task panics) releases the artifact writer and
+/// then frees the SKU, so a failed task can't block later attempts or shutdown.
+struct InFlightPurchase {
+    sku: String,
+    purchases_in_flight: Arc<Mutex<HashSet<String>>>,
+    artifacts: Option<Arc<ArtifactWriter>>,
+}
+
+impl InFlightPurchase {
+    fn artifacts(&self) -> &ArtifactWriter {
+        self.artifacts.as_ref().expect("artifact writer is only released on drop")
+    }
+}
+
+impl Drop for InFlightPurchase {
+    fn drop(&mut self) {
+        // Release the writer before leaving the set so shutdown can close it
+        self.artifacts.take();
+        // Don't panic again if a panicking task poisoned the lock
+        let mut in_flight = self.purchases_in_flight.lock().unwrap_or_else(|e| e.into_inner());
+        in_flight.remove(&self.sku);
+    }
+}
+
+/// Describes the polled targets for the status board, e.g. "de-de, fr-fr (4 SKUs)"
+fn target_summary(api_config: &ApiConfig) -> String {
+    let locales: Vec<&str> = api_config.targets.iter().map(|target| target.locale.as_str()).collect();
+    let skus: usize = api_config.targets.iter().map(|target| target.skus.len()).sum();
+    format!("{} ({} SKUs)", locales.join(", "), skus)
+}
+
+/// Reads targets, headers and request settings from the loaded configuration
+fn load_api_config(settings: &AppConfig) -> Result<ApiConfig, Box<dyn Error>> {
+    // Extract targets: SKUs grouped by locale, falling back to a single fe_inventory_url
+    let targets: Vec<InventoryTarget> = match settings.get::<Vec<TargetConfig>>("targets") {
+        Ok(targets) if !targets.is_empty() => {
+            let inventory_base_url = settings.get_string("inventory_base_url")?;
+            targets.into_iter()
+                .map(|target| InventoryTarget::new(&inventory_base_url, target.locale, target.skus))
+                .collect()
+        }
+        _ => vec![InventoryTarget::from_url(settings.get_string("fe_inventory_url")?)],
+    };
     
     // Extract configuration values
-    let fe_inventory_url = settings.get_string("fe_inventory_url")?;
     let timeout_secs = settings.get_int("request.timeout_secs")? as u64;
     let max_attempts = settings.get_int("request.max_attempts")? as u32;
     let sleep_ms_min = settings.get_int("request.sleep_ms_min")? as u64;
@@ -52,9 +93,8 @@ async fn main() -> Result<(), Box<dyn Error>> {
     let sec_ch_ua_mobile = settings.get_string("headers.sec_ch_ua_mobile")?;
     let sec_ch_ua_platform = settings.get_string("headers.sec_ch_ua_platform")?;
     
-    // Create API configuration
-    let api_config = ApiConfig {
-        fe_inventory_url,
+    Ok(ApiConfig {
+        targets,
         headers: HeadersConfig {
             user_agent,
             accept,
@@ -77,13 +117,46 @@ async fn main() -> Result<(), Box<dyn Error>> {
             sleep_ms_min,
             sleep_ms_max,
         },
-    };
+    })
+}
+
+#[tokio::main]
+async fn main() -> Result<(), Box<dyn Error>> {
+    // Check for test mode
+    let args: Vec<String> = env::args().collect();
+    let test_mode = args.len() > 1 && (args[1] == "--test" || args[1] == "--test-error");
+    let test_error_mode = args.len() > 1 && args[1] == "--test-error";
+    
+    // Load configuration
+    let settings = AppConfig::builder()
+        .add_source(config::File::with_name("config/default"))
+        .build()?;
+    
+    let mut api_config = load_api_config(&settings)?;
+    
+    // One long-lived client (and connection pool) shared by all targets and cycles
+    let mut api_client = ApiClient::new(api_config.request.timeout_secs, &api_config.headers.user_agent)?;
     
-    // Create a dummy client just for compatibility - we'll create new ones for each request
-    let client = reqwest::Client::new();
+    // Purchases run as separate tasks on their own reusable client; their files are written in the background
+    let purchase_client = Arc::new(PurchaseClient::new()?);
+    let artifacts = Arc::new(ArtifactWriter::spawn());
+    
+    // Optionally keep a connection to the retailer host open so the first purchase request skips the handshake
+    if let Ok(warm_url) = settings.get_string("purchase.warm_url") {
+        let warm_interval_secs = settings.get_int("purchase.warm_interval_secs").unwrap_or(45) as u64;
+        match reqwest::Url::parse(&warm_url) {
+            Ok(warm_url) if !test_mode => purchase_client.spawn_warmer(warm_url, Duration::from_secs(warm_interval_secs)),
+            Ok(_) => {}
+            Err(e) => error!("Invalid purchase.warm_url '{}': {}", warm_url, e),
+        }
+    }
     
     println!("[{}] Configuration loaded successfully", Local::now().format("%Y-%m-%d %H:%M:%S"));
     info!("Configuration loaded successfully");
+    for target in &api_config.targets {
+        println!("[{}] Monitoring {} in {}", Local::now().format("%Y-%m-%d %H:%M:%S"),
+                 target.skus.join(", "), target.locale);
+    }
     
     // If in test mode, run the test and exit
     if test_mode {
@@ -101,7 +174,7 @@ async fn main() -> Result<(), Box<dyn Error>> {
                 // Measure purchase execution time
                 let start_time = Instant::now();
                 
-                match fast_purchase(&product_url) {
+                match fast_purchase(&purchase_client, &artifacts, &product_url).await {
                     Ok(true) => {
                         let elapsed = start_time.elapsed();
                         println!("[{}] ✅ TEST MODE: Purchase completed successfully in {:.2}s", 
@@ -130,11 +203,18 @@ async fn main() -> Result<(), Box<dyn Error>> {
             }
         }
         
+        if let Ok(artifacts) = Arc::try_unwrap(artifacts) {
+            artifacts.close().await;
+        }
         println!("[{}] Test completed, exiting", Local::now().format("%Y-%m-%d %H:%M:%S"));
         info!("Test completed, exiting");
         return Ok(());
     }
     
+    // Polling interval and request permits are controlled by the coordinator when it runs the scanner
+    let link = CoordinatorLink::new(api_config.request.sleep_ms_min, api_config.request.sleep_ms_max);
+    link.spawn_listener();
+    
     // Set up Ctrl+C handler
     let running = Arc::new(AtomicBool::new(true));
     let r = running.clone();
@@ -152,56 +232,162 @@ async fn main() -> Result<(), Box<dyn Error>> {
     // Main loop
     let mut cycle: u64 = 0;
     let mut rng = rand::thread_rng();
+    let purchases_in_flight: Arc<Mutex<HashSet<String>>> = Arc::new(Mutex::new(HashSet::new()));
+    
+    // Live status for `python -m coordinator.status_board`, updated in place after every cycle
+    let mut status_board = StatusBoard::open(SCANNER_SLOT);
+    let mut status = StatusRecord { state: STATE_STARTING, detail: target_summary(&api_config), ..Default::default() };
+    status_board.publish(&status);
     
     while running.load(Ordering::SeqCst) {
+        // Re-read config/default.toml when the coordinator asks for it
+        if link.take_reload_request() {
+            let reloaded = AppConfig::builder()
+                .add_source(config::File::with_name("config/default"))
+                .build()
+                .map_err(|e| e.into())
+                .and_then(|settings| load_api_config(&settings));
+            match reloaded.and_then(|config| {
+                let client = ApiClient::new(config.request.timeout_secs, &config.headers.user_agent)?;
+                Ok((config, client))
+            }) {
+                Ok((config, client)) => {
+                    api_config = config;
+                    api_client = client;
+                    status.detail = target_summary(&api_config);
+                    println!("[{}] 🔄 Configuration reloaded ({} targets)",
+                             Local::now().format("%Y-%m-%d %H:%M:%S"), api_config.targets.len());
+                }
+                Err(e) => {
+                    error!("Failed to reload configuration: {}", e);
+                    println!("[{}] ❌ Failed to reload configuration, keeping the current one: {}",
+                             Local::now().format("%Y-%m-%d %H:%M:%S"), e);
+                }
+            }
+        }
+        
+        // Paused by the coordinator; the sleep ends early on resume or reload
+        if link.is_paused() {
+            status.state = STATE_PAUSED;
+            status_board.publish(&status);
+            link.sleep(Duration::from_secs(1)).await;
+            continue;
+        }
+        
         cycle += 1;
+        let cycle_start = Instant::now();
         
-        // Check NVIDIA API for available products
-        match check_nvidia_api(&api_config, &client, cycle).await {
-            Ok(Some((product_name, product_url))) => {
+        // Check NVIDIA API for available products in all target locales
+        let result = check_nvidia_api(&api_config, &api_client, &link, cycle).await;
+        status.state = STATE_RUNNING;
+        status.cycle = cycle;
+        status.last_poll_ms = status_board::now_ms();
+        status.latency_ms = cycle_start.elapsed().as_millis() as u32;
+        if result.is_err() {
+            status.errors += 1;
+        }
+        status_board.publish(&status);
+        
+        match result {
+            Ok(products) => for product in products {
+                // A product stays available across cycles; only one attempt per SKU at a time
+                if !purchases_in_flight.lock().unwrap().insert(product.sku.clone()) {
+                    continue;
+                }
+                
                 // Product is available, initiate purchase immediately
-                println!("[{}] 🚀 LAUNCHING PURCHASE PROCESS FOR: {}", 
-                         Local::now().format("%Y-%m-%d %H:%M:%S"), product_name);
+                status.events += 1;
+                status.detail = format!("{} - last purchase {} ({})", target_summary(&api_config), product.sku, product.locale);
+                status_board.publish(&status);
+                println!("[{}] 🚀 LAUNCHING PURCHASE PROCESS FOR: {} ({})", 
+                         Local::now().format("%Y-%m-%d %H:%M:%S"), product.sku, product.locale);
                 println!("[{}] 🔗 Product Link: {}", 
-                         Local::now().format("%Y-%m-%d %H:%M:%S"), product_url);
-                
-                // Measure purchase execution time
-                let start_time = Instant::now();
+                         Local::now().format("%Y-%m-%d %H:%M:%S"), product.product_url);
                 
-                // Execute the purchase directly
-                match fast_purchase(&product_url) {
-                    Ok(true) => {
-                        let elapsed = start_time.elapsed();
-                        println!("[{}] ✅ Purchase process completed successfully in {:.2}s", 
-                                 Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64());
-                    },
-                    Ok(false) => {
-                        let elapsed = start_time.elapsed();
-                        println!("[{}] ⚠️ Purchase attempt failed in {:.2}s", 
-                                 Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64());
-                    },
-                    Err(e) => {
-                        let elapsed = start_time.elapsed();
-                        println!("[{}] ❌ Purchase attempt failed with error in {:.2}s: {}", 
-                                 Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64(), e);
+                // The purchase runs as its own task so polling continues meanwhile
+                let link = Arc::clone(&link);
+                let running = Arc::clone(&running);
+                let purchase_client = Arc::clone(&purchase_client);
+                let in_flight = InFlightPurchase {
+                    sku: product.sku.clone(),
+                    purchases_in_flight: Arc::clone(&purchases_in_flight),
+                    artifacts: Some(Arc::clone(&artifacts)),
+                };
+                tokio::spawn(async move {
+                    // Polling starts before the coordinator has prepared cookies; purchasing needs them.
+                    // Check for shutdown meanwhile, cookie-prep may keep failing
+                    if !link.is_cookie_ready() {
+                        println!("[{}] ⏳ Waiting for cookies before purchasing",
+                                 Local::now().format("%Y-%m-%d %H:%M:%S"));
+                        while !link.is_cookie_ready() {
+                            if !running.load(Ordering::SeqCst) {
+                                println!("[{}] ⚠️ Shutting down before cookies were ready, purchase of {} cancelled",
+                                         Local::now().format("%Y-%m-%d %H:%M:%S"), in_flight.sku);
+                                return;
+                            }
+                            let _ = tokio::time::timeout(Duration::from_secs(1), link.wait_cookie_ready()).await;
+                        }
                     }
-                }
-            },
-            Ok(None) => {
-                // No product available, continue monitoring
+                    
+                    // Measure purchase execution time
+                    let start_time = Instant::now();
+                    
+                    match fast_purchase(&purchase_client, in_flight.artifacts(), &product.product_url).await {
+                        Ok(true) => {
+                            let elapsed = start_time.elapsed();
+                            println!("[{}] ✅ Purchase process completed successfully in {:.2}s", 
+                                     Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64());
+                        },
+                        Ok(false) => {
+                            let elapsed = start_time.elapsed();
+                            println!("[{}] ⚠️ Purchase attempt failed in {:.2}s", 
+                                     Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64());
+                        },
+                        Err(e) => {
+                            let elapsed = start_time.elapsed();
+                            println!("[{}] ❌ Purchase attempt failed with error in {:.2}s: {}", 
+                                     Local::now().format("%Y-%m-%d %H:%M:%S"), elapsed.as_secs_f64(), e);
+                        }
+                    }
+                    drop(in_flight);
+                });
             },
             Err(e) => {
                 error!("Cycle #{} - Failed to check NVIDIA API: {}", cycle, e);
             }
         }
         
-        // Random sleep between configured min and max values
+        // Random sleep between the current min and max values
         if running.load(Ordering::SeqCst) {
-            let sleep_ms = rng.gen_range(api_config.request.sleep_ms_min..api_config.request.sleep_ms_max);
-            tokio::time::sleep(Duration::from_millis(sleep_ms)).await;
+            let (sleep_ms_min, sleep_ms_max) = link.sleep_range();
+            let sleep_ms = if sleep_ms_max > sleep_ms_min {
+                rng.gen_range(sleep_ms_min..sleep_ms_max)
+            } else {
+                sleep_ms_min
+            };
+            link.sleep(Duration::from_millis(sleep_ms)).await;
         }
     }
     
+    // Let purchases in flight finish writing their artifacts, but don't wait forever
+    let drain_deadline = Instant::now() + PURCHASE_DRAIN_TIMEOUT;
+    while !purchases_in_flight.lock().unwrap().is_empty() {
+        if Instant::now() >= drain_deadline {
+            let pending: Vec<String> = purchases_in_flight.lock().unwrap().iter().cloned().collect();
+            println!("[{}] ⚠️ Purchases still running after {}s, exiting without them: {}",
+                     Local::now().format("%Y-%m-%d %H:%M:%S"), PURCHASE_DRAIN_TIMEOUT.as_secs(), pending.join(", "));
+            error!("Purchases still running at shutdown: {}", pending.join(", "));
+            break;
+        }
+        tokio::time::sleep(Duration::from_millis(100)).await;
+    }
+    if let Ok(artifacts) = Arc::try_unwrap(artifacts) {
+        artifacts.close().await;
+    }
+    
+    status.state = STATE_STOPPED;
+    status_board.publish(&status);
+    
     println!("[{}] Application terminated gracefully", Local::now().format("%Y-%m-%d %H:%M:%S"));
     info!("Application terminated gracefully");
     
@@ -1,9 +1,17 @@
 use std::error::Error;
-use std::time::Duration;
+use std::fmt;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::time::{Duration, Instant};
 use chrono::Local;
+use futures::future::join_all;
 use log::{info, warn};
 use reqwest;
+use reqwest::header::{HeaderMap, RETRY_AFTER};
+use reqwest::StatusCode;
 use serde::{Deserialize, Serialize};
+use component_common::body_digest::body_digest;
+use crate::coordinator_link::CoordinatorLink;
+use crate::http_client::ApiClient;
 
 #[derive(Debug, Serialize, Deserialize)]
 pub struct FeInventoryResponse {
@@ -26,11 +34,55 @@ pub struct FeProductInfo {
 
 /// Configuration struct needed for API requests
 pub struct ApiConfig {
-    pub fe_inventory_url: String,
+    pub targets: Vec<InventoryTarget>,
     pub headers: HeadersConfig,
     pub request: RequestConfig,
 }
 
+/// Entry of the `[[targets]]` table in the config file
+#[derive(Debug, Deserialize)]
+pub struct TargetConfig {
+    pub locale: String,
+    pub skus: Vec<String>,
+}
+
+/// One locale to poll, with all of its SKUs combined into a single request
+pub struct InventoryTarget {
+    pub locale: String,
+    pub skus: Vec<String>,
+    pub url: String,
+    /// Digest of the last response that had no available product (0 if none)
+    last_unavailable_digest: AtomicU64,
+}
+
+impl InventoryTarget {
+    /// Builds the combined `skus=` request URL for a locale
+    pub fn new(inventory_base_url: &str, locale: String, skus: Vec<String>) -> Self {
+        let url = format!("{}?status=1&skus={}&locale={}", inventory_base_url, skus.join(","), locale);
+        InventoryTarget { locale, skus, url, last_unavailable_digest: AtomicU64::new(0) }
+    }
+
+    /// Wraps a fully specified inventory URL (legacy `fe_inventory_url` setting)
+    pub fn from_url(url: String) -> Self {
+        let query_value = |key: &str| {
+            url.split(|c| c == '?' || c == '&')
+                .find_map(|pair| pair.strip_prefix(key))
+                .unwrap_or_default()
+                .to_string()
+        };
+        let locale = query_value("locale=");
+        let skus = query_value("skus=").split(',').map(str::to_string).collect();
+        InventoryTarget { locale, skus, url, last_unavailable_digest: AtomicU64::new(0) }
+    }
+}
+
+/// A product entry that has a purchase URL
+pub struct AvailableProduct {
+    pub sku: String,
+    pub locale: String,
+    pub product_url: String,
+}
+
 pub struct HeadersConfig {
     pub user_agent: String,
     pub accept: String,
@@ -55,97 +107,218 @@ pub struct RequestConfig {
     pub sleep_ms_max: u64,
 }
 
-/// Checks the FE inventory endpoint for product availability
+/// Raw inventory response body
+enum InventoryBody {
+    /// Same as the last response without an available product (timestamp ignored)
+    Unchanged,
+    Changed { digest: u64, text: String },
+}
+
+/// Error returned when the API answers 429 or 503
+#[derive(Debug)]
+pub struct ThrottledError {
+    pub status: u16,
+    pub retry_after_secs: Option<u64>,
+}
+
+impl fmt::Display for ThrottledError {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        match self.retry_after_secs {
+            Some(secs) => write!(f, "API throttled with status {} (Retry-After {}s)", self.status, secs),
+            None => write!(f, "API throttled with status {}", self.status),
+        }
+    }
+}
+
+impl Error for ThrottledError {}
+
+/// Parses a Retry-After header given either in seconds or as an HTTP date
+fn parse_retry_after(headers: &HeaderMap) -> Option<u64> {
+    let value = headers.get(RETRY_AFTER)?.to_str().ok()?.trim();
+    if let Ok(secs) = value.parse::<u64>() {
+        return Some(secs);
+    }
+    let date = chrono::DateTime::parse_from_rfc2822(value).ok()?;
+    let secs = (date.with_timezone(&chrono::Utc) - chrono::Utc::now()).num_seconds();
+    Some(secs.max(0) as u64)
+}
+
+/// Checks the FE inventory endpoint of one target for product availability
 async fn check_fe_inventory(
     config: &ApiConfig,
-    client: &reqwest::Client,
-) -> Result<String, Box<dyn Error>> {
+    target: &InventoryTarget,
+    api_client: &ApiClient,
+    link: &CoordinatorLink,
+) -> Result<InventoryBody, Box<dyn Error>> {
     // Add timestamp for cache busting
     let timestamp = chrono::Utc::now().timestamp_millis();
-    let url = if config.fe_inventory_url.contains('?') {
-        format!("{}&t={}", config.fe_inventory_url, timestamp)
+    let url = if target.url.contains('?') {
+        format!("{}&t={}", target.url, timestamp)
     } else {
-        format!("{}?t={}", config.fe_inventory_url, timestamp)
+        format!("{}?t={}", target.url, timestamp)
     };
     
-    let response = client
-        .get(&url)
+    // Wait for the coordinator's request budget for this host
+    let parsed_url = reqwest::Url::parse(&url)?;
+    let host = parsed_url.host_str().unwrap_or_default();
+    link.acquire_permit(host).await;
+    
+    let request_start = Instant::now();
+    let request = api_client.client()
+        .get(parsed_url.clone())
         .headers(get_headers(&config.headers))
         .timeout(Duration::from_secs(config.request.timeout_secs))
-        .send()
-        .await?;
+        .send();
+    let (response, new_connection) = api_client.track_connection(request).await;
+    let response = response?;
+
+    let status = response.status();
+    if !status.is_success() {
+        let retry_after_secs = parse_retry_after(response.headers());
+        link.report_status(host, status.as_u16(), retry_after_secs);
+        if status == StatusCode::TOO_MANY_REQUESTS || status == StatusCode::SERVICE_UNAVAILABLE {
+            return Err(Box::new(ThrottledError { status: status.as_u16(), retry_after_secs }));
+        }
+    }
 
-    // Get response text for logging
-    let response_text = response.text().await?;
+    // Read the raw body; it is only decoded and parsed if its digest changed
+    let body = response.bytes().await?;
+    let digest = body_digest(&body);
     let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
     
+    // Connection reuse: the pool only opens (and handshakes) a new connection when none is idle
+    let latency_ms = request_start.elapsed().as_millis();
+    let connection = if new_connection { "new connection" } else { "reused connection" };
+    let connections = api_client.connections();
+    let requests = api_client.count_request();
+    
+    // Fast path: nothing changed since the last response without an available product
+    if digest == target.last_unavailable_digest.load(Ordering::Relaxed) {
+        println!("[{}] 📡 Server response ({}, {} ms, {}, {} handshakes / {} requests): unchanged",
+                 timestamp, target.locale, latency_ms, connection, connections, requests);
+        return Ok(InventoryBody::Unchanged);
+    }
+    
     // Log the full response
-    info!("[{}] Server response: {}", timestamp, &response_text);
-    println!("[{}] 📡 Server response: {}", timestamp, &response_text);
+    let response_text = String::from_utf8_lossy(&body).into_owned();
+    info!("[{}] Server response ({}, {} ms, {}, {} handshakes / {} requests): {}",
+          timestamp, target.locale, latency_ms, connection, connections, requests, &response_text);
+    println!("[{}] 📡 Server response ({}, {} ms, {}, {} handshakes / {} requests): {}",
+             timestamp, target.locale, latency_ms, connection, connections, requests, &response_text);
 
-    Ok(response_text)
+    Ok(InventoryBody::Changed { digest, text: response_text })
 }
 
-/// Makes a request to NVIDIA FE inventory API and checks product availability
-/// Returns the product URL if a product is available, otherwise None
+/// Makes one request per target locale to the NVIDIA FE inventory API, concurrently
+/// Returns every product entry that has a purchase URL
 pub async fn check_nvidia_api(
     config: &ApiConfig, 
-    _client: &reqwest::Client, 
+    api_client: &ApiClient, 
+    link: &CoordinatorLink,
     cycle: u64
-) -> Result<Option<(String, String)>, Box<dyn Error>> {
+) -> Result<Vec<AvailableProduct>, Box<dyn Error>> {
     let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
-    info!("Cycle #{} - Starting FE inventory check at {}", cycle, timestamp);
+    info!("Cycle #{} - Starting FE inventory check for {} locale(s) at {}", cycle, config.targets.len(), timestamp);
+
+    let results = join_all(
+        config.targets.iter().map(|target| check_target(config, target, api_client, link, cycle))
+    ).await;
+
+    let mut available = Vec::new();
+    let mut errors = Vec::new();
+    for (target, result) in config.targets.iter().zip(results) {
+        match result {
+            Ok(products) => available.extend(products),
+            Err(e) => errors.push(format!("{}: {}", target.locale, e)),
+        }
+    }
 
+    // Only fail the cycle if no locale could be checked
+    if !errors.is_empty() && errors.len() == config.targets.len() {
+        return Err(errors.join("; ").into());
+    }
+    for error_msg in errors {
+        warn!("Cycle #{} - Locale check failed: {}", cycle, error_msg);
+    }
+
+    Ok(available)
+}
+
+/// Checks one target with retries and returns its available products
+async fn check_target(
+    config: &ApiConfig,
+    target: &InventoryTarget,
+    api_client: &ApiClient,
+    link: &CoordinatorLink,
+    cycle: u64
+) -> Result<Vec<AvailableProduct>, Box<dyn Error>> {
     // Maximum number of attempts
     let max_attempts = config.request.max_attempts;
     let mut last_error = None;
+    let mut throttled: Option<Option<u64>> = None;
     
     // Try the request with retries
     for attempt in 1..=max_attempts {
         if attempt > 1 {
-            let backoff_secs = 2_u64.pow((attempt - 1) as u32);
+            let backoff_secs = match throttled {
+                // The coordinator holds back the next permit until the host is no longer throttled
+                Some(_) if link.is_enabled() => 0,
+                Some(retry_after_secs) => retry_after_secs.unwrap_or(2_u64.pow((attempt - 1) as u32)),
+                None => 2_u64.pow((attempt - 1) as u32),
+            };
             info!("Cycle #{} - Waiting {} seconds before retry (attempt {}/{})", 
                 cycle, backoff_secs, attempt, max_attempts);
             tokio::time::sleep(Duration::from_secs(backoff_secs)).await;
         }
 
-        // Create a new client for each attempt
-        let new_client = reqwest::Client::builder()
-            .timeout(Duration::from_secs(config.request.timeout_secs))
-            .user_agent(&config.headers.user_agent)
-            .build()?;
-
-        match check_fe_inventory(config, &new_client).await {
-            Ok(response_text) => {
+        match check_fe_inventory(config, target, api_client, link).await {
+            Ok(InventoryBody::Unchanged) => return Ok(Vec::new()),
+            Ok(InventoryBody::Changed { digest, text: response_text }) => {
                 // Only parse and check for purchase if needed
+                let mut available = Vec::new();
                 match serde_json::from_str::<FeInventoryResponse>(&response_text) {
                     Ok(parsed) if parsed.success => {
-                        // Check for products with URLs
-                        let available_product = parsed.list_map.iter()
-                            .find(|product| !product.product_url.is_empty());
-                        
-                        if let Some(product) = available_product {
-                            // Return product information instead of launching purchase
-                            let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
-                            println!("[{}] 🔍 Found available product: {}", timestamp, product.fe_sku);
-                            return Ok(Some((product.fe_sku.clone(), product.product_url.clone())));
-                        } else {
-                            // No URL found
+                        for product in parsed.list_map {
+                            // Record the state; the coordinator only stores it when it changed
+                            link.observe("inventory", &format!("{}/{}", product.fe_sku, product.locale), &serde_json::json!({
+                                "is_active": product.is_active,
+                                "price": product.price,
+                                "available": !product.product_url.is_empty(),
+                            }));
+                            // Report every product with a URL, not just the first one
+                            if product.product_url.is_empty() {
+                                continue;
+                            }
                             let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
-                            println!("[{}] ❌ No product URL found", timestamp);
+                            println!("[{}] 🔍 Found available product: {} ({})", timestamp, product.fe_sku, target.locale);
+                            available.push(AvailableProduct {
+                                sku: product.fe_sku,
+                                locale: target.locale.clone(),
+                                product_url: product.product_url,
+                            });
                         }
                     },
-                    _ => {
-                        // Failed to parse or unsuccessful response
-                        let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
-                        println!("[{}] ❌ No product URL found", timestamp);
-                    }
+                    _ => {}
                 }
-                return Ok(None);
+                if available.is_empty() {
+                    // No URL found, or failed to parse / unsuccessful response
+                    let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
+                    println!("[{}] ❌ No product URL found ({})", timestamp, target.locale);
+                }
+                // Only unavailable responses take the fast path, so purchases are retried
+                // for as long as a product stays available
+                let unavailable_digest = if available.is_empty() { digest } else { 0 };
+                target.last_unavailable_digest.store(unavailable_digest, Ordering::Relaxed);
+                return Ok(available);
             }
             Err(e) => {
                 let timestamp = Local::now().format("%Y-%m-%d %H:%M:%S").to_string();
-                let error_msg = format!("Error checking FE inventory: {}", e);
+                throttled = e.downcast_ref::<ThrottledError>().map(|t| t.retry_after_secs);
+                // Start over with a fresh pool only when the connection itself failed
+                if e.downcast_ref::<reqwest::Error>().map_or(false, |e| e.is_connect()) {
+                    api_client.rebuild();
+                }
+                let error_msg = format!("Error checking FE inventory ({}): {}", target.locale, e);
                 warn!("[{}] {}", timestamp, error_msg);
                 println!("[{}] ⚠️ {}", timestamp, error_msg);
                 last_error = Some(error_msg);
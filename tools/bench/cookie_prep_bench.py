@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Cookie-prep benchmarks, run by run.py against a copy of cookie-prep/src.
+
+cookie-prep resolves its cookie file relative to its own location
+(<root>/shared/scripts/captured_cookies.json), so run.py copies the sources
+into a scratch root with a benchmark cookie file instead of touching the real
+one. Measures:
+
+- check_for_cf_clearance() on that cookie file
+- the import time of main.py (what every cookie refresh pays before the
+  browser starts), net of bare interpreter startup
+
+Both need cookie-prep's dependencies (nodriver, 2captcha, python-dotenv); when
+they are missing the metrics are reported as skipped. Results are written as
+JSON to --output.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def interpreter_ms(code, cwd, runs):
+    """Return the median wall time in ms of `python -c code`"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cookie-prep benchmarks (run by run.py)")
+    parser.add_argument("--src", required=True, help="Scratch copy of cookie-prep/src")
+    parser.add_argument("--output", required=True, help="JSON result file")
+    parser.add_argument("--cookie-checks", type=int, default=500, help="Cookie checks per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--import-runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    metrics, skipped = {}, {}
+    sys.path.insert(0, args.src)
+    try:
+        import cookies
+    except ImportError as e:
+        skipped["cookie_prep_check_cf_clearance_us"] = f"cookie-prep dependencies missing ({e})"
+    else:
+        # Best of several rounds, as in coordinator_bench.py
+        best = None
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            for _ in range(args.cookie_checks):
+                if not cookies.check_for_cf_clearance():
+                    raise RuntimeError("check_for_cf_clearance() rejected the benchmark cookie file")
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        metrics["cookie_prep_check_cf_clearance_us"] = best / args.cookie_checks * 1e6
+
+    try:
+        interpreter_ms("import main", args.src, 1)
+    except subprocess.CalledProcessError:
+        skipped["cookie_prep_import_ms"] = "importing cookie-prep's main.py failed (dependencies missing?)"
+    else:
+        metrics["cookie_prep_import_ms"] = max(
+            0.0, interpreter_ms("import main", args.src, args.import_runs) - interpreter_ms("pass", args.src, args.import_runs)
+        )
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"metrics": metrics, "skipped": skipped}, file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Coordinator benchmarks, run by run.py in a scratch working directory.
+
+Importing the coordinator sets up coordinator.log and logs/ in the working
+directory, so this runs as its own process. Measures:
+
+- scanner output handling: a generator child prints a realistic mix of lines
+  (per-cycle server responses, cycle logs, @@observe messages) as fast as the
+  pipe takes them, and the coordinator's real output thread consumes them
+- check_session_cookies() on a typical cookie file
+
+Each is timed over several rounds and the best round is reported, which
+filters out interference from the rest of the machine (like timeit). Results
+are written as JSON to --output.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Prints `count` scanner-like lines; a drop or purchase line would trigger snapshots and sounds, so none are included
+GENERATOR = r"""
+import sys
+count = int(sys.argv[1])
+lines = []
+for i in range(count):
+    kind = i % 10
+    if kind < 7:
+        lines.append(f"[2025-10-03 14:02:{i % 60:02d}] 📡 Server response (de-de, {80 + i % 300} ms, reused connection, 1 handshakes / {i} requests): unchanged")
+    elif kind < 9:
+        lines.append(f"[2025-10-03 14:02:{i % 60:02d}] Cycle #{i} - Starting FE inventory check for 2 locale(s)")
+    else:
+        lines.append('@@observe inventory PROFESHOP5090_DE/DE {"is_active":"false","price":"1899","available":false}')
+sys.stdout.write("\n".join(lines) + "\n")
+"""
+
+COOKIE_FILE = {
+    "timestamp": "2025-10-03T14:00:00",
+    "cookies": [{"name": "cf_clearance", "value": "x" * 400, "domain": ".proshop.de"}] + [
+        {"name": f"cookie_{i}", "value": "v" * 64, "domain": "www.proshop.de"} for i in range(30)
+    ],
+}
+
+
+def bench_line_throughput(coordinator, lines, rounds):
+    """Return scanner lines per second handled by the coordinator's output thread"""
+    coordinator.scanner_command = [sys.executable, "-c", GENERATOR, str(lines)]
+    best = None
+    for _ in range(rounds):
+        before = set(threading.enumerate())
+        start = time.perf_counter()
+        process = coordinator.start_product_scanner()
+        process.wait()
+        # The output thread ends at EOF of the child's stdout
+        for thread in set(threading.enumerate()) - before:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return lines / best
+
+
+def bench_check_session_cookies(coordinator, calls, rounds):
+    """Return microseconds per check_session_cookies() call"""
+    coordinator.cookie_output_path = os.path.abspath("captured_cookies.json")
+    with open(coordinator.cookie_output_path, "w", encoding="utf-8") as file:
+        json.dump(COOKIE_FILE, file, indent=2)
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            if not coordinator.check_session_cookies():
+                raise RuntimeError("check_session_cookies() rejected the benchmark cookie file")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coordinator benchmarks (run by run.py)")
+    parser.add_argument("--output", required=True, help="JSON result file")
+    parser.add_argument("--lines", type=int, default=20000, help="Scanner lines per round")
+    parser.add_argument("--cookie-checks", type=int, default=500, help="Cookie checks per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_DIR)
+    import nvidia_purchase_coordinator as coordinator
+
+    metrics = {
+        "coordinator_scanner_lines_per_sec": bench_line_throughput(coordinator, args.lines, args.rounds),
+        "coordinator_check_session_cookies_us": bench_check_session_cookies(coordinator, args.cookie_checks, args.rounds),
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"metrics": metrics, "skipped": {}}, file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Performance regression suite with baselines stored in the repository.
+
+Runs every benchmark worker in its own process and scratch directory, takes
+the median of --repeat runs per metric and compares the result with the
+stored baseline for this platform (baselines/<system>-<machine>.json):
+
+    python tools/bench/run.py                  # compare, exit code 1 on regressions
+    python tools/bench/run.py --save           # record a new baseline
+    python tools/bench/run.py --only coordinator,cookie-prep --threshold 15
+
+A metric regresses when it is worse than its baseline by more than the
+threshold (percent, --threshold or per metric with --metric-threshold) and by
+more than its noise floor in absolute terms. Metrics whose benchmark can't run
+here (no cargo, missing cookie-prep dependencies) are reported as skipped. A
+metric without a baseline value fails the run as well, unless --allow-missing
+is given, so an incomplete baseline can't pass unnoticed.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+PRODUCT_SCANNER_DIR = os.path.join(REPO_DIR, "product-scanner")
+COOKIE_PREP_SRC = os.path.join(REPO_DIR, "cookie-prep", "src")
+
+# Bump when metrics change meaning, so old baselines aren't compared with new numbers
+BASELINE_FORMAT = 1
+DEFAULT_THRESHOLD_PCT = 20
+
+# name: (unit, better, noise floor in the metric's unit, description)
+METRICS = {
+    "coordinator_scanner_lines_per_sec": ("lines/s", "higher", 1000, "Scanner output lines handled by the coordinator"),
+    "coordinator_check_session_cookies_us": ("us", "lower", 5, "check_session_cookies() on a 31-cookie file"),
+    "cookie_prep_check_cf_clearance_us": ("us", "lower", 5, "check_for_cf_clearance() on a 31-cookie file"),
+    "cookie_prep_import_ms": ("ms", "lower", 20, "Importing cookie-prep's main.py, net of interpreter startup"),
+    "scanner_first_poll_ms": ("ms", "lower", 20, "Scanner launch to first inventory request"),
+    "scanner_poll_latency_ms": ("ms", "lower", 1, "Inventory poll latency reported by the scanner"),
+    "scanner_cycle_overhead_ms": ("ms", "lower", 1, "Scanner time per cycle besides the request and the sleep"),
+    "scanner_purchase_latency_ms": ("ms", "lower", 2, "Available response to final purchase request"),
+}
+SUITES = ("coordinator", "cookie-prep", "scanner")
+
+
+def default_baseline_name():
+    return f"{platform.system()}-{platform.machine()}".lower()
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_worker(script, args, workdir):
+    """
+    Run a benchmark worker and return its JSON result.
+
+    Raises:
+        RuntimeError: If the worker failed
+    """
+    output = os.path.join(workdir, "result.json")
+    log_path = os.path.join(workdir, "worker.log")
+    with open(log_path, "w", encoding="utf-8") as log:
+        result = subprocess.run([sys.executable, os.path.join(BENCH_DIR, script), "--output", output, *args],
+                                cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} failed with exit code {result.returncode}, see {log_path}")
+    with open(output, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def run_repeated(name, repeat, prepare, script, args):
+    """
+    Run a worker `repeat` times in fresh scratch directories.
+
+    Args:
+        prepare (callable): Called with each scratch directory before the run; returns extra args
+
+    Returns:
+        tuple: ({metric: [values]}, {metric: skip reason})
+    """
+    values, skipped = {}, {}
+    for run in range(repeat):
+        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        # On failure the scratch directory is kept for its worker log
+        result = run_worker(script, args + prepare(workdir), workdir)
+        for metric, value in result["metrics"].items():
+            values.setdefault(metric, []).append(value)
+        skipped.update(result.get("skipped", {}))
+        shutil.rmtree(workdir, ignore_errors=True)
+        print(f"  {name} run {run + 1}/{repeat} done")
+    return values, skipped
+
+
+def prepare_cookie_prep(workdir):
+    """Copy cookie-prep/src into <workdir>/cookie-prep/src next to a benchmark cookie file"""
+    src = os.path.join(workdir, "cookie-prep", "src")
+    shutil.copytree(COOKIE_PREP_SRC, src, ignore=shutil.ignore_patterns("__pycache__"))
+    scripts = os.path.join(workdir, "shared", "scripts")
+    os.makedirs(scripts)
+    with open(os.path.join(scripts, "captured_cookies.json"), "w", encoding="utf-8") as file:
+        json.dump({"timestamp": "2025-10-03T14:00:00", "cookies": [
+            {"name": "cf_clearance", "value": "x" * 400, "domain": ".proshop.de"}] + [
+            {"name": f"cookie_{i}", "value": "v" * 64, "domain": "www.proshop.de"} for i in range(30)
+        ]}, file, indent=2)
+    return ["--src", src]
+
+
+def scanner_binary(args):
+    """
+    Return the scanner binary to benchmark, building it unless --scanner-bin or --no-build is given.
+
+    Returns:
+        tuple: (path or None, reason if unavailable)
+    """
+    if args.scanner_bin:
+        return args.scanner_bin, None
+    binary = os.path.join(PRODUCT_SCANNER_DIR, "target", "release",
+                          "product-scanner.exe" if os.name == "nt" else "product-scanner")
+    if not args.no_build:
+        if shutil.which("cargo") is None:
+            return None, "cargo not found"
+        print("  building product-scanner (release)...")
+        result = subprocess.run(["cargo", "build", "--release", "--bin", "product-scanner"],
+                                cwd=PRODUCT_SCANNER_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, "cargo build failed: " + (result.stderr.strip().splitlines() or ["?"])[-1]
+    if not os.path.exists(binary):
+        return None, f"{binary} not built"
+    return binary, None
+
+
+def run_suites(args):
+    """
+    Run the selected suites.
+
+    Returns:
+        tuple: ({metric: median value}, {metric: skip reason})
+    """
+    values, skipped = {}, {}
+
+    def merge(result):
+        suite_values, suite_skipped = result
+        for metric, samples in suite_values.items():
+            values[metric] = statistics.median(samples)
+        skipped.update({metric: reason for metric, reason in suite_skipped.items() if metric not in values})
+
+    if "coordinator" in args.only:
+        print("coordinator")
+        merge(run_repeated("coordinator", args.repeat, lambda workdir: [], "coordinator_bench.py", []))
+    if "cookie-prep" in args.only:
+        print("cookie-prep")
+        merge(run_repeated("cookie-prep", args.repeat, prepare_cookie_prep, "cookie_prep_bench.py", []))
+    if "scanner" in args.only:
+        print("scanner")
+        binary, reason = scanner_binary(args)
+        if binary is None:
+            for metric in METRICS:
+                if metric.startswith("scanner_"):
+                    skipped[metric] = reason
+        else:
+            # One long run; the worker already takes medians over all polls and purchases
+            merge(run_repeated("scanner", 1, lambda workdir: ["--workdir", workdir], "scanner_bench.py",
+                               ["--binary", binary, "--seconds", str(args.scanner_seconds)]))
+    return values, skipped
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        return None
+    if baseline.get("format") != BASELINE_FORMAT:
+        print(f"Ignoring {path}: baseline format {baseline.get('format')}, expected {BASELINE_FORMAT}")
+        return None
+    return baseline
+
+
+def save_baseline(path, values):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "recorded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "metrics": {
+            metric: {"value": round(value, 3), "unit": METRICS[metric][0], "better": METRICS[metric][1]}
+            for metric, value in sorted(values.items())
+        },
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baseline, file, indent=2)
+        file.write("\n")
+
+
+def compare(values, skipped, baseline, thresholds, default_threshold):
+    """
+    Compare current values with a baseline.
+
+    Returns:
+        list: (metric, baseline value, current value, change %, status) per metric. The status is
+            "NO BASELINE" (possibly with the skip reason) for metrics the baseline has no value for
+    """
+    rows = []
+    for metric, (unit, better, noise_floor, _) in METRICS.items():
+        base = baseline["metrics"].get(metric, {}).get("value") if baseline else None
+        if metric not in values:
+            reason = skipped.get(metric, "not run")
+            status = f"skipped ({reason})" if base is not None else f"NO BASELINE (skipped: {reason})"
+            rows.append((metric, base, None, None, status))
+            continue
+        current = values[metric]
+        if base is None:
+            rows.append((metric, None, current, None, "NO BASELINE"))
+            continue
+        change_pct = (current - base) / base * 100 if base else 0.0
+        worse = current - base if better == "lower" else base - current
+        threshold = thresholds.get(metric, default_threshold)
+        if worse > noise_floor and worse > abs(base) * threshold / 100:
+            status = "REGRESSED"
+        elif -worse > noise_floor and -worse > abs(base) * threshold / 100:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((metric, base, current, change_pct, status))
+    return rows
+
+
+def format_value(value, metric):
+    if value is None:
+        return "-"
+    return f"{value:,.1f} {METRICS[metric][0]}"
+
+
+def parse_metric_thresholds(items):
+    thresholds = {}
+    for item in items:
+        metric, _, value = item.partition("=")
+        if metric not in METRICS or not value:
+            raise argparse.ArgumentTypeError(f"expected <metric>=<percent> with a known metric, got '{item}'")
+        thresholds[metric] = float(value)
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance regression suite")
+    parser.add_argument("--only", default=",".join(SUITES),
+                        help=f"Comma-separated suites to run (default: {','.join(SUITES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per suite; the median is used")
+    parser.add_argument("--baseline", default=default_baseline_name(),
+                        help="Baseline name in tools/bench/baselines (default: <system>-<machine>)")
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help="Percent a metric may get worse before it counts as a regression")
+    parser.add_argument("--metric-threshold", action="append", default=[], metavar="METRIC=PCT",
+                        help="Threshold for a single metric (repeatable)")
+    parser.add_argument("--scanner-bin", help="Prebuilt product-scanner binary")
+    parser.add_argument("--no-build", action="store_true", help="Don't run cargo build for the scanner")
+    parser.add_argument("--scanner-seconds", type=float, default=15, help="Duration of the scanner run")
+    parser.add_argument("--json", help="Also write the results and comparison to this file")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Don't fail on metrics the baseline has no value for")
+    args = parser.parse_args(argv)
+
+    args.only = [suite.strip() for suite in args.only.split(",") if suite.strip()]
+    unknown = set(args.only) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    try:
+        thresholds = parse_metric_thresholds(args.metric_threshold)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    try:
+        values, skipped = run_suites(args)
+    except RuntimeError as e:
+        print(f"Benchmark failed: {e}", file=sys.stderr)
+        return 2
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+    baseline = load_baseline(baseline_path)
+    if baseline is not None and baseline.get("cpu_count") != os.cpu_count():
+        print(f"Note: the baseline was recorded on {baseline.get('platform')} with {baseline.get('cpu_count')} CPUs")
+
+    rows = compare(values, skipped, baseline, thresholds, args.threshold)
+    print()
+    print(f"Baseline: {baseline_path if baseline else 'none'}"
+          + (f" (commit {baseline.get('commit')}, {baseline.get('recorded_at')})" if baseline else ""))
+    print(f"{'metric':<38} {'baseline':>16} {'current':>16} {'change':>8}  status")
+    for metric, base, current, change_pct, status in rows:
+        change = f"{change_pct:+.1f}%" if change_pct is not None else "-"
+        print(f"{metric:<38} {format_value(base, metric):>16} {format_value(current, metric):>16} {change:>8}  {status}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"values": values, "skipped": skipped, "baseline": baseline_path if baseline else None,
+                       "comparison": [dict(zip(("metric", "baseline", "current", "change_pct", "status"), row))
+                                      for row in rows]}, file, indent=2)
+
+    if args.save:
+        if baseline is not None:
+            # Keep metrics that weren't measured this time (e.g. the scanner without cargo)
+            for metric, entry in baseline["metrics"].items():
+                if metric in METRICS and metric not in values:
+                    values[metric] = entry["value"]
+        save_baseline(baseline_path, values)
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+
+    regressions = [row[0] for row in rows if row[4] == "REGRESSED"]
+    missing = [row[0] for row in rows if row[4].startswith("NO BASELINE")]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed beyond the threshold: {', '.join(regressions)}")
+    if missing:
+        print(f"\n{len(missing)} metric(s) have no baseline value: {', '.join(missing)}"
+              + (" (allowed by --allow-missing)" if args.allow_missing else
+                 "\nRecord them with --save on a machine that can run them, or pass --allow-missing"))
+    if regressions or (missing and not args.allow_missing):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Product scanner benchmarks against the local stub server (stub_server.py).
+
+Runs the built scanner binary standalone in a scratch directory whose
+config/default.toml is the real one pointed at the stub (one target, fixed
+sleep, warm URL on the stub) and whose ../shared/scripts holds a benchmark
+cookie file. Measures:
+
+- startup: launch to first inventory request
+- poll latency as the scanner reports it ("Server response (..., N ms")
+- per-cycle overhead: gap between an inventory response and the next request,
+  minus the configured sleep
+- purchase latency: available response sent to final purchase request received
+
+Results are written as JSON to --output.
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from stub_server import StubStore, start_server
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCANNER_CONFIG = os.path.join(REPO_DIR, "product-scanner", "config", "default.toml")
+POLL_LATENCY_RE = re.compile(r"Server response \([^,]+, (\d+) ms")
+SLEEP_MS = 100
+
+
+def write_config(path, base_url):
+    """Write the scanner's config with the API, target, sleep and warm URL pointed at the stub"""
+    lines = []
+    in_targets = False
+    with open(SCANNER_CONFIG, encoding="utf-8") as file:
+        for line in file:
+            stripped = line.strip()
+            if stripped == "[[targets]]":
+                in_targets = True
+                continue
+            if in_targets:
+                if stripped.startswith("[") or not stripped:
+                    in_targets = False
+                else:
+                    continue
+            if stripped.startswith("inventory_base_url"):
+                line = f'inventory_base_url = "{base_url}/inventory"\n'
+            elif stripped.startswith(("sleep_ms_min", "sleep_ms_max")):
+                line = f"{stripped.split('=')[0].strip()} = {SLEEP_MS}\n"
+            elif stripped.startswith("warm_url"):
+                line = f'warm_url = "{base_url}/"\n'
+            lines.append(line)
+    lines.append('\n[[targets]]\nlocale = "de-de"\nskus = ["PROFESHOP5090"]\n')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+def write_cookies(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"timestamp": "2025-10-03T14:00:00", "cookies": [
+            {"name": "cf_clearance", "value": "x" * 400, "domain": "127.0.0.1"},
+            {"name": "session", "value": "y" * 32, "domain": "127.0.0.1"},
+        ]}, file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Product scanner benchmarks (run by run.py)")
+    parser.add_argument("--binary", required=True, help="Built product-scanner binary")
+    parser.add_argument("--workdir", required=True, help="Scratch directory")
+    parser.add_argument("--output", required=True, help="JSON result file")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--available-every", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    store = StubStore(args.available_every)
+    server = start_server(store)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    scanner_dir = os.path.join(args.workdir, "product-scanner")
+    write_config(os.path.join(scanner_dir, "config", "default.toml"), base_url)
+    write_cookies(os.path.join(args.workdir, "shared", "scripts", "captured_cookies.json"))
+
+    # Standalone: no coordinator link or status board
+    env = {key: value for key, value in os.environ.items()
+           if key not in ("NVIDIA_COORDINATOR", "NVIDIA_STATUS_BOARD")}
+    store.started = time.perf_counter()
+    process = subprocess.Popen(
+        [os.path.abspath(args.binary)], cwd=scanner_dir, env=env,
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding="utf-8", errors="replace",
+    )
+
+    poll_latencies = []
+
+    def read_output():
+        for line in process.stdout:
+            match = POLL_LATENCY_RE.search(line)
+            if match:
+                poll_latencies.append(int(match.group(1)))
+
+    reader = threading.Thread(target=read_output)
+    reader.daemon = True
+    reader.start()
+
+    time.sleep(args.seconds)
+    # SIGINT runs the scanner's Ctrl+C handler, which lets purchases in flight finish
+    if os.name == "posix":
+        process.send_signal(signal.SIGINT)
+    else:
+        process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    reader.join(timeout=5)
+    server.shutdown()
+
+    summary = store.summary()
+    metrics, skipped = {}, {}
+    if summary["first_poll_ms"] is None:
+        raise RuntimeError(f"The scanner never polled the stub server (exit code {process.returncode})")
+    metrics["scanner_first_poll_ms"] = summary["first_poll_ms"]
+    if poll_latencies:
+        metrics["scanner_poll_latency_ms"] = statistics.median(poll_latencies)
+    if summary["poll_gap_ms"] is not None:
+        metrics["scanner_cycle_overhead_ms"] = max(0.0, summary["poll_gap_ms"] - SLEEP_MS)
+    if summary["purchase_latency_ms"] is not None:
+        metrics["scanner_purchase_latency_ms"] = summary["purchase_latency_ms"]
+    else:
+        skipped["scanner_purchase_latency_ms"] = f"no purchase completed in {args.seconds:g}s"
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"metrics": metrics, "skipped": skipped, "polls": summary["polls"],
+                   "purchases": summary["purchases"]}, file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the FE inventory API and the retailer's purchase flow.
+
+Inventory requests answer "no product" with an identical body (so the
+scanner's unchanged-response fast path is exercised) except every
+--available-every'th request, which returns a product URL pointing back at
+this server. Following it goes /buy -> 302 -> /cart like the retailer's basket
+redirect. The server timestamps both ends, so the purchase latency it reports
+(available response sent to final purchase request received) includes the
+scanner's parsing, task spawn, cookie loading and redirect handling. With a
+single target and a fixed sleep, the gap between one inventory response and
+the next request minus the sleep is the scanner's own per-cycle overhead.
+
+    python tools/bench/stub_server.py --port 8765
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SKU = "PROFESHOP5090"
+
+
+def inventory_body(product_url):
+    return json.dumps({
+        "success": True,
+        "map": None,
+        "listMap": [{
+            "is_active": "true" if product_url else "false",
+            "product_url": product_url,
+            "price": "2329.00",
+            "fe_sku": f"{SKU}_DE",
+            "locale": "DE",
+        }],
+    }).encode("utf-8")
+
+
+class StubStore:
+    """
+    Request counters and timings shared by the handler threads.
+
+    Args:
+        available_every (int): Every n-th inventory request returns an available product
+    """
+
+    def __init__(self, available_every=10):
+        self.available_every = available_every
+        self.started = time.perf_counter()
+        self.first_poll = None
+        self.polls = 0
+        self.purchases = 0
+        self.purchase_latencies_ms = []
+        self.poll_gaps_ms = []
+        self._last_response = None
+        self._available_at = {}
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Count an inventory request; returns the drop id if this one is available"""
+        with self._lock:
+            now = time.perf_counter()
+            self.polls += 1
+            if self.first_poll is None:
+                self.first_poll = now
+            if self._last_response is not None:
+                self.poll_gaps_ms.append((now - self._last_response) * 1000)
+            if self.polls % self.available_every:
+                return None
+            drop_id = self.polls
+            self._available_at[drop_id] = now
+            return drop_id
+
+    def responded(self):
+        """Mark the end of an inventory response"""
+        with self._lock:
+            self._last_response = time.perf_counter()
+
+    def purchased(self, drop_id):
+        now = time.perf_counter()
+        with self._lock:
+            available_at = self._available_at.pop(drop_id, None)
+            if available_at is not None:
+                self.purchases += 1
+                self.purchase_latencies_ms.append((now - available_at) * 1000)
+
+    def summary(self):
+        with self._lock:
+            latencies = list(self.purchase_latencies_ms)
+            gaps = list(self.poll_gaps_ms)
+        return {
+            "polls": self.polls,
+            "purchases": self.purchases,
+            "first_poll_ms": (self.first_poll - self.started) * 1000 if self.first_poll else None,
+            "poll_gap_ms": statistics.median(gaps) if gaps else None,
+            "purchase_latency_ms": statistics.median(latencies) if latencies else None,
+        }
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so the scanner's connection reuse works as against the real API
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status, body, content_type="application/json", headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            drop_id = parse_qs(url.query).get("t", [""])[0]
+            host = f"http://{self.headers.get('Host')}"
+            if url.path == "/inventory":
+                available = store.poll()
+                product_url = f"{host}/buy?t={available}" if available is not None else ""
+                self.send_body(200, inventory_body(product_url))
+                store.responded()
+            elif url.path == "/buy":
+                self.send_body(302, b"", "text/html", [
+                    ("Location", f"/cart?t={drop_id}"),
+                    ("Set-Cookie", "ASP.NET_SessionId=stub; path=/; HttpOnly"),
+                ])
+            elif url.path == "/cart":
+                if drop_id.isdigit():
+                    store.purchased(int(drop_id))
+                self.send_body(200, b"<html><body>Basket</body></html>", "text/html")
+            else:
+                self.send_body(200, b"", "text/html")
+
+    return Handler
+
+
+def start_server(store, port=0):
+    """
+    Serve in a background thread.
+
+    Returns:
+        ThreadingHTTPServer: The server; its port is server.server_address[1]
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(store))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-server")
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub inventory API and retailer for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--available-every", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    store = StubStore(args.available_every)
+    server = start_server(store, args.port)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}/inventory (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(store.summary()))
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
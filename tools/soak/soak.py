@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Accelerated soak test for resource leaks in the coordinator (Linux only).
+
+Runs the real nvidia_purchase_coordinator.py in a scratch directory against
+stub children (stub_component.py) and stub cookie-prep runs, with every
+component schedule sped up by --speed. Throughout the run it samples the
+coordinator's RSS, thread count and open file descriptors from /proc, writes
+them to soak_samples.csv and fails if any of them grew by more than its
+tolerance between the end of the warm-up and the end of the run.
+
+    python tools/soak/soak.py --duration 3600 --speed 50
+"""
+import argparse
+import csv
+import os
+import shlex
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SOAK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(SOAK_DIR))
+COORDINATOR = os.path.join(REPO_DIR, "nvidia_purchase_coordinator.py")
+STUB_COMPONENT = os.path.join(SOAK_DIR, "stub_component.py")
+STUB_COOKIE_PREP = os.path.join(SOAK_DIR, "stub_cookie_prep.py")
+
+# Samples averaged at the start and end of the measured period
+EDGE_SAMPLES = 3
+
+
+def sample(pid):
+    """
+    Read RSS, threads, open fds and child processes of a process from /proc.
+
+    Returns:
+        dict: The sample, or None if the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as file:
+            status = dict(line.split(":", 1) for line in file if ":" in line)
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+
+    children = None
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as file:
+            children = len(file.read().split())
+    except OSError:
+        pass  # Needs CONFIG_PROC_CHILDREN
+
+    return {
+        "time": round(time.time(), 1),
+        "rss_mb": round(int(status["VmRSS"].split()[0]) / 1024, 1),
+        "threads": int(status["Threads"]),
+        "fds": fds,
+        "children": children,
+    }
+
+
+def coordinator_command(args, workdir):
+    stub = [sys.executable, STUB_COMPONENT, "--speed", str(args.speed)]
+    return [
+        sys.executable, COORDINATOR,
+        "--silent",
+        "--scanner-cmd", shlex.join(stub + ["--role", "scanner", "--extra-lines", str(args.extra_lines)]),
+        "--early-warning-cmd", shlex.join(stub + ["--role", "early-warning"]),
+        "--early-warning-interval", "30",
+        "--cookie-prep-script", STUB_COOKIE_PREP,
+        "--cookie-file", os.path.join(workdir, "cookies.json"),
+        "--cookie-refresh-minutes", str(12 / args.speed), str(15 / args.speed),
+    ]
+
+
+def evaluate(samples, tolerances):
+    """
+    Compare the start and end of the measured samples.
+
+    Returns:
+        list: (metric, start, end, growth, tolerance, ok) per metric
+    """
+    results = []
+    for metric, tolerance in tolerances.items():
+        start = statistics.median(s[metric] for s in samples[:EDGE_SAMPLES])
+        end = statistics.median(s[metric] for s in samples[-EDGE_SAMPLES:])
+        growth = end - start
+        results.append((metric, start, end, growth, tolerance, growth <= tolerance))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test the coordinator against stub components")
+    parser.add_argument("--duration", type=float, default=1800, help="Real seconds to run")
+    parser.add_argument("--speed", type=float, default=50, help="Speed-up of component and cookie schedules")
+    # The coordinator's request budget grants at most a few permits per second whatever the speed,
+    # so the scanner's output volume per request is raised instead
+    parser.add_argument("--extra-lines", type=int, default=4, help="Additional scanner log lines per request")
+    parser.add_argument("--warmup", type=float, default=60, help="Seconds before the baseline sample")
+    parser.add_argument("--sample-interval", type=float, default=5, help="Seconds between /proc samples")
+    parser.add_argument("--rss-tolerance-mb", type=float, default=25)
+    parser.add_argument("--thread-tolerance", type=int, default=4)
+    parser.add_argument("--fd-tolerance", type=int, default=8)
+    parser.add_argument("--workdir", help="Scratch directory (default: a new temporary directory)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir("/proc/self/fd"):
+        print("The soak harness samples /proc and only runs on Linux", file=sys.stderr)
+        return 2
+    if args.duration <= args.warmup + EDGE_SAMPLES * args.sample_interval:
+        parser.error("--duration must leave room for samples after --warmup")
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="coordinator-soak-"))
+    os.makedirs(workdir, exist_ok=True)
+    print(f"Soak run in {workdir}: {args.duration:g}s at {args.speed:g}x "
+          f"(~{args.duration * args.speed / 86400:.1f} simulated days)")
+
+    output = open(os.path.join(workdir, "coordinator.out"), "w", encoding="utf-8")
+    coordinator = subprocess.Popen(
+        coordinator_command(args, workdir),
+        cwd=workdir,
+        stdout=output,
+        stderr=subprocess.STDOUT,
+        env={**os.environ, "SOAK_COOKIE_FILE": os.path.join(workdir, "cookies.json"), "PYTHONUNBUFFERED": "1"},
+    )
+
+    samples = []
+    started = time.monotonic()
+    exited_early = False
+    try:
+        with open(os.path.join(workdir, "soak_samples.csv"), "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=["time", "rss_mb", "threads", "fds", "children"])
+            writer.writeheader()
+            while time.monotonic() - started < args.duration:
+                time.sleep(args.sample_interval)
+                current = sample(coordinator.pid)
+                if current is None or coordinator.poll() is not None:
+                    exited_early = True
+                    break
+                writer.writerow(current)
+                file.flush()
+                if time.monotonic() - started >= args.warmup:
+                    samples.append(current)
+                print(f"[{time.monotonic() - started:7.0f}s] rss {current['rss_mb']} MB, "
+                      f"{current['threads']} threads, {current['fds']} fds, {current['children']} children")
+    except KeyboardInterrupt:
+        print("Interrupted, evaluating the samples so far")
+    finally:
+        if coordinator.poll() is None:
+            coordinator.send_signal(signal.SIGINT)
+            try:
+                coordinator.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                coordinator.kill()
+        output.close()
+
+    if exited_early:
+        print(f"Coordinator exited early with code {coordinator.returncode}, see {workdir}/coordinator.out")
+        return 1
+    if len(samples) < 2 * EDGE_SAMPLES:
+        print("Not enough samples after the warm-up to evaluate")
+        return 1
+
+    results = evaluate(samples, {
+        "rss_mb": args.rss_tolerance_mb,
+        "threads": args.thread_tolerance,
+        "fds": args.fd_tolerance,
+    })
+    for metric, start, end, growth, tolerance, ok in results:
+        print(f"{'OK  ' if ok else 'FAIL'} {metric}: {start:g} -> {end:g} (growth {growth:+g}, tolerance {tolerance:g})")
+
+    # The stubs stop on SIGINT right away, so a forced termination is a shutdown bug in the coordinator
+    with open(os.path.join(workdir, "coordinator.out"), encoding="utf-8", errors="replace") as file:
+        forced = [line.strip() for line in file if "did not stop gracefully" in line]
+    print(f"{'FAIL' if forced else 'OK  '} shutdown: "
+          + ("; ".join(forced) if forced else "components stopped gracefully"))
+    return 0 if all(result[-1] for result in results) and not forced else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Stub product scanner / early-warning monitor for the soak harness.
+
+Speaks the same protocol as the real components (see the coordinator_link.rs
+files): it asks for a permit with "@@permit <id> <host>" before every request,
+reports observations and throttling with "@@observe"/"@@http" lines and obeys
+interval, pause, resume, reload and cookie-ready commands on stdin. Output
+mirrors the real components, including the occasional product drop, purchase
+failure and SKU change, while sleeps are divided by --speed.
+
+    python tools/soak/stub_component.py --role scanner --speed 50
+    python tools/soak/stub_component.py --role early-warning --speed 50 --interval 30
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+INVENTORY_HOST = "api.store.nvidia.com"
+RETAILERS_HOST = "api.nvidia.partners"
+SCANNER_LOCALES = ("de-de", "fr-fr")
+SKUS = ("PROFESHOP5090", "PRO5080FESHOP")
+# Give up on a permit after this long so a stalled coordinator doesn't freeze the stub
+PERMIT_TIMEOUT_SECS = 30
+
+
+def now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class CoordinatorCommands:
+    """
+    State driven by the coordinator's stdin commands.
+
+    Args:
+        interval_ms (tuple): Initial (min, max) sleep between cycles in ms
+        interval_unit_ms (int): Milliseconds per unit of the "interval" command
+            (the scanner gets ms, early-warning seconds)
+    """
+
+    def __init__(self, interval_ms, interval_unit_ms=1):
+        self.interval_ms = interval_ms
+        self.interval_unit_ms = interval_unit_ms
+        self.paused = False
+        self.changed = threading.Event()
+        self._grants = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def listen(self):
+        for line in sys.stdin:
+            parts = line.split()
+            if parts[:1] == ["grant"] and len(parts) == 2:
+                with self._lock:
+                    event = self._grants.pop(int(parts[1]), None)
+                if event is not None:
+                    event.set()
+            elif parts[:1] == ["interval"] and len(parts) >= 2:
+                self.interval_ms = (int(parts[1]) * self.interval_unit_ms, int(parts[-1]) * self.interval_unit_ms)
+                print(f"[{now()}] ⏱️ Polling interval set to {self.interval_ms[0]}-{self.interval_ms[1]} ms")
+                self.changed.set()
+            elif parts == ["pause"] or parts == ["resume"]:
+                self.paused = parts == ["pause"]
+                self.changed.set()
+            elif parts == ["reload"]:
+                print(f"[{now()}] 🔄 Configuration reloaded ({len(SCANNER_LOCALES)} targets)")
+            elif parts == ["cookie-ready"]:
+                print(f"[{now()}] 🍪 Cookies ready, purchases enabled")
+        # Coordinator gone: behave like the real components and keep going standalone
+        with self._lock:
+            for event in self._grants.values():
+                event.set()
+            self._grants.clear()
+
+    def permit(self, host):
+        event = threading.Event()
+        with self._lock:
+            permit_id = next(self._ids)
+            self._grants[permit_id] = event
+        print(f"@@permit {permit_id} {host}")
+        event.wait(PERMIT_TIMEOUT_SECS)
+
+    def sleep(self, secs):
+        self.changed.wait(secs)
+        self.changed.clear()
+
+
+def scanner_cycle(commands, cycle, rng, args):
+    print(f"[{now()}] Cycle #{cycle} - Starting FE inventory check for {len(SCANNER_LOCALES)} locale(s)")
+    for locale in SCANNER_LOCALES:
+        commands.permit(INVENTORY_HOST)
+        latency = rng.randint(80, 400)
+        if rng.random() < 0.002:
+            print(f"@@http {INVENTORY_HOST} 429 {rng.randint(1, 5)}")
+            print(f"[{now()}] ⚠️ Cycle #{cycle} - Locale check failed: API throttled with status 429")
+            continue
+        print(f"[{now()}] 📡 Server response ({locale}, {latency} ms, reused connection, 1 handshakes / "
+              f"{cycle * len(SCANNER_LOCALES)} requests): unchanged")
+        for _ in range(args.extra_lines):
+            print(f"[{now()}] Cycle #{cycle} - {locale}: no products available")
+
+    if cycle % 50 == 0:
+        for sku in SKUS:
+            # Prices flip now and then so the history store has changes to write
+            price = "1799" if (cycle // 1000) % 2 else "1899"
+            state = {"is_active": "false", "price": price, "available": False}
+            print(f"@@observe inventory {sku}_DE/DE {json.dumps(state, separators=(',', ':'))}")
+
+    if rng.random() < 0.0005:
+        sku = rng.choice(SKUS)
+        print(f"[{now()}] 🔍 Found available product: {sku}_DE (de-de)")
+        print(f"[{now()}] 🚀 LAUNCHING PURCHASE PROCESS FOR: {sku}_DE (de-de)")
+        print(f"[{now()}] 🔗 Product Link: https://www.proshop.de/Basket/BuyNvidiaGraphicCard?t=stub")
+        print(f"[{now()}] ⚠️ Purchase attempt failed in {rng.uniform(0.2, 2.0):.2f}s")
+
+
+def early_warning_cycle(commands, cycle, rng, args):
+    start = time.monotonic()
+    commands.permit(RETAILERS_HOST)
+    commands.permit(INVENTORY_HOST)
+    if cycle % 20 == 0:
+        print(f"[{now()}] [INFO] Checking SKUs in retailers response...")
+        for sku in SKUS:
+            print(f"[{now()}] [INFO] Found SKU: {sku}")
+        print(f"@@observe retailer_skus de-de {json.dumps(sorted(SKUS))}")
+    else:
+        print(f"[{now()}] [INFO] Retailers response unchanged")
+    if rng.random() < 0.001:
+        print(f"[{now()}] [WARN] SKU change detected! New SKU: PRO5070FESHOP")
+    elapsed = time.monotonic() - start + rng.uniform(0.1, 0.5)
+    print(f"[{now()}] [INFO] Cycle #{cycle}: Response time: {elapsed:.2f}s - Response unchanged")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub component for the coordinator soak harness")
+    parser.add_argument("--role", choices=("scanner", "early-warning"), required=True)
+    parser.add_argument("--speed", type=float, default=10, help="Divide all sleeps by this factor")
+    parser.add_argument("--interval", type=float, default=30, help="Early-warning check interval in seconds")
+    parser.add_argument("--verbose", action="store_true", help="Accepted for compatibility with early-warning")
+    parser.add_argument("--extra-lines", type=int, default=2, help="Additional log lines per scanner locale")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Output goes to a pipe; flush every line like the real components
+    sys.stdout.reconfigure(line_buffering=True)
+    rng = random.Random(args.seed)
+
+    if args.role == "scanner":
+        commands = CoordinatorCommands((1000, 1100))
+        cycle_func = scanner_cycle
+    else:
+        interval_ms = int(args.interval * 1000)
+        commands = CoordinatorCommands((interval_ms, interval_ms), interval_unit_ms=1000)
+        cycle_func = early_warning_cycle
+    threading.Thread(target=commands.listen, daemon=True).start()
+    print(f"[{now()}] Configuration loaded successfully")
+
+    try:
+        for cycle in itertools.count(1):
+            if commands.paused:
+                commands.sleep(1)
+                continue
+            cycle_func(commands, cycle, rng, args)
+            min_ms, max_ms = commands.interval_ms
+            commands.sleep(rng.uniform(min_ms, max(min_ms, max_ms)) / 1000 / args.speed)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
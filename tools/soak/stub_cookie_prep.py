@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Stub cookie-prep run for the soak harness.
+
+Prints output on stdout and stderr like a browser session would, then writes a
+cookie file with a cf_clearance cookie to $SOAK_COOKIE_FILE and exits.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+
+def main():
+    cookie_file = os.environ.get("SOAK_COOKIE_FILE")
+    if not cookie_file:
+        print("SOAK_COOKIE_FILE is not set", file=sys.stderr)
+        return 1
+
+    for attempt in range(1, random.randint(2, 4)):
+        print(f"Starting browser session (attempt {attempt})")
+        print(f"Navigating to product page, waiting for challenge... attempt {attempt} for cookie")
+        print(f"Browser debug output {random.random():.6f}", file=sys.stderr)
+        time.sleep(random.uniform(0.05, 0.3))
+
+    cookies = [
+        {"name": "cf_clearance", "value": os.urandom(24).hex(), "domain": ".proshop.de"},
+        {"name": "session", "value": os.urandom(8).hex(), "domain": "www.proshop.de"},
+    ]
+    os.makedirs(os.path.dirname(os.path.abspath(cookie_file)), exist_ok=True)
+    with open(cookie_file, "w", encoding="utf-8") as file:
+        json.dump(cookies, file)
+    print("Cookies saved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())